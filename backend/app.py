@@ -1,5 +1,6 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import config, Config
 import os
 
@@ -9,16 +10,29 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config.get(config_name, config['default']))
+    # Flask 3 reads these from the JSON provider rather than app.config
+    app.json.compact = not app.config['JSON_PRETTY']
+    app.json.sort_keys = app.config['JSON_SORT_KEYS']
+    if app.config['TRUSTED_PROXIES']:
+        # Rate limits key on the client address, which the proxies pass in X-Forwarded-For
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
     
     # Enable CORS with origins from environment configuration
     cors_origins = Config.get_cors_origins()
     CORS(app, origins=cors_origins, 
          supports_credentials=True,
-         allow_headers=["Content-Type", "Authorization", "Accept"],
+         allow_headers=["Content-Type", "Authorization", "Accept", "If-None-Match"],
+         expose_headers=["ETag", "Content-Encoding"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     
     from routes.queue_routes import queue_bp
+    from routes.branch_routes import branches_bp
+    from routes.metrics_routes import metrics_bp
+    # /queue/... serves the default branch, /queue/<branch>/... any other
     app.register_blueprint(queue_bp)
+    app.register_blueprint(queue_bp, name='branch_queue', url_prefix='/queue/<branch>')
+    app.register_blueprint(branches_bp)
+    app.register_blueprint(metrics_bp)
     
     @app.route('/')
     def index():
@@ -0,0 +1,199 @@
+"""ASGI entry point: the Flask app, with /queue/events answered on the event loop
+
+Run: uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+from app import app as flask_app
+from config import Config
+from queue_system.metrics import REQUEST_SECONDS
+from queue_system.serialization import dumps
+from routes import queue_routes
+from routes.admission import RATE_LIMITED_MESSAGE, retry_after
+from routes.queue_routes import (
+    registry, parse_since, sse_frames, MAX_EVENT_WAIT_SECONDS, SSE_KEEPALIVE_SECONDS
+)
+
+wsgi_app = WSGIMiddleware(flask_app)
+
+
+class ChangeNotifier:
+    """Wakes coroutines when the queue version changes, from one thread blocked in get_events"""
+
+    def __init__(self, manager):
+        self._manager = manager
+        self._loop = None
+        self._changed = None
+
+    def start(self):
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        threading.Thread(target=self._watch, name='queue-change-notifier', daemon=True).start()
+
+    def _watch(self):
+        version = self._manager.version
+        while True:
+            feed = self._manager.get_events(version, timeout=SSE_KEEPALIVE_SECONDS)
+            if feed['version'] != version:
+                version = feed['version']
+                try:
+                    self._loop.call_soon_threadsafe(self._publish)
+                except RuntimeError:
+                    # The loop was closed: the server is shutting down
+                    return
+
+    def _publish(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, since: int, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for the version to move past ``since``"""
+        self.start()
+        changed = self._changed
+        if self._manager.version != since:
+            return True
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+# The loop serves the default branch's feed, so that branch stays pinned for the life of
+# the process; /queue/<branch>/events goes through Flask like any other route
+queue_manager = registry.acquire(Config.DEFAULT_BRANCH)
+notifier = ChangeNotifier(queue_manager)
+
+
+def cors_headers(headers):
+    """The CORS response headers flask-cors would add for this request"""
+    origin = headers.get(b'origin')
+    if origin is None:
+        return []
+    allowed = Config.get_cors_origins()
+    if '*' not in allowed and origin.decode('latin-1') not in allowed:
+        return []
+    return [
+        (b'access-control-allow-origin', origin),
+        (b'access-control-allow-credentials', b'true'),
+        (b'access-control-expose-headers', b'ETag'),
+        (b'vary', b'Origin'),
+    ]
+
+
+def client_address(scope, headers):
+    """The client address Flask would see, through ProxyFix when behind trusted proxies"""
+    if Config.TRUSTED_PROXIES and b'x-forwarded-for' in headers:
+        forwarded = headers[b'x-forwarded-for'].decode('latin-1').split(',')
+        forwarded = [value.strip() for value in forwarded]
+        if len(forwarded) >= Config.TRUSTED_PROXIES:
+            return forwarded[-Config.TRUSTED_PROXIES]
+    return scope['client'][0] if scope.get('client') else ''
+
+
+def record_latency(started, status):
+    REQUEST_SECONDS.observe(time.perf_counter() - started, 'GET', '/queue/events', str(status))
+
+
+async def send_json(send, status, payload, headers, extra_headers=()):
+    body = dumps(payload, pretty=Config.JSON_PRETTY)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ] + list(extra_headers) + cors_headers(headers)
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_events(scope, receive, send, headers, since, started):
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ] + cors_headers(headers)
+    })
+    # As in Flask, a stream is timed until its headers are sent
+    record_latency(started, 200)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        while not disconnected.done():
+            waiting = asyncio.ensure_future(notifier.wait(since, SSE_KEEPALIVE_SECONDS))
+            await asyncio.wait({waiting, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                waiting.cancel()
+                break
+            feed = queue_manager.get_events(since)
+            body = sse_frames(feed, queue_manager.instance_id).encode()
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+            since = feed['version']
+    finally:
+        disconnected.cancel()
+
+
+async def queue_events(scope, receive, send):
+    """``GET /queue/events``: admit, wait on the loop, then answer from the change feed"""
+    started = time.perf_counter()
+    headers = dict(scope['headers'])
+    query = parse_qs(scope['query_string'].decode('latin-1'))
+    try:
+        last_event_id = headers.get(b'last-event-id')
+        token = last_event_id.decode('latin-1') if last_event_id else query.get('since', [None])[0]
+        since = parse_since(token, queue_manager.instance_id)
+        timeout = float(query.get('timeout', [25])[0])
+    except ValueError:
+        # Flask admits the request and reports the bad parameter
+        return await wsgi_app(scope, receive, send)
+
+    # Exempt from the concurrency cap like the Flask route, but not from the rate limit
+    wait = queue_routes.rate_limiter.take(client_address(scope, headers), 'queue_events')
+    if wait:
+        await send_json(send, 429, {'success': False, 'message': RATE_LIMITED_MESSAGE}, headers,
+                        [(b'retry-after', retry_after(wait).encode())])
+        return record_latency(started, 429)
+    if since is None:
+        since = queue_manager.version
+
+    if b'text/event-stream' in headers.get(b'accept', b'') or query.get('stream'):
+        return await stream_events(scope, receive, send, headers, since, started)
+
+    await notifier.wait(since, max(0.0, min(timeout, MAX_EVENT_WAIT_SECONDS)))
+    await send_json(send, 200, {'success': True, 'data': queue_manager.get_events(since)}, headers)
+    record_latency(started, 200)
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            notifier.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(scope, receive, send)
+    if scope['type'] == 'http' and scope['method'] == 'GET' and scope['path'] == '/queue/events':
+        return await queue_events(scope, receive, send)
+    await wsgi_app(scope, receive, send)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""ASGI Benchmark - Flask threaded server against the ASGI entry point with many idle clients
+Usage: python benchmarks/bench_asgi.py [--idle N] [--concurrency N] [--duration S]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SERVERS = {
+    'flask': [sys.executable, '-c',
+              'from app import app; app.run(port={port}, threaded=True, debug=False)'],
+    'asgi': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', '{port}',
+             '--log-level', 'warning'],
+}
+
+
+def start_server(name, port):
+    command = [part.format(port=port) for part in SERVERS[name]]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+
+
+def process_usage(pid):
+    """(threads, resident MB) of a running process, from /proc"""
+    fields = {}
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            key, _, value = line.partition(':')
+            fields[key] = value.split()
+    return int(fields['Threads'][0]), int(fields['VmRSS'][0]) / 1024
+
+
+async def request(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    return int(status)
+
+
+async def wait_until_up(port, deadline=15):
+    started = time.monotonic()
+    while time.monotonic() - started < deadline:
+        try:
+            if await request(port, '/health') == 200:
+                return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def open_idle(port, count):
+    """Open ``count`` long-polls that stay pending for the whole run"""
+    connections = []
+    for _ in range(count):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /queue/events?timeout=30 HTTP/1.1\r\n"
+                     b"Host: localhost\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        connections.append(writer)
+    return connections
+
+
+async def load(port, concurrency, duration):
+    latencies = []
+    errors = 0
+    stop_at = time.monotonic() + duration
+
+    async def client():
+        nonlocal errors
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                if await request(port, '/queue/stats') != 200:
+                    errors += 1
+            except OSError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors
+
+
+async def run(name, port, args):
+    server = start_server(name, port)
+    try:
+        await wait_until_up(port)
+        idle = await open_idle(port, args.idle)
+        await asyncio.sleep(1)
+        threads, rss = process_usage(server.pid)
+        latencies, errors = await load(port, args.concurrency, args.duration)
+        for writer in idle:
+            writer.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    rate = len(latencies) / args.duration
+    print(f"   {name:<8}{rate:>10,.0f}{p50:>10.1f}{p99:>10.1f}{errors:>8}{threads:>9}{rss:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the Flask server and the ASGI entry point under idle load'
+    )
+    parser.add_argument('--idle', type=int, default=1000,
+                        help='Idle long-poll connections (default: 1000)')
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help='Concurrent stats clients (default: 20)')
+    parser.add_argument('--duration', type=float, default=5,
+                        help='Seconds of load per server (default: 5)')
+    parser.add_argument('--port', type=int, default=5055,
+                        help='Port to run the servers on (default: 5055)')
+    parser.add_argument('--servers', nargs='+', default=list(SERVERS), choices=list(SERVERS))
+    args = parser.parse_args()
+
+    print(f"\n📊 GET /queue/stats with {args.idle} idle long-polls, "
+          f"{args.concurrency} clients, {args.duration}s\n")
+    print(f"   {'server':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+          f"{'threads':>9}{'RSS MB':>9}")
+    for name in args.servers:
+        asyncio.run(run(name, args.port, args))
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Entry Benchmark - Memory and ordering cost of QueueEntry against the old dict-backed entry
+Usage: python benchmarks/bench_entries.py [--count N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from operator import attrgetter
+
+from queue_system.index import RankedIndex
+from queue_system.models import QueueEntry
+from bench_journal import make_person
+
+
+class LegacyEntry:
+    """The entry as it was before slots and packed sort keys"""
+
+    def __init__(self, priority, sequence, **fields):
+        self.__dict__.update(fields)
+        self.priority = priority
+        self.sequence = sequence
+        self.created_at = datetime.utcnow().isoformat() + "Z"
+        self.status = "waiting"
+
+    def __lt__(self, other):
+        if self.priority != other.priority:
+            return self.priority < other.priority
+        if self.preferred_date != other.preferred_date:
+            return self.preferred_date < other.preferred_date
+        if self.preferred_time != other.preferred_time:
+            return self.preferred_time < other.preferred_time
+        return self.sequence < other.sequence
+
+
+def build(cls, people):
+    return [cls(priority=i % 2, sequence=i, **person) for i, person in enumerate(people)]
+
+
+def bytes_per_entry(cls, people):
+    """Memory held per entry, traced over a sample since tracing slows construction down"""
+    tracemalloc.start()
+    entries = build(cls, people)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entries
+    return allocated / len(people)
+
+
+def fill(index, entries):
+    for entry in entries:
+        index.insert(entry)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare entry memory use and ordering speed')
+    parser.add_argument('--count', type=int, default=1000000,
+                        help='Entries to create (default: 1000000)')
+    args = parser.parse_args()
+
+    print(f"\n📊 {args.count:,} entries\n")
+    people = [make_person(i) for i in range(args.count)]
+    print(f"   {'entry':<10}{'build s':>10}{'MB':>10}{'sort s':>10}{'index s':>10}")
+    cases = [('legacy', LegacyEntry, None), ('slots', QueueEntry, attrgetter('sort_key'))]
+    for label, cls, key in cases:
+        megabytes = bytes_per_entry(cls, people[:100000]) * args.count / 1e6
+        started = time.perf_counter()
+        entries = build(cls, people)
+        build_time = time.perf_counter() - started
+        shuffled = entries[::-1]
+        sort_time = timed(lambda: sorted(shuffled))
+        sample = entries[:args.count // 10]
+        index_time = timed(lambda: fill(RankedIndex(key=key), sample))
+        print(f"   {label:<10}{build_time:>10.2f}{megabytes:>10.1f}"
+              f"{sort_time:>10.2f}{index_time:>10.2f}")
+        del entries, shuffled, sample
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Journal Benchmark - Enqueue throughput with journaling off, async and sync
+Usage: python benchmarks/bench_journal.py [--count N] [--threads N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from threading import Thread
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from queue_system import Journal, QueueManager
+
+
+def make_person(i):
+    return {
+        "life_certificate_no": f"LC{i:07d}",
+        "name": f"Person {i}",
+        "age": 60 + i % 35,
+        "phone": "9876543210",
+        "proof_guardian_name": "Guardian",
+        "verification_mode": "presence" if i % 2 else "online",
+        "preferred_date": f"2026-01-{10 + i % 20:02d}",
+        "preferred_time": f"{9 + i % 8:02d}:{(i % 4) * 15:02d}"
+    }
+
+
+def run(manager, count, threads):
+    """Enqueue ``count`` people from ``threads`` threads; returns enqueues per second"""
+    people = [make_person(i) for i in range(count)]
+    chunk = count // threads
+
+    def worker(start):
+        for person in people[start:start + chunk]:
+            manager.enqueue(person)
+
+    workers = [Thread(target=worker, args=(t * chunk,)) for t in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    return (chunk * threads) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark enqueue throughput with and without the journal'
+    )
+    parser.add_argument('--count', type=int, default=20000,
+                        help='Enqueues per run (default: 20000)')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent writers (default: 8)')
+    args = parser.parse_args()
+
+    print(f"\n📊 Enqueue throughput, {args.count} entries, {args.threads} threads\n")
+    print(f"   {'mode':<22}{'enqueues/s':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configs = [
+            ('journal off', None),
+            ('journal async', dict(sync=False)),
+            ('journal sync (group)', dict(sync=True)),
+        ]
+        for label, options in configs:
+            journal = None
+            if options is not None:
+                journal = Journal(os.path.join(tmp, label.replace(' ', '_')), **options)
+            rate = run(QueueManager(journal=journal), args.count, args.threads)
+            if journal is not None:
+                journal.close()
+            print(f"   {label:<22}{rate:>12,.0f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""QueueManager Microbenchmarks - Per-operation latency at queue sizes from 100 to 1M
+Usage: python benchmarks/bench_manager.py [--sizes N ...] [--ops N] [--engine ranked|buckets]
+                                          [--json PATH] [--compare PATH]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from queue_system import QueueManager
+from queue_system.manager import ENGINES
+from bench_journal import make_person
+from results import Stopwatch, summarize, save, compare
+
+
+def filled_manager(size, engine='ranked'):
+    manager = QueueManager(engine=engine)
+    for start in range(0, size, 50000):
+        manager.enqueue_many([make_person(i) for i in range(start, min(size, start + 50000))])
+    return manager
+
+
+def bench_size(size, ops, engine='ranked'):
+    """Result rows for every operation at one queue size"""
+    manager = filled_manager(size, engine)
+    rows = []
+    next_id = size
+
+    def record(operation, stopwatch):
+        rows.append(summarize(stopwatch.latencies, stopwatch.elapsed,
+                              operation=operation, size=size))
+
+    stopwatch = Stopwatch()
+    for i in range(next_id, next_id + ops):
+        stopwatch.time(manager.enqueue, make_person(i))
+    record('enqueue', stopwatch)
+
+    stopwatch = Stopwatch()
+    for _ in range(ops):
+        stopwatch.time(manager.dequeue)
+    record('dequeue', stopwatch)
+
+    def touch():
+        """A write that leaves the queue as it was, so the next read sees a new version"""
+        manager.enqueue(make_person(next_id + ops))
+        manager.remove_entry_by_cert(f"LC{next_id + ops:07d}")
+
+    # Spread lookups over the whole queue; first against the live index, then the published snapshot
+    queue = manager.get_queue_state()['queue']
+    certs = [queue[(i * 7919) % len(queue)]['life_certificate_no'] for i in range(ops)]
+    touch()
+    stopwatch = Stopwatch()
+    for cert_no in certs:
+        stopwatch.time(manager.get_entry_by_cert, cert_no)
+    record('lookup', stopwatch)
+
+    state_ops = max(1, min(ops, 200000 // size))
+    stopwatch = Stopwatch()
+    for _ in range(state_ops):
+        touch()
+        stopwatch.time(manager.get_queue_state, True)
+    record('state_after_write', stopwatch)
+
+    stopwatch = Stopwatch()
+    for _ in range(state_ops):
+        stopwatch.time(manager.get_queue_state, True)
+    record('state', stopwatch)
+
+    stopwatch = Stopwatch()
+    for cert_no in certs:
+        stopwatch.time(manager.get_entry_by_cert, cert_no)
+    record('lookup_snapshot', stopwatch)
+
+    stopwatch = Stopwatch()
+    for _ in range(ops):
+        stopwatch.time(manager.get_queue_page, 0, 50, None, True)
+    record('page', stopwatch)
+
+    stopwatch = Stopwatch()
+    for _ in range(ops):
+        stopwatch.time(manager.get_stats)
+    record('stats', stopwatch)
+
+    stopwatch = Stopwatch()
+    for cert_no in set(certs):
+        stopwatch.time(manager.remove_entry_by_cert, cert_no)
+    record('remove', stopwatch)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time QueueManager operations at several queue sizes'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000, 1000000],
+                        help='Queue sizes to test (default: 100 to 1000000)')
+    parser.add_argument('--ops', type=int, default=1000,
+                        help='Operations timed per case (default: 1000)')
+    parser.add_argument('--engine', choices=ENGINES, default='ranked',
+                        help='Serving-order index (default: ranked)')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Compare against a previous --json file')
+    args = parser.parse_args()
+
+    print(f"\n📊 QueueManager ({args.engine} engine), {args.ops} operations per case\n")
+    print(f"   {'operation':<20}{'size':>9}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = []
+    for size in args.sizes:
+        # Never time more operations than the queue can serve
+        for row in bench_size(size, min(args.ops, size), args.engine):
+            print(f"   {row['operation']:<20}{row['size']:>9}{row['ops_per_sec']:>12,.0f}"
+                  f"{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}")
+            rows.append(row)
+    print()
+
+    if args.json:
+        save(args.json, 'queue_manager', vars(args), rows)
+    if args.compare:
+        compare(args.compare, rows, ('operation', 'size'))
+
+
+if __name__ == "__main__":
+    main()
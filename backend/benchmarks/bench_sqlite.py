@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+SQLite Backend Benchmark - Multi-process enqueue/dequeue throughput on one shared queue
+Usage: python benchmarks/bench_sqlite.py [--count N] [--processes N ...]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from queue_system import SQLiteQueueManager
+from bench_journal import make_person
+
+
+def enqueue_worker(args):
+    path, start, stop = args
+    manager = SQLiteQueueManager(path)
+    for i in range(start, stop):
+        manager.enqueue(make_person(i))
+    return stop - start
+
+
+def dequeue_worker(path):
+    manager = SQLiteQueueManager(path)
+    served = []
+    while True:
+        success, _, entry = manager.dequeue()
+        if not success:
+            return served
+        served.append(entry['life_certificate_no'])
+
+
+def run(path, count, processes):
+    SQLiteQueueManager(path)
+    chunk = count // processes
+    with Pool(processes) as pool:
+        started = time.perf_counter()
+        pool.map(enqueue_worker, [(path, p * chunk, (p + 1) * chunk) for p in range(processes)])
+        enqueue_rate = (chunk * processes) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        served = [cert for batch in pool.map(dequeue_worker, [path] * processes) for cert in batch]
+        dequeue_rate = len(served) / (time.perf_counter() - started)
+
+    # Every entry must be served exactly once across all processes
+    consistent = len(served) == chunk * processes == len(set(served))
+    return enqueue_rate, dequeue_rate, consistent
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the SQLite backend with several worker processes'
+    )
+    parser.add_argument('--count', type=int, default=10000, help='Entries per run (default: 10000)')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4],
+                        help='Process counts to try')
+    args = parser.parse_args()
+
+    print(f"\n📊 SQLite backend, {args.count} entries per run\n")
+    print(f"   {'processes':<12}{'enqueues/s':>12}{'dequeues/s':>12}  consistent")
+    with tempfile.TemporaryDirectory() as tmp:
+        for processes in args.processes:
+            path = os.path.join(tmp, f'queue_{processes}.db')
+            enqueue_rate, dequeue_rate, consistent = run(path, args.count, processes)
+            print(f"   {processes:<12}{enqueue_rate:>12,.0f}{dequeue_rate:>12,.0f}  "
+                  f"{'yes' if consistent else 'NO'}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
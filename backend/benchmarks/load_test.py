@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""HTTP Load Test - Concurrent mixed read/write traffic against a running API
+Usage: python benchmarks/load_test.py [--url URL | --start flask|asgi] [--profile NAME]
+                                      [--concurrency N] [--duration S] [--seed N]
+                                      [--json PATH] [--compare PATH]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_asgi import start_server, wait_until_up
+from bench_journal import make_person
+from results import summarize, save, compare
+
+# Operation name -> weight; weights are relative within a profile
+PROFILES = {
+    'read-heavy': {'stats': 40, 'page': 25, 'lookup': 25, 'state': 2, 'enqueue': 5, 'dequeue': 3},
+    'mixed': {'stats': 20, 'page': 15, 'lookup': 15, 'enqueue': 25, 'dequeue': 15, 'remove': 10},
+    'write-heavy': {'stats': 5, 'lookup': 5, 'enqueue': 50, 'dequeue': 25, 'remove': 15},
+}
+
+
+async def http(host, port, method, path, body=None):
+    """Send one request on a fresh connection; returns the status code"""
+    reader, writer = await asyncio.open_connection(host, port)
+    head = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+    if body is not None:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+    writer.write(head.encode() + b"\r\n" + (body or b""))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    await reader.read()
+    writer.close()
+    return status
+
+
+class Traffic:
+    """Builds requests for each operation, tracking which certificates are probably queued"""
+
+    def __init__(self, seed):
+        self.ids = itertools.count(seed)
+        self.known = [f"LC{i:07d}" for i in range(seed)]
+
+    def cert(self):
+        return random.choice(self.known) if self.known else "LC0000000"
+
+    def request(self, operation):
+        if operation == 'stats':
+            return 'GET', '/queue/stats', None
+        if operation == 'page':
+            return 'GET', '/queue?limit=50', None
+        if operation == 'state':
+            return 'GET', '/queue', None
+        if operation == 'lookup':
+            return 'GET', f"/queue/entry/{self.cert()}", None
+        if operation == 'enqueue':
+            person = make_person(next(self.ids))
+            self.known.append(person['life_certificate_no'])
+            return 'POST', '/queue/enqueue', json.dumps(person).encode()
+        if operation == 'dequeue':
+            return 'POST', '/queue/dequeue', None
+        if operation == 'remove':
+            cert_no = "LC0000000"
+            if self.known:
+                cert_no = self.known.pop(random.randrange(len(self.known)))
+            return 'DELETE', f"/queue/entry/{cert_no}", None
+        raise ValueError(f"unknown operation {operation}")
+
+
+async def seed_queue(host, port, count):
+    """Fill the queue through the bulk import endpoint"""
+    for start in range(0, count, 10000):
+        people = range(start, min(count, start + 10000))
+        body = '\n'.join(json.dumps(make_person(i)) for i in people).encode()
+        reader, writer = await asyncio.open_connection(host, port)
+        head = (f"POST /queue/import HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+                f"Content-Type: application/x-ndjson\r\nContent-Length: {len(body)}\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+
+async def run_load(host, port, profile, concurrency, duration, seed):
+    await http(host, port, 'POST', '/queue/clear')
+    await seed_queue(host, port, seed)
+
+    traffic = Traffic(seed)
+    operations, weights = zip(*PROFILES[profile].items())
+    latencies = {operation: [] for operation in operations}
+    errors = {operation: 0 for operation in operations}
+    stop_at = time.monotonic() + duration
+
+    async def client():
+        while time.monotonic() < stop_at:
+            operation = random.choices(operations, weights)[0]
+            method, path, body = traffic.request(operation)
+            started = time.perf_counter()
+            try:
+                status = await http(host, port, method, path, body)
+            except OSError:
+                errors[operation] += 1
+                continue
+            latencies[operation].append(time.perf_counter() - started)
+            # 404s are expected (empty queue, already removed); only server errors count
+            if status >= 500:
+                errors[operation] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    rows = [summarize(latencies[operation], elapsed, errors[operation],
+                      profile=profile, operation=operation)
+            for operation in operations if latencies[operation]]
+    everything = [latency for operation in operations for latency in latencies[operation]]
+    rows.append(summarize(everything, elapsed, sum(errors.values()),
+                          profile=profile, operation='all'))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate concurrent HTTP load against the queue API'
+    )
+    parser.add_argument('--url', default='http://127.0.0.1:5000',
+                        help='API base URL (default: http://127.0.0.1:5000)')
+    parser.add_argument('--start', choices=['flask', 'asgi'],
+                        help='Start a local server on the URL port first')
+    parser.add_argument('--profile', nargs='+', default=['mixed'], choices=list(PROFILES),
+                        help='Traffic mixes to run')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='Concurrent clients (default: 32)')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Seconds per profile (default: 10)')
+    parser.add_argument('--seed', type=int, default=1000,
+                        help='People in queue before each run (default: 1000)')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Compare against a previous --json file')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    server = start_server(args.start, port) if args.start else None
+    try:
+        if server is not None:
+            asyncio.run(wait_until_up(port))
+
+        print(f"\n📊 Load test on {args.url}, {args.concurrency} clients, "
+              f"{args.duration}s per profile\n")
+        print(f"   {'profile':<13}{'operation':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'p99 ms':>10}{'errors':>8}")
+        rows = []
+        for profile in args.profile:
+            load = run_load(host, port, profile, args.concurrency, args.duration, args.seed)
+            for row in asyncio.run(load):
+                print(f"   {row['profile']:<13}{row['operation']:<10}{row['ops_per_sec']:>10,.0f}"
+                      f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+                      f"{row['errors']:>8}")
+                rows.append(row)
+        print()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        save(args.json, 'http_load', vars(args), rows)
+    if args.compare:
+        compare(args.compare, rows, ('profile', 'operation'))
+
+
+if __name__ == "__main__":
+    main()
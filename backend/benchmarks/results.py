@@ -0,0 +1,96 @@
+"""
+Shared helpers for benchmark results - latency summaries and JSON files to diff between runs
+"""
+
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+
+def percentile(ordered, fraction):
+    """Value at ``fraction`` (0-1) of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies, elapsed, errors=0, **labels):
+    """One result row: labels plus count, rate and latency percentiles in milliseconds"""
+    ordered = sorted(latencies)
+    row = dict(labels)
+    row.update({
+        'count': len(ordered),
+        'errors': errors,
+        'ops_per_sec': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 4),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 4),
+    })
+    return row
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save(path, benchmark, params, rows):
+    with open(path, 'w') as f:
+        json.dump({
+            'benchmark': benchmark,
+            'recorded_at': datetime.utcnow().isoformat() + "Z",
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'params': params,
+            'results': rows
+        }, f, indent=2)
+    print(f"💾 Results written to {path}")
+
+
+def compare(path, rows, keys):
+    """Print how each row's rate and p99 moved against a saved run, matching rows on ``keys``"""
+    with open(path) as f:
+        baseline = {tuple(row.get(key) for key in keys): row for row in json.load(f)['results']}
+
+    print(f"\n📈 Against {path}\n")
+    print(f"   {'case':<28}{'ops/s':>10}{'change':>9}{'p99 ms':>10}{'change':>9}")
+    for row in rows:
+        before = baseline.get(tuple(row.get(key) for key in keys))
+        if before is None:
+            continue
+        case = ' '.join(str(row.get(key)) for key in keys)
+        rate_change = change(before['ops_per_sec'], row['ops_per_sec'])
+        p99_change = change(before['p99_ms'], row['p99_ms'])
+        print(f"   {case:<28}{row['ops_per_sec']:>10,.0f}{rate_change:>9}"
+              f"{row['p99_ms']:>10.3f}{p99_change:>9}")
+    print()
+
+
+def change(before, after):
+    if not before:
+        return 'n/a'
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+class Stopwatch:
+    """Collects per-operation latencies with perf_counter"""
+
+    def __init__(self):
+        self.latencies = []
+
+    def time(self, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        self.latencies.append(time.perf_counter() - started)
+        return result
+
+    @property
+    def elapsed(self):
+        """Time spent inside timed calls only, so set-up work between them doesn't count"""
+        return sum(self.latencies)
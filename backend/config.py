@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -7,12 +8,91 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key'
     JSON_SORT_KEYS = False
-    JSONIFY_PRETTYPRINT_REGULAR = True
+    # Indented JSON responses; cached GETs also take ?pretty=1
+    JSON_PRETTY = os.environ.get('JSON_PRETTY', 'false').lower() == 'true'
+    # JSON responses at least this large are compressed for clients that accept gzip or brotli
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
     CORS_ENABLED = os.environ.get('CORS_ENABLED', 'true').lower() == 'true'
     HOST = os.environ.get('HOST', '0.0.0.0')
     PORT = int(os.environ.get('PORT', 5000))
     DEBUG = os.environ.get('DEBUG', 'true').lower() == 'true'
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
+    # Queue storage: 'memory' (single process) or 'sqlite' (shared across worker processes)
+    QUEUE_BACKEND = os.environ.get('QUEUE_BACKEND', 'memory').lower()
+    SQLITE_PATH = os.environ.get('SQLITE_PATH', 'queue.db')
+    # Durable queue journal for the memory backend; empty JOURNAL_DIR keeps the queue in memory only
+    JOURNAL_DIR = os.environ.get('JOURNAL_DIR', '')
+    JOURNAL_SYNC = os.environ.get('JOURNAL_SYNC', 'true').lower() == 'true'
+    JOURNAL_SNAPSHOT_EVERY = int(os.environ.get('JOURNAL_SNAPSHOT_EVERY', 10000))
+    # Wait-time estimates: seconds per person until service is observed, and how fast they adapt
+    SERVICE_TIME_SECONDS = float(os.environ.get('SERVICE_TIME_SECONDS', 300))
+    SERVICE_TIME_SMOOTHING = float(os.environ.get('SERVICE_TIME_SMOOTHING', 0.2))
+    # Booking slots of SLOT_MINUTES each; SLOT_CAPACITY 0 = unlimited
+    SLOT_MINUTES = int(os.environ.get('SLOT_MINUTES', 30))
+    SLOT_OPENING = os.environ.get('SLOT_OPENING', '09:00')
+    SLOT_CLOSING = os.environ.get('SLOT_CLOSING', '17:00')
+    SLOT_CAPACITY = int(os.environ.get('SLOT_CAPACITY', 0))
+    # Serving-order index of the memory backend: 'ranked' (skip list) or 'buckets' (bucket queue)
+    QUEUE_ENGINE = os.environ.get('QUEUE_ENGINE', 'ranked').lower()
+    # Priority levels: comma-separated minimum ages, oldest first, for levels 0, 1, ...
+    # PRIORITY_DISABILITY_LEVEL caps the level of people with a disability (empty = none)
+    PRIORITY_AGE_BANDS = [int(age) for age in os.environ.get('PRIORITY_AGE_BANDS', '80').split(',')
+                          if age.strip()]
+    PRIORITY_DISABILITY_LEVEL = int(os.environ['PRIORITY_DISABILITY_LEVEL']) \
+        if os.environ.get('PRIORITY_DISABILITY_LEVEL', '').strip() else None
+    # Memory backend: waiting people move up a level every PRIORITY_AGING_SECONDS (0 = never),
+    # up to PRIORITY_AGING_FLOOR
+    PRIORITY_AGING_SECONDS = float(os.environ.get('PRIORITY_AGING_SECONDS', 0))
+    PRIORITY_AGING_FLOOR = int(os.environ.get('PRIORITY_AGING_FLOOR', 0))
+    # Memory backend history: day files in HISTORY_DIR, or the last HISTORY_CAPACITY in memory
+    HISTORY_DIR = os.environ.get('HISTORY_DIR', '')
+    HISTORY_CAPACITY = int(os.environ.get('HISTORY_CAPACITY', 100000))
+    # /queue/... is DEFAULT_BRANCH, /queue/<branch>/... one of the comma-separated BRANCHES.
+    # Idle branches unload after BRANCH_IDLE_SECONDS or beyond MAX_LOADED_BRANCHES (0 = no limit)
+    DEFAULT_BRANCH = os.environ.get('DEFAULT_BRANCH', 'default')
+    BRANCHES = os.environ.get('BRANCHES', '')
+    BRANCH_IDLE_SECONDS = float(os.environ.get('BRANCH_IDLE_SECONDS', 900))
+    MAX_LOADED_BRANCHES = int(os.environ.get('MAX_LOADED_BRANCHES', 0))
+    # Bookings whose slot ended EXPIRY_GRACE_MINUTES ago expire (empty = never), swept every
+    # EXPIRY_INTERVAL_SECONDS, EXPIRY_BATCH at a time, in BOOKING_TIMEZONE (empty = server's)
+    EXPIRY_GRACE_MINUTES = float(os.environ['EXPIRY_GRACE_MINUTES']) \
+        if os.environ.get('EXPIRY_GRACE_MINUTES', '').strip() else None
+    EXPIRY_INTERVAL_SECONDS = float(os.environ.get('EXPIRY_INTERVAL_SECONDS', 60))
+    EXPIRY_BATCH = int(os.environ.get('EXPIRY_BATCH', 500))
+    BOOKING_TIMEZONE = os.environ.get('BOOKING_TIMEZONE', '')
+    # Admission control for /queue routes; 0 turns each limit off. QUEUE_CAPACITY is per branch,
+    # the rate limits per client IP and route (overridden in RATE_LIMITS), and behind
+    # TRUSTED_PROXIES reverse proxies the client IP comes from X-Forwarded-For
+    QUEUE_CAPACITY = int(os.environ.get('QUEUE_CAPACITY', 0))
+    RATE_LIMIT_PER_SECOND = float(os.environ.get('RATE_LIMIT_PER_SECOND', 0))
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 20))
+    RATE_LIMIT_CLIENTS = int(os.environ.get('RATE_LIMIT_CLIENTS', 10000))
+    MAX_CONCURRENT_REQUESTS = int(os.environ.get('MAX_CONCURRENT_REQUESTS', 0))
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+    
+    @staticmethod
+    def get_service_counters():
+        """Service counters to create at startup, as a JSON object of name -> config"""
+        counters = os.environ.get('SERVICE_COUNTERS', '')
+        return json.loads(counters) if counters else {}
+    
+    @staticmethod
+    def get_rate_limits():
+        """Per-route rate limits, as a JSON object of route name -> {rate, burst}"""
+        limits = os.environ.get('RATE_LIMITS', '')
+        return json.loads(limits) if limits else {}
+    
+    @staticmethod
+    def get_slot_capacities():
+        """Per-slot capacity overrides, as JSON of 'HH:MM' or 'YYYY-MM-DD HH:MM' -> places"""
+        capacities = os.environ.get('SLOT_CAPACITIES', '')
+        return json.loads(capacities) if capacities else {}
+    
+    @staticmethod
+    def get_branches():
+        """Branches that may be created, from the comma-separated BRANCHES, plus DEFAULT_BRANCH"""
+        names = {name.strip() for name in Config.BRANCHES.split(',') if name.strip()}
+        return names | {Config.DEFAULT_BRANCH}
     
     @staticmethod
     def get_cors_origins():
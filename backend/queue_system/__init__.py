@@ -1,3 +1,14 @@
+from .eta import ServiceTimeEstimator
+from .expiry import ExpirySweeper
+from .history import HistoryStore
+from .journal import Journal
 from .manager import QueueManager
+from .priority import PriorityPolicy
+from .registry import QueueRegistry
+from .slots import SlotSchedule
+from .sqlite_manager import SQLiteQueueManager
 
-__all__ = ['QueueManager']
+__all__ = [
+    'ExpirySweeper', 'HistoryStore', 'Journal', 'PriorityPolicy', 'QueueManager', 'QueueRegistry',
+    'ServiceTimeEstimator', 'SlotSchedule', 'SQLiteQueueManager'
+]
@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from .utils import VERIFICATION_MODES
+
+PRIORITY_LEVELS = (0, 1)
+
+
+class ServiceCounter:
+    """A named service counter, the modes and priorities it serves and its mode weights"""
+
+    def __init__(
+        self,
+        name: str,
+        modes: Optional[List[str]] = None,
+        priorities: Optional[List[int]] = None,
+        weights: Optional[Dict[str, int]] = None
+    ):
+        self.name = name
+        self.modes = list(modes) if modes else list(VERIFICATION_MODES)
+        self.priorities = sorted(priorities) if priorities else None
+        self.weights = dict(weights) if weights else None
+        self.current = {mode: 0 for mode in self.modes}
+
+    @classmethod
+    def from_config(cls, name: str, config: Any, levels: Sequence[int] = PRIORITY_LEVELS
+                    ) -> tuple[bool, str, Optional['ServiceCounter']]:
+        if not isinstance(config, dict):
+            return False, "Counter configuration must be a JSON object", None
+
+        modes = config.get('modes')
+        if modes is not None:
+            if not isinstance(modes, list) or not modes or \
+                    any(mode not in VERIFICATION_MODES for mode in modes):
+                choices = ', '.join(VERIFICATION_MODES)
+                return False, f"modes must be a non-empty list of {choices}", None
+
+        priorities = config.get('priorities')
+        if priorities is not None:
+            if not isinstance(priorities, list) or not priorities or \
+                    any(priority not in levels for priority in priorities):
+                return False, f"priorities must be a non-empty list of {tuple(levels)}", None
+
+        weights = config.get('weights')
+        if weights is not None:
+            if not isinstance(weights, dict) or any(
+                    mode not in (modes or VERIFICATION_MODES)
+                    or not isinstance(weight, int) or weight < 1
+                    for mode, weight in weights.items()):
+                return False, "weights must map the counter's modes to positive integers", None
+
+        return True, "Counter configured", cls(name, modes, priorities, weights)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'modes': self.modes,
+            'priorities': self.priorities,
+            'weights': self.weights
+        }
+
+    def pick(self, heads: Dict[str, Any]) -> str:
+        """Choose which mode's head entry to serve next from ``heads``, mode -> entry"""
+        if self.weights is None or len(heads) == 1:
+            return min(heads, key=lambda mode: heads[mode])
+
+        total = 0
+        for mode in heads:
+            weight = self.weights.get(mode, 1)
+            self.current[mode] += weight
+            total += weight
+        chosen = max(heads, key=lambda mode: self.current[mode])
+        self.current[chosen] -= total
+        return chosen
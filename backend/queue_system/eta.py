@@ -0,0 +1,105 @@
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .utils import VERIFICATION_MODES
+
+
+def eta_minutes(people_ahead: int, seconds_per_person: float) -> int:
+    """Expected wait for someone with ``people_ahead`` people of the same mode in front"""
+    return round(people_ahead * seconds_per_person / 60)
+
+
+class ServiceTimeEstimator:
+    """Exponentially weighted service intervals per verification mode and counter"""
+
+    def __init__(self, default_seconds: float = 300, smoothing: float = 0.2,
+                 outlier_factor: float = 5):
+        self.default_seconds = default_seconds
+        self.smoothing = smoothing
+        self.outlier_factor = outlier_factor
+        self.mode_seconds: Dict[str, Optional[float]] = {mode: None for mode in VERIFICATION_MODES}
+        self.counter_seconds: Dict[str, float] = {}
+        self._last_served: Dict[str, Optional[float]] = {mode: None for mode in VERIFICATION_MODES}
+        self._busy_since: Dict[str, Optional[float]] = {mode: None for mode in VERIFICATION_MODES}
+        self._counter_last_served: Dict[str, float] = {}
+
+    def _smooth(self, current: Optional[float], sample: float) -> Optional[float]:
+        baseline = self.default_seconds if current is None else current
+        if sample > baseline * self.outlier_factor:
+            return current
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    @staticmethod
+    def _latest(*times: Optional[float]) -> Optional[float]:
+        known = [t for t in times if t is not None]
+        return max(known) if known else None
+
+    def waiting(self, mode: str, now: Optional[float] = None):
+        """Someone of ``mode`` is waiting; starts that lane's clock if it was idle"""
+        if self._busy_since[mode] is None:
+            self._busy_since[mode] = time.time() if now is None else now
+
+    def idle(self, mode: str):
+        """Nobody of ``mode`` is left waiting; stops that lane's clock"""
+        self._busy_since[mode] = None
+
+    def served(self, modes: Iterable[str], counter: Optional[str] = None,
+               now: Optional[float] = None):
+        """Record one dequeue serving people of ``modes``; call before ``idle`` for emptied lanes"""
+        now = time.time() if now is None else now
+        counts: Dict[str, int] = {}
+        for mode in modes:
+            counts[mode] = counts.get(mode, 0) + 1
+
+        for mode, count in counts.items():
+            started = self._last_served[mode]
+            if started is not None:
+                started = self._latest(started, self._busy_since[mode])
+                sample = (now - started) / count
+                self.mode_seconds[mode] = self._smooth(self.mode_seconds[mode], sample)
+            self._last_served[mode] = now
+
+        if counter is not None:
+            # A counter left idle by empty lanes is timed from when they filled again
+            started = self._counter_last_served.get(counter)
+            if started is not None:
+                started = self._latest(started, *(self._busy_since[mode] for mode in counts))
+                sample = (now - started) / sum(counts.values())
+                seconds = self._smooth(self.counter_seconds.get(counter), sample)
+                if seconds is not None:
+                    self.counter_seconds[counter] = seconds
+            self._counter_last_served[counter] = now
+
+    def seconds_per_person(self, mode: str) -> float:
+        seconds = self.mode_seconds.get(mode)
+        return self.default_seconds if seconds is None else seconds
+
+    def rates(self) -> Dict[str, float]:
+        """Seconds per person for every mode, for computing ETAs outside the lock"""
+        return {mode: self.seconds_per_person(mode) for mode in self.mode_seconds}
+
+    def counter_service_seconds(self, counter: str) -> Optional[float]:
+        seconds = self.counter_seconds.get(counter)
+        return None if seconds is None else round(seconds, 1)
+
+    def forget_counter(self, counter: str):
+        self.counter_seconds.pop(counter, None)
+        self._counter_last_served.pop(counter, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'mode_seconds': self.mode_seconds,
+            'counter_seconds': self.counter_seconds,
+            'last_served': self._last_served,
+            'busy_since': self._busy_since,
+            'counter_last_served': self._counter_last_served
+        }
+
+    def load(self, state: Dict[str, Any]):
+        self.mode_seconds.update(state.get('mode_seconds', {}))
+        self.counter_seconds.update(state.get('counter_seconds', {}))
+        self._last_served.update(state.get('last_served', {}))
+        self._busy_since.update(state.get('busy_since', {}))
+        self._counter_last_served.update(state.get('counter_last_served', {}))
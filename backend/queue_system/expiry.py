@@ -0,0 +1,60 @@
+import logging
+from datetime import datetime, timedelta
+from threading import Event, Thread
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweeper:
+    """Expires stale bookings in every loaded branch from one background thread"""
+
+    def __init__(self, registry, grace_minutes: float, interval: float = 60, batch: int = 500,
+                 timezone: Optional[str] = None):
+        self._registry = registry
+        self.grace_minutes = grace_minutes
+        self.interval = interval
+        self.batch = batch
+        self._timezone = ZoneInfo(timezone) if timezone else None
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def cutoff(self) -> datetime:
+        """Wall-clock time bookings must have ended by to expire now"""
+        now = datetime.now(self._timezone).replace(tzinfo=None)
+        return now - timedelta(minutes=self.grace_minutes)
+
+    def sweep(self) -> int:
+        """Expire stale bookings in every loaded branch now; returns how many"""
+        cutoff = self.cutoff()
+        expired = 0
+        for name in self._registry.loaded():
+            with self._registry.borrow(name) as manager:
+                if manager is None:
+                    continue
+                try:
+                    has_more = True
+                    while has_more and not self._stopped.is_set():
+                        _, _, result = manager.expire_stale(cutoff, self.batch)
+                        expired += len(result['life_certificate_nos'])
+                        has_more = result['has_more']
+                except Exception:
+                    # One branch failing (a locked database, say) must not stop the others
+                    logger.exception("Expiring stale bookings in branch %s failed", name)
+        return expired
+
+    def start(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='queue-expiry', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sweep()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
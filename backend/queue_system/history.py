@@ -0,0 +1,465 @@
+import json
+import os
+import re
+import struct
+import time
+from array import array
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .utils import VERIFICATION_MODES
+
+OUTCOMES = ('served', 'removed', 'expired')
+
+# finished_at, enqueued_at, offset of the record's text, life_certificate_no and counter
+# lengths, mode, priority, outcome; the text (certificate number then counter name, UTF-8)
+# lives in the day's text file so records stay fixed-width whatever the lengths
+RECORD = struct.Struct('<ddQIIBBB5x')
+DAY_FILE_PATTERN = re.compile(r'^history-(\d{4}-\d{2}-\d{2})\.bin$')
+
+Record = Tuple[float, float, str, Optional[str], int, int, int]
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Epoch seconds of a YYYY-MM-DD date or ISO datetime (UTC unless it says otherwise)"""
+    try:
+        moment = datetime.fromisoformat(value[:-1] if value.endswith('Z') else value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def format_timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def _day_of(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).date().isoformat()
+
+
+def validate_query(start: Optional[str], end: Optional[str], outcome: Optional[str] = None,
+                   mode: Optional[str] = None, by: Optional[str] = None,
+                   default_days: int = 1) -> tuple[bool, str, Optional[Tuple[float, float]]]:
+    """Check history query parameters and turn ``from``/``to`` into an epoch [start, end)"""
+    end_at = parse_timestamp(end) if end is not None else datetime.now(timezone.utc).timestamp()
+    if end_at is None:
+        return False, "to must be a YYYY-MM-DD date or ISO datetime", None
+    start_at = parse_timestamp(start) if start is not None else end_at - default_days * 86400
+    if start_at is None:
+        return False, "from must be a YYYY-MM-DD date or ISO datetime", None
+    if start_at >= end_at:
+        return False, "from must be before to", None
+    if outcome is not None and outcome not in OUTCOMES:
+        return False, f"outcome must be one of {', '.join(OUTCOMES)}", None
+    if mode is not None and mode not in VERIFICATION_MODES:
+        return False, "verification_mode must be 'presence' or 'online'", None
+    if by is not None and by not in ('day', 'hour'):
+        return False, "by must be 'day' or 'hour'", None
+    return True, "", (start_at, end_at)
+
+
+def record_dict(finished_at: float, enqueued_at: float, cert_no: str, counter: Optional[str],
+                mode: str, priority: int, outcome: str) -> Dict[str, Any]:
+    return {
+        'life_certificate_no': cert_no,
+        'verification_mode': mode,
+        'priority': priority,
+        'outcome': outcome,
+        'counter': counter,
+        'enqueued_at': format_timestamp(enqueued_at),
+        'finished_at': format_timestamp(finished_at),
+        'wait_minutes': round(max(finished_at - enqueued_at, 0.0) / 60, 1)
+    }
+
+
+class HourStats:
+    """Counts and waits for one hour of history"""
+    __slots__ = ('outcomes', 'served_by_mode', 'wait_sum', 'wait_max')
+
+    def __init__(self):
+        self.outcomes = [0] * len(OUTCOMES)
+        self.served_by_mode = [0] * len(VERIFICATION_MODES)
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+
+    def add(self, record: Record):
+        finished_at, enqueued_at, _, _, mode, _, outcome = record
+        self.outcomes[outcome] += 1
+        if OUTCOMES[outcome] == 'served':
+            wait = max(finished_at - enqueued_at, 0.0)
+            self.served_by_mode[mode] += 1
+            self.wait_sum += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def add_count(self, outcome: str, mode: str, count: int, wait_sum: float, wait_max: float):
+        """Fold in a pre-aggregated group of records with one outcome and mode"""
+        self.outcomes[OUTCOMES.index(outcome)] += count
+        if outcome == 'served':
+            self.served_by_mode[VERIFICATION_MODES.index(mode)] += count
+            self.wait_sum += wait_sum
+            self.wait_max = max(self.wait_max, wait_max)
+
+    def merge(self, other: 'HourStats'):
+        for index, count in enumerate(other.outcomes):
+            self.outcomes[index] += count
+        for index, count in enumerate(other.served_by_mode):
+            self.served_by_mode[index] += count
+        self.wait_sum += other.wait_sum
+        self.wait_max = max(self.wait_max, other.wait_max)
+
+    def to_state(self) -> list:
+        return [self.outcomes, self.served_by_mode, self.wait_sum, self.wait_max]
+
+    @classmethod
+    def from_state(cls, state: list) -> 'HourStats':
+        stats = cls()
+        outcomes, stats.served_by_mode, stats.wait_sum, stats.wait_max = state
+        # Rollups saved before an outcome existed have no count for it
+        stats.outcomes = outcomes + [0] * (len(OUTCOMES) - len(outcomes))
+        return stats
+
+    def to_dict(self, period: str) -> Dict[str, Any]:
+        served = self.outcomes[OUTCOMES.index('served')]
+        result = {'period': period}
+        result.update(zip(OUTCOMES, self.outcomes))
+        result['served_by_mode'] = dict(zip(VERIFICATION_MODES, self.served_by_mode))
+        result['average_wait_minutes'] = round(self.wait_sum / served / 60, 1) if served else None
+        result['max_wait_minutes'] = round(self.wait_max / 60, 1) if served else None
+        return result
+
+
+def summarize_hours(hours: Iterable[Tuple[int, HourStats]], start: float, end: float,
+                    by: str) -> Dict[str, Any]:
+    """Hourly rollups, in hour order, grouped by hour or UTC day, plus totals over them all"""
+    periods: Dict[str, HourStats] = {}
+    totals = HourStats()
+    for hour, stats in hours:
+        period = format_timestamp(hour) if by == 'hour' else _day_of(hour)
+        if period not in periods:
+            periods[period] = HourStats()
+        periods[period].merge(stats)
+        totals.merge(stats)
+    return {
+        'from': format_timestamp(start),
+        'to': format_timestamp(end),
+        'by': by,
+        'totals': totals.to_dict('total'),
+        'periods': [stats.to_dict(period) for period, stats in periods.items()]
+    }
+
+
+class _RingBuffer:
+    """The most recent records, one typed array per column, oldest overwritten first"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._finished = array('d', bytes(8 * capacity))
+        self._enqueued = array('d', bytes(8 * capacity))
+        self._modes = array('B', bytes(capacity))
+        self._priorities = array('B', bytes(capacity))
+        self._outcomes = array('B', bytes(capacity))
+        self._certs: List[Optional[str]] = [None] * capacity
+        self._counters: List[Optional[str]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, record: Record):
+        if self._size < self.capacity:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        (self._finished[slot], self._enqueued[slot], self._certs[slot], self._counters[slot],
+         self._modes[slot], self._priorities[slot], self._outcomes[slot]) = record
+
+    def _bisect(self, timestamp: float) -> int:
+        """Logical index of the first record finished at or after ``timestamp``"""
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._finished[(self._start + middle) % self.capacity] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def scan(self, start: float, end: float) -> Iterator[Record]:
+        """Records finished in [start, end) among those ``extents`` counted"""
+        first, last = self._bisect(start), self._bisect(end)
+        columns = (self._finished, self._enqueued, self._certs, self._counters,
+                   self._modes, self._priorities, self._outcomes)
+        begin = (self._start + first) % self.capacity
+        length = last - first
+        if begin + length <= self.capacity:
+            return zip(*(column[begin:begin + length] for column in columns))
+        wrapped = length - (self.capacity - begin)
+        return zip(*(column[begin:] + column[:wrapped] for column in columns))
+
+    def oldest(self) -> Optional[float]:
+        return self._finished[self._start] if self._size else None
+
+
+class _DayFiles:
+    """Append-only fixed-width record files, one per UTC day, each with a text file"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._day: Optional[str] = None
+        self._file = None
+        self._text = None
+        self._text_size = 0
+
+    def path(self, day: str) -> str:
+        return os.path.join(self.directory, f'history-{day}.bin')
+
+    def text_path(self, day: str) -> str:
+        return os.path.join(self.directory, f'history-{day}.txt')
+
+    def days(self) -> List[str]:
+        matches = map(DAY_FILE_PATTERN.match, os.listdir(self.directory))
+        return sorted(match.group(1) for match in matches if match)
+
+    def append(self, record: Record):
+        day = _day_of(record[0])
+        if day != self._day:
+            self.close()
+            self._file = open(self.path(day), 'ab')
+            # Drop a record torn by a crash so the file stays aligned; its text is left unused
+            self._file.truncate(self._file.tell() - self._file.tell() % RECORD.size)
+            self._text = open(self.text_path(day), 'ab')
+            self._text_size = self._text.tell()
+            self._day = day
+        finished_at, enqueued_at, cert_no, counter, mode, priority, outcome = record
+        cert_bytes, counter_bytes = cert_no.encode(), (counter or '').encode()
+        # Text first, so a record on disk never points past the end of its text file
+        self._text.write(cert_bytes + counter_bytes)
+        self._text.flush()
+        self._file.write(RECORD.pack(finished_at, enqueued_at, self._text_size, len(cert_bytes),
+                                     len(counter_bytes), mode, priority, outcome))
+        self._file.flush()
+        self._text_size += len(cert_bytes) + len(counter_bytes)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._text.close()
+            self._file = None
+            self._text = None
+            self._day = None
+
+    def last_finished(self, day: str) -> float:
+        with open(self.path(day), 'rb') as f:
+            count = os.fstat(f.fileno()).st_size // RECORD.size
+            if not count:
+                return 0.0
+            f.seek((count - 1) * RECORD.size)
+            return struct.unpack('<d', f.read(8))[0]
+
+    @staticmethod
+    def _unpack(raw: bytes, text) -> Iterator[Record]:
+        """Records of a run of packed records, with their text read from ``text`` in one go"""
+        records = list(RECORD.iter_unpack(raw))
+        if not records:
+            return
+        start = records[0][2]
+        last = records[-1]
+        text.seek(start)
+        span = text.read(last[2] + last[3] + last[4] - start)
+        for finished_at, enqueued_at, offset, cert_length, counter_length, *codes in records:
+            offset -= start
+            cert_no = span[offset:offset + cert_length].decode()
+            counter = span[offset + cert_length:offset + cert_length + counter_length].decode()
+            yield (finished_at, enqueued_at, cert_no, counter or None, *codes)
+
+    def read_all(self, day: str) -> Iterator[Record]:
+        with open(self.path(day), 'rb') as f, open(self.text_path(day), 'rb') as text:
+            while True:
+                chunk = f.read(RECORD.size * 4096)
+                if not chunk:
+                    return
+                yield from self._unpack(chunk[:len(chunk) - len(chunk) % RECORD.size], text)
+
+    def extents(self, start: float, end: float) -> List[Tuple[str, int]]:
+        """(day, records written so far) for each day file overlapping [start, end)"""
+        extents = []
+        for day in self.days():
+            day_start = parse_timestamp(day)
+            if day_start + 86400 <= start or day_start >= end:
+                continue
+            extents.append((day, os.path.getsize(self.path(day)) // RECORD.size))
+        return extents
+
+    def scan(self, start: float, end: float, extents: List[Tuple[str, int]]) -> Iterator[Record]:
+        """Records finished in [start, end) among the counted ``extents``, safe during appends"""
+        for day, count in extents:
+            with open(self.path(day), 'rb') as f, open(self.text_path(day), 'rb') as text:
+
+                def finished_at(index: int) -> float:
+                    f.seek(index * RECORD.size)
+                    return struct.unpack('<d', f.read(8))[0]
+
+                def bisect(timestamp: float) -> int:
+                    low, high = 0, count
+                    while low < high:
+                        middle = (low + high) // 2
+                        if finished_at(middle) < timestamp:
+                            low = middle + 1
+                        else:
+                            high = middle
+                    return low
+
+                first, last = bisect(start), bisect(end)
+                f.seek(first * RECORD.size)
+                while first < last:
+                    batch = min(last - first, 4096)
+                    yield from self._unpack(f.read(batch * RECORD.size), text)
+                    first += batch
+
+
+class HistoryStore:
+    """Served and removed entries, with hourly rollups for analytics"""
+
+    def __init__(self, directory: Optional[str] = None, capacity: int = 100000):
+        self._lock = Lock()
+        self._hours: Dict[int, HourStats] = {}
+        self._last_finished = 0.0
+        self._files = _DayFiles(directory) if directory else None
+        self._ring = None if directory else _RingBuffer(capacity)
+        if self._files is not None:
+            self._load_rollups()
+
+    def _summary_path(self, day: str) -> str:
+        return os.path.join(self._files.directory, f'history-{day}.json')
+
+    def _load_rollups(self):
+        days = self._files.days()
+        for day in days:
+            records = os.path.getsize(self._files.path(day)) // RECORD.size
+            summary = None
+            if os.path.exists(self._summary_path(day)):
+                with open(self._summary_path(day)) as f:
+                    summary = json.load(f)
+            if summary is not None and summary['records'] == records:
+                for hour, state in summary['hours'].items():
+                    self._hours[int(hour)] = HourStats.from_state(state)
+            else:
+                for record in self._files.read_all(day):
+                    self._add_to_rollup(record)
+                if day != days[-1]:
+                    self._save_rollup(day)
+        if days:
+            self._last_finished = self._files.last_finished(days[-1])
+
+    def _save_rollup(self, day: str):
+        day_start = int(parse_timestamp(day))
+        hours = {hour: stats.to_state() for hour, stats in self._hours.items()
+                 if day_start <= hour < day_start + 86400}
+        records = os.path.getsize(self._files.path(day)) // RECORD.size
+        with open(self._summary_path(day), 'w') as f:
+            json.dump({'records': records, 'hours': hours}, f)
+
+    def _add_to_rollup(self, record: Record):
+        hour = int(record[0] // 3600 * 3600)
+        stats = self._hours.get(hour)
+        if stats is None:
+            stats = self._hours[hour] = HourStats()
+        stats.add(record)
+
+    def record(self, entry, outcome: str, counter: Optional[str] = None,
+               finished_at: Optional[float] = None):
+        """Archive an entry that has left the queue"""
+        self.record_many([entry], outcome, counter, finished_at)
+
+    def record_many(self, entries, outcome: str, counter: Optional[str] = None,
+                    finished_at: Optional[float] = None):
+        """Archive entries that left the queue together, in order"""
+        if not entries:
+            return
+        finished_at = finished_at or time.time()
+        records = [(parse_timestamp(entry.created_at) or 0.0, entry.life_certificate_no,
+                    VERIFICATION_MODES.index(entry.verification_mode), entry.priority)
+                   for entry in entries]
+        outcome_code = OUTCOMES.index(outcome)
+        with self._lock:
+            # Keep finishing times non-decreasing so the record order stays a time index
+            finished_at = max(finished_at, self._last_finished)
+            if self._files is not None and self._last_finished \
+                    and _day_of(finished_at) != _day_of(self._last_finished):
+                self._files.close()
+                self._save_rollup(_day_of(self._last_finished))
+            self._last_finished = finished_at
+            for enqueued_at, cert_no, mode_code, priority in records:
+                record = (finished_at, enqueued_at, cert_no, counter, mode_code, priority,
+                          outcome_code)
+                if self._files is not None:
+                    self._files.append(record)
+                else:
+                    self._ring.append(record)
+                self._add_to_rollup(record)
+
+    def query(self, start: float, end: float, outcome: Optional[str] = None,
+              mode: Optional[str] = None, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Records finished in [start, end), oldest first"""
+        results = []
+        skipped = 0
+        has_more = False
+        # Only the extent of the range is taken under the lock; the scan runs outside it
+        with self._lock:
+            if self._files is not None:
+                extents = self._files.extents(start, end)
+                oldest = None
+            else:
+                records = self._ring.scan(start, end)
+                oldest = self._ring.oldest()
+        if self._files is not None:
+            records = self._files.scan(start, end, extents)
+        for (finished_at, enqueued_at, cert_no, counter, mode_code, priority,
+             outcome_code) in records:
+            record_outcome, record_mode = OUTCOMES[outcome_code], VERIFICATION_MODES[mode_code]
+            if outcome is not None and record_outcome != outcome:
+                continue
+            if mode is not None and record_mode != mode:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if len(results) == limit:
+                has_more = True
+                break
+            results.append(record_dict(finished_at, enqueued_at, cert_no, counter, record_mode,
+                                       priority, record_outcome))
+        return {
+            'from': format_timestamp(start),
+            'to': format_timestamp(end),
+            'offset': offset,
+            'limit': limit,
+            'has_more': has_more,
+            # Without a history directory only the most recent records are kept
+            'retained_from': format_timestamp(oldest) if oldest is not None else None,
+            'records': results
+        }
+
+    def stats(self, start: float, end: float, by: str = 'day') -> Dict[str, Any]:
+        """Hourly or daily rollups for [start, end), plus totals over the whole range"""
+        with self._lock:
+            hours = [(hour, self._hours[hour]) for hour in sorted(self._hours)
+                     if start <= hour < end]
+            return summarize_hours(hours, start, end, by)
+
+    def loses_on_close(self) -> bool:
+        """Whether close() would drop records, i.e. some are kept only in memory"""
+        with self._lock:
+            return self._ring is not None and len(self._ring) > 0
+
+    def close(self):
+        with self._lock:
+            if self._files is not None:
+                self._files.close()
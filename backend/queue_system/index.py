@@ -0,0 +1,391 @@
+import heapq
+import random
+from bisect import bisect_left
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MAX_LEVEL = 24
+
+
+class _Node:
+    __slots__ = ('key', 'value', 'next', 'width')
+
+    def __init__(self, key: Any, value: Any, level: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional['_Node']] = [None] * level
+        self.width: List[int] = [1] * level
+
+
+class RankedIndex:
+    """Indexable skip list that keeps queue entries in serving order"""
+
+    def __init__(self, key: Optional[Callable[[Any], Any]] = None):
+        self._key = key if key is not None else (lambda value: value)
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        node = self._head.next[0]
+        while node is not None:
+            yield node.value
+            node = node.next[0]
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError('RankedIndex index out of range')
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node.value
+
+    def islice(self, start: int, stop: Optional[int] = None) -> List[Any]:
+        """Values at positions ``start`` up to ``stop`` in O(log n + k)"""
+        stop = self._size if stop is None else min(stop, self._size)
+        if start < 0 or start >= stop:
+            return []
+        node = self._head
+        remaining = start + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        values = []
+        for _ in range(stop - start):
+            values.append(node.value)
+            node = node.next[0]
+        return values
+
+    @staticmethod
+    def _random_level() -> int:
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, value: Any) -> None:
+        key = self._key(value)
+        chain: List[_Node] = [self._head] * MAX_LEVEL
+        steps_at_level = [0] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        height = self._random_level()
+        new_node = _Node(key, value, height)
+        steps = 0
+        for level in range(height):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def update(self, values: List[Any]) -> None:
+        """Insert many values, merging with the current contents in O(n + k log k)"""
+        if len(values) < 64 or len(values) * 8 < self._size:
+            for value in values:
+                self.insert(value)
+            return
+        self._build(list(heapq.merge(self, sorted(values, key=self._key), key=self._key)))
+
+    def _build(self, ordered: List[Any]) -> None:
+        """Rebuild from already ordered values in O(n)"""
+        head = _Node(None, None, MAX_LEVEL)
+        last = [head] * MAX_LEVEL
+        last_position = [0] * MAX_LEVEL
+        for position, value in enumerate(ordered, start=1):
+            node = _Node(self._key(value), value, self._random_level())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level] = node
+                last_position[level] = position
+        for level in range(MAX_LEVEL):
+            last[level].width[level] = len(ordered) + 1 - last_position[level]
+        self._head = head
+        self._size = len(ordered)
+
+    def remove(self, value: Any) -> None:
+        key = self._key(value)
+        chain: List[_Node] = [self._head] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.value is not value:
+            raise KeyError('value not present in RankedIndex')
+
+        height = len(target.next)
+        for level in range(height):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(height, MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def first(self) -> Any:
+        node = self._head.next[0]
+        if node is None:
+            raise IndexError('first from empty RankedIndex')
+        return node.value
+
+    def pop_first(self) -> Any:
+        target = self._head.next[0]
+        if target is None:
+            raise IndexError('pop from empty RankedIndex')
+
+        head = self._head
+        height = len(target.next)
+        for level in range(height):
+            head.width[level] += target.width[level] - 1
+            head.next[level] = target.next[level]
+        for level in range(height, MAX_LEVEL):
+            head.width[level] -= 1
+        self._size -= 1
+        return target.value
+
+    def rank(self, value: Any) -> int:
+        """Number of values ordered strictly before ``value``"""
+        return self.rank_key(self._key(value))
+
+    def rank_key(self, key: Any) -> int:
+        """Number of values whose key is strictly less than ``key``"""
+        position = 0
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def clear(self) -> None:
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._size = 0
+
+
+class _Bucket:
+    __slots__ = ('keys', 'values', 'head')
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.values: List[Any] = []
+        # Entries before head have been served and await compaction
+        self.head = 0
+
+
+class BucketIndex:
+    """Bucket queue with the same interface as RankedIndex"""
+
+    def __init__(self, key: Optional[Callable[[Any], Any]] = None,
+                 bucket: Optional[Callable[[Any], Any]] = None):
+        self._key = key if key is not None else (lambda value: value)
+        self._bucket = bucket if bucket is not None else (lambda key: key)
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        buckets = (self._buckets[bucket_id] for bucket_id in self._ids)
+        return chain.from_iterable(islice(bucket.values, bucket.head, None) for bucket in buckets)
+
+    def _tree(self) -> List[int]:
+        """Fenwick tree of bucket sizes, rebuilt if buckets were added or pruned since last use"""
+        tree = self._fenwick
+        if tree is None:
+            tree = self._fenwick = [0] + self._sizes
+            for index in range(1, len(tree)):
+                parent = index + (index & -index)
+                if parent < len(tree):
+                    tree[parent] += tree[index]
+        return tree
+
+    def _resize(self, position: int, delta: int):
+        self._sizes[position] += delta
+        tree = self._fenwick
+        if tree is not None:
+            index = position + 1
+            while index < len(tree):
+                tree[index] += delta
+                index += index & -index
+
+    def _prefix(self, position: int) -> int:
+        """Number of values in the buckets before ``position``"""
+        tree = self._tree()
+        total = 0
+        while position:
+            total += tree[position]
+            position &= position - 1
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """(bucket position, offset past that bucket's head) of the value at ``index``"""
+        tree = self._tree()
+        position = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            following = position + step
+            if following < len(tree) and tree[following] <= index:
+                position = following
+                index -= tree[following]
+            step >>= 1
+        return position, index
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError('BucketIndex index out of range')
+        position, offset = self._locate(index)
+        bucket = self._buckets[self._ids[position]]
+        return bucket.values[bucket.head + offset]
+
+    def islice(self, start: int, stop: Optional[int] = None) -> List[Any]:
+        """Values at positions ``start`` up to ``stop``, in O(log buckets + buckets spanned + k)"""
+        stop = self._size if stop is None else min(stop, self._size)
+        if start < 0 or start >= stop:
+            return []
+        position, offset = self._locate(start)
+        values = []
+        wanted = stop - start
+        while len(values) < wanted:
+            bucket = self._buckets[self._ids[position]]
+            begin = bucket.head + offset
+            values.extend(bucket.values[begin:begin + wanted - len(values)])
+            position += 1
+            offset = 0
+        return values
+
+    def insert(self, value: Any) -> None:
+        key = self._key(value)
+        bucket_id = self._bucket(key)
+        position = bisect_left(self._ids, bucket_id)
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            bucket = self._buckets[bucket_id] = _Bucket()
+            self._ids.insert(position, bucket_id)
+            self._sizes.insert(position, 0)
+            self._fenwick = None
+            if position <= self._first:
+                self._first = position
+        elif self._sizes[position] == 0:
+            self._empty -= 1
+            if position < self._first:
+                self._first = position
+        keys = bucket.keys
+        if not keys or keys[-1] < key:
+            keys.append(key)
+            bucket.values.append(value)
+        else:
+            index = bisect_left(keys, key, bucket.head)
+            if index == bucket.head and bucket.head:
+                # Reuse a served slot rather than shifting the bucket
+                bucket.head -= 1
+                index -= 1
+                keys[index] = key
+                bucket.values[index] = value
+            else:
+                keys.insert(index, key)
+                bucket.values.insert(index, value)
+        self._resize(position, 1)
+        self._size += 1
+
+    def update(self, values: List[Any]) -> None:
+        """Insert many values; sorting them first keeps every insert an append"""
+        for value in sorted(values, key=self._key):
+            self.insert(value)
+
+    def remove(self, value: Any) -> None:
+        key = self._key(value)
+        bucket_id = self._bucket(key)
+        bucket = self._buckets.get(bucket_id)
+        index = bisect_left(bucket.keys, key, bucket.head) if bucket is not None else 0
+        if bucket is None or index >= len(bucket.keys) or bucket.values[index] is not value:
+            raise KeyError('value not present in BucketIndex')
+        if index == bucket.head:
+            bucket.values[index] = None
+            bucket.head += 1
+            if bucket.head * 2 > len(bucket.keys):
+                del bucket.keys[:bucket.head]
+                del bucket.values[:bucket.head]
+                bucket.head = 0
+        else:
+            del bucket.keys[index]
+            del bucket.values[index]
+        position = bisect_left(self._ids, bucket_id)
+        self._resize(position, -1)
+        self._size -= 1
+        if self._sizes[position] == 0:
+            self._empty += 1
+            while self._first < len(self._ids) and self._sizes[self._first] == 0:
+                self._first += 1
+            if self._empty * 2 > len(self._ids):
+                self._prune()
+
+    def _prune(self):
+        """Drop empty buckets, which also shifts the positions of the rest"""
+        live = [position for position, size in enumerate(self._sizes) if size]
+        for position, bucket_id in enumerate(self._ids):
+            if not self._sizes[position]:
+                del self._buckets[bucket_id]
+        self._ids = [self._ids[position] for position in live]
+        self._sizes = [self._sizes[position] for position in live]
+        self._fenwick = None
+        self._empty = 0
+        self._first = 0
+
+    def first(self) -> Any:
+        if not self._size:
+            raise IndexError('first from empty BucketIndex')
+        bucket = self._buckets[self._ids[self._first]]
+        return bucket.values[bucket.head]
+
+    def pop_first(self) -> Any:
+        value = self.first()
+        self.remove(value)
+        return value
+
+    def rank(self, value: Any) -> int:
+        """Number of values ordered strictly before ``value``"""
+        return self.rank_key(self._key(value))
+
+    def rank_key(self, key: Any) -> int:
+        """Number of values whose key is strictly less than ``key``"""
+        bucket_id = self._bucket(key)
+        position = bisect_left(self._ids, bucket_id)
+        rank = self._prefix(position)
+        if position < len(self._ids) and self._ids[position] == bucket_id:
+            bucket = self._buckets[bucket_id]
+            rank += bisect_left(bucket.keys, key, bucket.head) - bucket.head
+        return rank
+
+    def clear(self) -> None:
+        self._ids: List[Any] = []
+        self._sizes: List[int] = []
+        self._buckets: Dict[Any, _Bucket] = {}
+        # Fenwick tree over _sizes, None until next needed after buckets are added or pruned
+        self._fenwick: Optional[List[int]] = None
+        # Position of the first non-empty bucket, and how many are empty
+        self._first = 0
+        self._empty = 0
+        self._size = 0
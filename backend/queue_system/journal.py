@@ -0,0 +1,167 @@
+import json
+import os
+import re
+from threading import Condition, Thread
+from typing import Any, Dict, List, Optional, Tuple
+
+SEGMENT_PATTERN = re.compile(r'^journal-(\d{8})\.log$')
+SNAPSHOT_FILE = 'snapshot.json'
+
+_ROTATE = object()
+
+
+class Journal:
+    """Append-only log of queue mutations with group-commit fsync and snapshots"""
+
+    def __init__(self, directory: str, sync: bool = True, snapshot_every: int = 10000):
+        self.directory = directory
+        self.sync = sync
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+
+        self._cond = Condition()
+        self._pending: List[Any] = []
+        self._appended = 0
+        self._durable = 0
+        self._closed = False
+        self._snapshot_thread: Optional[Thread] = None
+
+        segments = self._segments()
+        self._segment_no = (segments[-1][0] + 1) if segments else 1
+        self._file = open(self._segment_path(self._segment_no), 'ab')
+        # Segment the writer will be on once every queued rotation is processed
+        self._last_segment_no = self._segment_no
+
+        self._writer = Thread(target=self._write_loop, name='queue-journal', daemon=True)
+        self._writer.start()
+
+    def _segment_path(self, segment_no: int) -> str:
+        return os.path.join(self.directory, f'journal-{segment_no:08d}.log')
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                segments.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    def recover(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Latest snapshot (or None) and the journal records written after it"""
+        snapshot = None
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+
+        first_segment = snapshot['segment'] if snapshot else 0
+        min_version = snapshot['version'] if snapshot else 0
+        records = []
+        for segment_no, path in self._segments():
+            if segment_no < first_segment or segment_no >= self._last_segment_no:
+                continue
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write at the tail of a segment after a crash
+                        break
+                    if record['version'] > min_version:
+                        records.append(record)
+        return snapshot, records
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Queue a record for the writer thread and return its ticket"""
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        with self._cond:
+            self._pending.append(line)
+            self._appended += 1
+            self._cond.notify_all()
+            return self._appended
+
+    def wait(self, ticket: int):
+        """Block until the record with ``ticket`` is fsynced (no-op when not in sync mode)"""
+        if not self.sync or not ticket:
+            return
+        with self._cond:
+            self._cond.wait_for(lambda: self._durable >= ticket or self._closed)
+
+    def snapshot(self, version: int, sequence_counter: int, entries: List[Any]):
+        """Start a background snapshot of state captured under the manager lock"""
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return False
+        with self._cond:
+            self._pending.append(_ROTATE)
+            self._cond.notify_all()
+            self._last_segment_no += 1
+            segment = self._last_segment_no
+        self._snapshot_thread = Thread(
+            target=self._write_snapshot,
+            args=(version, sequence_counter, entries, segment),
+            name='queue-snapshot',
+            daemon=True
+        )
+        self._snapshot_thread.start()
+        return True
+
+    def _write_snapshot(self, version: int, sequence_counter: int, entries: List[Any],
+                        segment: int):
+        state = {
+            'version': version,
+            'sequence_counter': sequence_counter,
+            'segment': segment,
+            'entries': [entry.to_record() for entry in entries]
+        }
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for segment_no, segment_path in self._segments():
+            if segment_no < segment:
+                os.remove(segment_path)
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                batch, self._pending = self._pending, []
+                upto = self._appended
+
+            lines = []
+            for item in batch:
+                if item is _ROTATE:
+                    self._flush(lines)
+                    lines = []
+                    self._file.close()
+                    self._segment_no += 1
+                    self._file = open(self._segment_path(self._segment_no), 'ab')
+                else:
+                    lines.append(item)
+            self._flush(lines)
+
+            with self._cond:
+                self._durable = upto
+                self._cond.notify_all()
+
+    def _flush(self, lines: List[bytes]):
+        if not lines:
+            return
+        self._file.write(b''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self._file.close()
@@ -1,18 +1,294 @@
-import heapq
-from threading import Lock
+import os
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from operator import attrgetter
+from threading import Condition, Lock
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from .models import QueueEntry
-from .utils import calculate_priority, validate_person_data
+from .counters import ServiceCounter
+from .eta import ServiceTimeEstimator, eta_minutes
+from .history import HistoryStore, validate_query
+from .index import BucketIndex, RankedIndex
+from .journal import Journal
+from .metrics import SERIALIZATION_SECONDS, TimedLock, instrumented
+from .models import QueueEntry, DAY_BITS, MINUTE_BITS, SEQUENCE_BITS, format_day
+from .priority import AgingSchedule, PriorityPolicy
+from .recovery import JournalRecovery
+from .search import SearchIndex
+from .serialization import entry_json, present_entry
+from .slots import SlotIndex, SlotSchedule
+from .utils import (
+    VERIFICATION_MODES, QUEUE_FULL_MESSAGE, already_queued, parse_flag, validate_person_data,
+    validate_people, import_result, import_summary, validate_slot, validate_search, fold_name,
+    encode_cursor, decode_cursor
+)
 
-class QueueManager:
-    def __init__(self):
-        self._lock = Lock()
-        self._heap = []
+ENGINES = ('ranked', 'buckets')
+
+def _slot_of_key(sort_key: int) -> int:
+    """Priority, day and minute of a sort key: entries sharing them are served in arrival order"""
+    return sort_key >> SEQUENCE_BITS
+
+class _Snapshot:
+    """Immutable view of the queue at one version, shared by readers without locking"""
+    __slots__ = ('version', 'last_updated', 'entries', 'keys', 'etas', 'fragments', 'positions',
+                 '_dicts')
+    
+    def __init__(self, version: int, last_updated: str, entries: List[QueueEntry],
+                 seconds_per_person: Dict[str, float]):
+        self.version = version
+        self.last_updated = last_updated
+        self.entries = entries
+        self.keys = [entry.sort_key for entry in entries]
+        self.etas = []
+        self.fragments = []
+        self.positions = {}
+        ahead_in_mode = Counter()
+        for position, entry in enumerate(entries, start=1):
+            mode = entry.verification_mode
+            eta = eta_minutes(ahead_in_mode[mode], seconds_per_person[mode])
+            ahead_in_mode[mode] += 1
+            self.etas.append(eta)
+            self.fragments.append(entry_json(entry.json_fields, position, eta))
+            self.positions[entry.life_certificate_no] = position
+        self._dicts = None
+    
+    def queue(self, start: int = 0, stop: Optional[int] = None, raw: bool = False) -> list:
+        """Entries ``start`` to ``stop`` as dicts, or as JSON fragments with ``raw``"""
+        whole = start == 0 and stop is None
+        if raw:
+            return self.fragments if whole else self.fragments[start:stop]
+        if self._dicts is not None:
+            return self._dicts if whole else self._dicts[start:stop]
+        stop = len(self.entries) if stop is None else min(stop, len(self.entries))
+        dicts = [present_entry(self.entries[index], index + 1, self.etas[index])
+                 for index in range(start, stop)]
+        if whole:
+            self._dicts = dicts
+        return dicts
+
+class QueueManager(JournalRecovery):
+    """In-memory queue with indexed serving order, optionally journaled to disk"""
+    
+    def __init__(self, event_buffer_size: int = 1000, journal: Optional[Journal] = None,
+                 service_times: Optional[ServiceTimeEstimator] = None,
+                 slots: Optional[SlotSchedule] = None, history: Optional[HistoryStore] = None,
+                 policy: Optional[PriorityPolicy] = None, engine: str = 'ranked',
+                 capacity: Optional[int] = None):
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+        self.instance_id = os.urandom(4).hex()
+        self._engine = engine
+        self._policy = policy or PriorityPolicy()
+        self._capacity = capacity or None
+        self._lock = TimedLock('memory')
+        # Serialises snapshot builds so concurrent readers of a new version build it once
+        self._publish_lock = Lock()
+        self._changed = Condition(self._lock)
+        self._events = deque(maxlen=event_buffer_size)
+        self._now_serving_cert = None
         self._sequence_counter = 0
         self._entries_by_cert = {}
+        self._order = self._new_index()
+        # One index per verification mode, so counters serving a mode never scan the other
+        self._lanes = {mode: self._new_index() for mode in VERIFICATION_MODES}
+        self._aging = AgingSchedule(self._policy, self._is_queued)
+        self._search = SearchIndex()
+        self._counters: Dict[str, ServiceCounter] = {}
+        self._service_times = service_times or ServiceTimeEstimator()
+        self._history = history or HistoryStore()
+        self._priority_counts = Counter()
+        self._mode_counts = Counter()
+        self._date_counts = Counter()
+        self._slots = SlotIndex(slots or SlotSchedule())
+        self._age_sum = 0
+        self._version = 0
         self._last_updated = datetime.utcnow().isoformat() + "Z"
+        self._journal = None
+        self._records_since_snapshot = 0
+        
+        if journal is not None:
+            self._recover(*journal.recover())
+            self._journal = journal
+        
+        self._sync_service_clock()
+        # Published queue snapshot, rebuilt on the first read after a write
+        self._published = _Snapshot(-1, self._last_updated, [], {})
+    
+    @property
+    def version(self) -> int:
+        """Monotonically increasing state version, safe to read without the lock"""
+        return self._version
+    
+    def survives_close(self) -> bool:
+        """Whether a fresh manager would pick up where this one leaves off"""
+        with self._lock:
+            queue_kept = self._journal is not None or not self._entries_by_cert
+        return queue_kept and not self._history.loses_on_close()
+    
+    def carryover(self) -> Dict[str, Any]:
+        """Counters and learned service times, to hand to the next manager of this queue"""
+        with self._lock:
+            return {'counters': dict(self._counters), 'service_times': self._service_times}
+    
+    def adopt_counters(self, counters: Dict[str, ServiceCounter]):
+        """Take over counters, with their turn state, from a previous manager's ``carryover``"""
+        with self._lock:
+            self._counters.update(counters)
+    
+    def close(self):
+        """Flush and close the journal and history files; the manager must not be used afterwards"""
+        with self._lock:
+            journal, self._journal = self._journal, None
+        if journal is not None:
+            journal.close()
+        self._history.close()
+    
+    def _mark_updated(self, event_type: str, data: Dict[str, Any],
+                      record: Optional[Dict[str, Any]] = None) -> int:
+        """Bump the version, journal the mutation and publish a change event"""
+        self._version += 1
+        self._last_updated = datetime.utcnow().isoformat() + "Z"
+        self._sync_service_clock()
+        events = [{'version': self._version, 'type': event_type, 'data': data}]
+        
+        head = self._order.first().life_certificate_no if self._order else None
+        if head != self._now_serving_cert:
+            self._now_serving_cert = head
+            events.append({
+                'version': self._version,
+                'type': 'now_serving',
+                'data': {'life_certificate_no': head}
+            })
+        
+        # Buffered per version, so eviction never leaves a version half-recorded
+        self._events.append((self._version, events))
+        self._changed.notify_all()
+        
+        return self._journal_write(event_type, record if record is not None else data)
+    
+    def _sync_service_clock(self):
+        """Start or stop each lane's service clock depending on whether anyone is waiting"""
+        for mode, lane in self._lanes.items():
+            if lane:
+                self._service_times.waiting(mode)
+            else:
+                self._service_times.idle(mode)
+    
+    def get_events(self, since: int, timeout: float = 0) -> Dict[str, Any]:
+        """Change events newer than ``since``, waiting up to ``timeout`` seconds for one"""
+        with self._changed:
+            if timeout > 0 and since == self._version:
+                self._changed.wait_for(lambda: self._version != since, timeout)
+            
+            oldest = self._events[0][0] if self._events else self._version + 1
+            reset = since > self._version or since < oldest - 1
+            batches = []
+            if not reset:
+                for version, batch in reversed(self._events):
+                    if version <= since:
+                        break
+                    batches.append(batch)
+            events = [event for batch in reversed(batches) for event in batch]
+            
+            return {
+                'version': self._version,
+                'reset': reset,
+                'events': events
+            }
+    
+    def _new_index(self):
+        if self._engine == 'buckets':
+            return BucketIndex(key=attrgetter('sort_key'), bucket=_slot_of_key)
+        return RankedIndex(key=attrgetter('sort_key'))
+    
+    def _is_queued(self, entry: QueueEntry) -> bool:
+        return self._entries_by_cert.get(entry.life_certificate_no) is entry
     
+    def _add_entry(self, entry: QueueEntry):
+        self._entries_by_cert[entry.life_certificate_no] = entry
+        self._order.insert(entry)
+        self._lanes[entry.verification_mode].insert(entry)
+        self._search.add(entry)
+        self._track(entry)
+    
+    def _drop_entry(self, entry: QueueEntry):
+        del self._entries_by_cert[entry.life_certificate_no]
+        self._order.remove(entry)
+        self._lanes[entry.verification_mode].remove(entry)
+        self._search.remove(entry)
+        self._untrack(entry)
+    
+    def _reset_state(self):
+        self._entries_by_cert.clear()
+        self._order.clear()
+        for lane in self._lanes.values():
+            lane.clear()
+        self._search.clear()
+        self._priority_counts.clear()
+        self._mode_counts.clear()
+        self._date_counts.clear()
+        self._slots.clear()
+        self._aging.clear()
+        self._age_sum = 0
+        self._sequence_counter = 0
+    
+    def _track(self, entry: QueueEntry):
+        """Update running counters for an entry joining the queue"""
+        self._priority_counts[entry.priority] += 1
+        self._mode_counts[entry.verification_mode] += 1
+        self._date_counts[entry.preferred_date] += 1
+        self._slots.add(entry)
+        self._age_sum += entry.age
+        if self._policy.aging_seconds is not None:
+            # Entries restored at a level the current policy wouldn't give them age from there
+            level = self._policy.level(entry.age, entry.disability)
+            self._aging.add(entry, max(level, entry.priority))
+    
+    def _untrack(self, entry: QueueEntry):
+        """Update running counters for an entry leaving the queue"""
+        for counts, key in ((self._priority_counts, entry.priority),
+                            (self._mode_counts, entry.verification_mode),
+                            (self._date_counts, entry.preferred_date)):
+            counts[key] -= 1
+            if counts[key] <= 0:
+                del counts[key]
+        self._slots.remove(entry)
+        self._age_sum -= entry.age
+    
+    def _new_entry(self, person_data: dict) -> QueueEntry:
+        """Build the next entry from validated person data; caller holds the lock"""
+        age = int(person_data['age'])
+        disability = parse_flag(person_data.get('disability'))
+        entry = QueueEntry(
+            life_certificate_no=person_data['life_certificate_no'],
+            name=person_data['name'],
+            age=age,
+            phone=person_data['phone'],
+            proof_guardian_name=person_data['proof_guardian_name'],
+            verification_mode=person_data['verification_mode'],
+            priority=self._policy.level(age, disability),
+            sequence=self._sequence_counter,
+            preferred_date=person_data['preferred_date'],
+            preferred_time=person_data['preferred_time'],
+            disability=disability
+        )
+        self._sequence_counter += 1
+        return entry
+    
+    def _is_full(self) -> bool:
+        return self._capacity is not None and len(self._entries_by_cert) >= self._capacity
+    
+    def _slot_full(self, person_data: dict) -> Optional[str]:
+        """Why a validated person can't be booked into their slot, if so; caller holds the lock"""
+        schedule = self._slots.schedule
+        day, bucket = schedule.slot_of(person_data['preferred_date'], person_data['preferred_time'])
+        if schedule.is_full(day, bucket, self._slots.count(day, bucket)):
+            return schedule.full_message(day, bucket)
+        return None
+    
+    @instrumented('memory')
     def enqueue(self, person_data: dict) -> tuple[bool, str, Optional[Dict[str, Any]]]:
         is_valid, error_msg = validate_person_data(person_data)
         if not is_valid:
@@ -21,87 +297,476 @@ class QueueManager:
         with self._lock:
             cert_no = person_data['life_certificate_no']
             if cert_no in self._entries_by_cert:
-                return False, f"Person with life_certificate_no {cert_no} already in queue", None
+                return False, already_queued(cert_no), None
+            if self._is_full():
+                return False, QUEUE_FULL_MESSAGE, None
+            full = self._slot_full(person_data)
+            if full is not None:
+                return False, full, None
             
-            age = int(person_data['age'])
-            priority = calculate_priority(age)
+            entry = self._new_entry(person_data)
+            self._add_entry(entry)
             
-            entry = QueueEntry(
-                life_certificate_no=cert_no,
-                name=person_data['name'],
-                age=age,
-                phone=person_data['phone'],
-                proof_guardian_name=person_data['proof_guardian_name'],
-                verification_mode=person_data['verification_mode'],
-                priority=priority,
-                sequence=self._sequence_counter,
-                preferred_date=person_data['preferred_date'],
-                preferred_time=person_data['preferred_time']
-            )
+            entry_dict = entry.to_dict()
+            event = dict(entry_dict, position=self._order.rank(entry) + 1)
+            ticket = self._mark_updated('enqueued', event, record=entry.to_record())
+        
+        self._await_durable(ticket)
+        return True, "Person added to queue successfully", entry_dict
+    
+    @instrumented('memory')
+    def enqueue_many(self, people: List[dict],
+                     first_row: int = 1) -> tuple[bool, str, Dict[str, Any]]:
+        """Validate and add many people under a single lock acquisition"""
+        results = []
+        valid = []
+        row_errors = iter(validate_people([person_data for person_data in people
+                                           if isinstance(person_data, dict)]))
+        for row, person_data in enumerate(people, start=first_row):
+            if not isinstance(person_data, dict):
+                results.append({'row': row, 'life_certificate_no': None, 'success': False,
+                                'message': "Row must be a JSON object"})
+                continue
+            results.append(import_result(row, person_data, next(row_errors)))
+            if results[-1]['success']:
+                valid.append((results[-1], person_data))
+        
+        added = []
+        ticket = 0
+        with self._lock:
+            for result, person_data in valid:
+                cert_no = person_data['life_certificate_no']
+                if cert_no in self._entries_by_cert:
+                    result['success'] = False
+                    result['message'] = already_queued(cert_no)
+                    continue
+                if self._is_full():
+                    result['success'] = False
+                    result['message'] = QUEUE_FULL_MESSAGE
+                    continue
+                full = self._slot_full(person_data)
+                if full is not None:
+                    result['success'] = False
+                    result['message'] = full
+                    continue
+                entry = self._new_entry(person_data)
+                self._entries_by_cert[cert_no] = entry
+                self._track(entry)
+                added.append(entry)
+                result['message'] = "Person added to queue successfully"
             
-            self._sequence_counter += 1
+            if added:
+                self._order.update(added)
+                for mode, lane in self._lanes.items():
+                    lane.update([entry for entry in added if entry.verification_mode == mode])
+                self._search.add_many(added)
+                cert_nos = [entry.life_certificate_no for entry in added]
+                ticket = self._mark_updated(
+                    'bulk_enqueued', {'count': len(added), 'life_certificate_nos': cert_nos},
+                    record={'entries': [entry.to_record() for entry in added]}
+                )
+        
+        self._await_durable(ticket)
+        return import_summary(results, len(added))
+    
+    def _promote(self, entry: QueueEntry, priority: int):
+        self._drop_entry(entry)
+        self._add_entry(entry.with_priority(priority))
+    
+    def _promote_due(self):
+        """Move entries that have waited long enough up a level; caller holds the lock"""
+        if self._policy.aging_seconds is None:
+            return
+        promotions = self._aging.pop_due(time.time())
+        if not promotions:
+            return
+        for entry, priority in promotions:
+            self._promote(entry, priority)
+        self._mark_updated('promoted', {'promotions': [
+            {'life_certificate_no': entry.life_certificate_no, 'priority': priority}
+            for entry, priority in promotions
+        ]})
+    
+    @staticmethod
+    def _lane_head(lane, priorities: Optional[List[int]]) -> Optional[QueueEntry]:
+        """First entry in a lane whose priority is allowed, in O(log n)"""
+        if not lane:
+            return None
+        if priorities is None:
+            return lane.first()
+        for priority in priorities:
+            # Smallest possible key of this priority level
+            index = lane.rank_key(priority << (DAY_BITS + MINUTE_BITS + SEQUENCE_BITS))
+            if index < len(lane) and lane[index].priority == priority:
+                return lane[index]
+        return None
+    
+    def _take_next(self, counter: Optional[ServiceCounter]) -> Optional[QueueEntry]:
+        """Remove and return the next entry a counter may serve; caller holds the lock"""
+        if counter is None:
+            if not self._order:
+                return None
+            entry = self._order.first()
+        else:
+            heads = {}
+            for mode in counter.modes:
+                head = self._lane_head(self._lanes[mode], counter.priorities)
+                if head is not None:
+                    heads[mode] = head
+            if not heads:
+                return None
+            entry = heads[counter.pick(heads)]
+        
+        self._drop_entry(entry)
+        return entry
+    
+    def _resolve_counter(self,
+                         counter: Optional[str]) -> tuple[bool, str, Optional[ServiceCounter]]:
+        if counter is None:
+            return True, "", None
+        if counter not in self._counters:
+            return False, f"Counter {counter} not found", None
+        return True, "", self._counters[counter]
+    
+    @instrumented('memory')
+    def dequeue(self, counter: Optional[str] = None) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        with self._lock:
+            found, message, service_counter = self._resolve_counter(counter)
+            if not found:
+                return False, message, None
             
-            heapq.heappush(self._heap, entry)
-            self._entries_by_cert[cert_no] = entry
-            self._last_updated = datetime.utcnow().isoformat() + "Z"
+            self._promote_due()
+            entry = self._take_next(service_counter)
+            if entry is None:
+                if counter is None:
+                    return False, "Queue is empty", None
+                return False, f"No one in queue can be served at counter {counter}", None
             
-            return True, "Person added to queue successfully", entry.to_dict()
+            self._service_times.served([entry.verification_mode], counter)
+            finished_at = time.time()
+            data = {'life_certificate_no': entry.life_certificate_no}
+            if counter is not None:
+                data['counter'] = counter
+            ticket = self._mark_updated('dequeued', data)
+        
+        # History has its own lock; archiving outside ours keeps it off the queue's critical path
+        self._history.record(entry, 'served', counter, finished_at)
+        self._await_durable(ticket)
+        return True, "Person dequeued successfully", entry.to_dict()
     
-    def dequeue(self) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+    @instrumented('memory')
+    def dequeue_many(self, count: int,
+                     counter: Optional[str] = None) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Serve up to ``count`` people in one lock acquisition, optionally for one counter"""
         with self._lock:
-            if not self._heap:
-                return False, "Queue is empty", None
+            found, message, service_counter = self._resolve_counter(counter)
+            if not found:
+                return False, message, None
+            
+            self._promote_due()
+            served = []
+            while len(served) < count:
+                entry = self._take_next(service_counter)
+                if entry is None:
+                    break
+                served.append(entry)
             
-            entry = heapq.heappop(self._heap)
-            del self._entries_by_cert[entry.life_certificate_no]
-            self._last_updated = datetime.utcnow().isoformat() + "Z"
+            if not served:
+                if counter is None:
+                    return False, "Queue is empty", None
+                return False, f"No one in queue can be served at counter {counter}", None
             
-            return True, "Person dequeued successfully", entry.to_dict()
+            self._service_times.served([entry.verification_mode for entry in served], counter)
+            finished_at = time.time()
+            ticket = self._mark_updated('bulk_dequeued', {
+                'life_certificate_nos': [entry.life_certificate_no for entry in served],
+                'counter': counter
+            })
+            remaining = len(self._order)
+        
+        self._history.record_many(served, 'served', counter, finished_at)
+        self._await_durable(ticket)
+        return True, f"Served {len(served)} person(s)", {
+            'served': [entry.to_dict() for entry in served],
+            'remaining_in_queue': remaining
+        }
+    
+    @instrumented('memory')
+    def configure_counter(self, name: str,
+                          config: Dict[str, Any]) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Create or replace a named service counter"""
+        success, message, counter = ServiceCounter.from_config(name, config, self._policy.levels)
+        if not success:
+            return False, message, None
+        with self._lock:
+            self._counters[name] = counter
+        return True, message, counter.to_dict()
     
-    def get_queue_state(self) -> Dict[str, Any]:
+    @instrumented('memory')
+    def remove_counter(self, name: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
         with self._lock:
-            sorted_entries = sorted(self._heap)
+            counter = self._counters.pop(name, None)
+            self._service_times.forget_counter(name)
+        if counter is None:
+            return False, f"Counter {name} not found", None
+        return True, "Counter removed", counter.to_dict()
+    
+    @instrumented('memory')
+    def get_counters(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(counter.to_dict(),
+                         average_service_seconds=self._service_times.counter_service_seconds(name))
+                    for name, counter in self._counters.items()]
+    
+    def _snapshot(self) -> _Snapshot:
+        """The published snapshot, rebuilt first if a write has happened since"""
+        snapshot = self._published
+        if snapshot.version == self._version:
+            return snapshot
+        with self._publish_lock:
+            snapshot = self._published
+            if snapshot.version == self._version:
+                return snapshot
+            with self._lock:
+                version, last_updated = self._version, self._last_updated
+                entries = list(self._order)
+                seconds_per_person = self._service_times.rates()
+            with SERIALIZATION_SECONDS.time('snapshot'):
+                snapshot = _Snapshot(version, last_updated, entries, seconds_per_person)
+            self._published = snapshot
+            return snapshot
+    
+    @instrumented('memory')
+    def get_slot_availability(self,
+                              preferred_date: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Booked and free places in every time slot of a day, in O(slots)"""
+        is_valid, error_msg = validate_slot(preferred_date)
+        if not is_valid:
+            return False, error_msg, None
+        
+        schedule = self._slots.schedule
+        day = schedule.slot_of(preferred_date, '00:00')[0]
+        with self._lock:
+            booked = self._slots.booked(day)
+            version = self._version
+        
+        return True, "Slot availability", {
+            'date': format_day(day),
+            'slot_minutes': schedule.slot_minutes,
+            'version': version,
+            'slots': schedule.availability(day, booked)
+        }
+    
+    @instrumented('memory')
+    def get_slot(self, preferred_date: str,
+                 preferred_time: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Who is booked into one time slot, in serving order"""
+        is_valid, error_msg = validate_slot(preferred_date, preferred_time)
+        if not is_valid:
+            return False, error_msg, None
+        
+        schedule = self._slots.schedule
+        day, bucket = schedule.slot_of(preferred_date, preferred_time)
+        with self._lock:
+            members = self._slots.members(day, bucket)
+            version = self._version
+        
+        return True, "Slot found", {
+            'date': format_day(day),
+            **schedule.describe(day, bucket, len(members)),
+            'version': version,
+            'life_certificate_nos': members
+        }
+    
+    @instrumented('memory')
+    def search(self, phone: Optional[str] = None, name: Optional[str] = None,
+               mode: Optional[str] = None, offset: int = 0,
+               limit: int = 50) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Find entries by phone, name prefix and/or mode through the search indexes"""
+        is_valid, error_msg = validate_search(phone, name, mode)
+        if not is_valid:
+            return False, error_msg, None
+        prefix = fold_name(name.strip()) if name is not None else None
+        
+        with self._lock:
+            lane = self._lanes[mode] if mode is not None else None
+            found = self._search.find(phone, prefix, mode, lane, offset, limit)
+            results = [dict(entry.to_dict(), position=self._order.rank(entry) + 1)
+                       for entry in found[:limit]]
+            version = self._version
+        
+        return True, f"Found {len(results)} matching person(s)", {
+            'offset': offset,
+            'limit': limit,
+            'has_more': len(found) > limit,
+            'version': version,
+            'results': results
+        }
+    
+    @instrumented('memory')
+    def get_queue_state(self, raw: bool = False) -> Dict[str, Any]:
+        """The whole queue in serving order; ``raw`` gives entries as JSON fragments"""
+        snapshot = self._snapshot()
+        queue = snapshot.queue(raw=raw)
+        return {
+            'queue_length': len(queue),
+            'now_serving': queue[0] if queue else None,
+            'last_updated': snapshot.last_updated,
+            'version': snapshot.version,
+            'queue': queue
+        }
+    
+    @instrumented('memory')
+    def get_queue_page(self, offset: int = 0, limit: int = 50, cursor: Optional[str] = None,
+                       raw: bool = False) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Get a window of the queue in serving order without materialising the rest"""
+        key = None
+        if cursor is not None:
+            key = decode_cursor(cursor)
+            if key is None:
+                return False, "Invalid cursor", None
+        
+        snapshot = self._published
+        if snapshot.version == self._version:
+            # Resume right after the last entry of the previous page, even if it has left the queue
+            start = bisect_left(snapshot.keys, key.sort_key + 1) if key is not None else offset
+            entries = snapshot.entries[start:start + limit]
+            queue_list = snapshot.queue(start, start + limit, raw)
+            queue_length = len(snapshot.entries)
+            now_serving = snapshot.queue(0, 1, raw)[0] if queue_length else None
+            last_updated, version = snapshot.last_updated, snapshot.version
+        else:
+            # Stale snapshot: an O(log n) window under the lock beats rebuilding all of it
+            with self._lock:
+                start = self._order.rank_key(key.sort_key + 1) if key is not None else offset
+                entries = self._order.islice(start, start + limit)
+                queue_length = len(self._order)
+                head = self._order.first() if queue_length else None
+                last_updated, version = self._last_updated, self._version
+                seconds_per_person = self._service_times.rates()
+                # People of each mode ahead of the window, counted off the lanes
+                ahead_in_mode = Counter()
+                if entries:
+                    ahead_in_mode.update({mode: lane.rank_key(entries[0].sort_key)
+                                          for mode, lane in self._lanes.items()})
             
             queue_list = []
-            for position, entry in enumerate(sorted_entries, start=1):
-                entry_dict = entry.to_dict()
-                entry_dict['position'] = position
-                queue_list.append(entry_dict)
-            
-            response = {
-                'queue_length': len(sorted_entries),
-                'now_serving': queue_list[0] if queue_list else None,
-                'last_updated': self._last_updated,
-                'queue': queue_list
-            }
-            
-            return response
+            for position, entry in enumerate(entries, start=start + 1):
+                mode = entry.verification_mode
+                eta = eta_minutes(ahead_in_mode[mode], seconds_per_person[mode])
+                ahead_in_mode[mode] += 1
+                queue_list.append(present_entry(entry, position, eta, raw))
+            now_serving = None
+            if head is not None:
+                now_serving = queue_list[0] if start == 0 else present_entry(head, 1, 0, raw)
+        
+        has_more = start + len(entries) < queue_length
+        return True, "Queue page", {
+            'queue_length': queue_length,
+            'now_serving': now_serving,
+            'last_updated': last_updated,
+            'version': version,
+            'offset': start,
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': encode_cursor(entries[-1]) if has_more else None,
+            'queue': queue_list
+        }
     
+    def _build_stats(self) -> Dict[str, Any]:
+        """Queue statistics from running counters; caller holds the lock"""
+        queue_length = len(self._order)
+        now_serving = self._order.first().life_certificate_no if queue_length else None
+        seconds_per_person = self._service_times.rates()
+        
+        return {
+            'total_in_queue': queue_length,
+            'priority_0_count': self._priority_counts[0],
+            'priority_1_count': self._priority_counts[1],
+            'by_priority': {level: self._priority_counts[level] for level in self._policy.levels},
+            'presence_mode_count': self._mode_counts['presence'],
+            'online_mode_count': self._mode_counts['online'],
+            'average_age': round(self._age_sum / queue_length, 1) if queue_length else 0,
+            # Lanes are served side by side, so the longest one sets the wait for the last person
+            'estimated_wait_time_minutes': max(
+                eta_minutes(self._mode_counts[mode], seconds_per_person[mode])
+                for mode in VERIFICATION_MODES
+            ),
+            'service_minutes_per_person': {
+                mode: round(seconds / 60, 1) for mode, seconds in seconds_per_person.items()
+            },
+            'by_preferred_date': dict(sorted(self._date_counts.items())),
+            'now_serving': now_serving,
+            'last_updated': self._last_updated,
+            'version': self._version,
+            'queue_empty': queue_length == 0,
+            'capacity': self._capacity,
+            'queue_full': self._is_full()
+        }
+    
+    @instrumented('memory')
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue statistics from the running counters"""
+        with self._lock:
+            return self._build_stats()
+    
+    @instrumented('memory')
+    def get_history(self, start: Optional[str] = None, end: Optional[str] = None,
+                    outcome: Optional[str] = None, mode: Optional[str] = None, offset: int = 0,
+                    limit: int = 100) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Served and removed entries that left the queue in [start, end), oldest first"""
+        is_valid, error_msg, window = validate_query(start, end, outcome, mode, default_days=1)
+        if not is_valid:
+            return False, error_msg, None
+        return True, "History", self._history.query(*window, outcome, mode, offset, limit)
+    
+    @instrumented('memory')
+    def get_history_stats(self, start: Optional[str] = None, end: Optional[str] = None,
+                          by: str = 'day') -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Throughput and waits per day or hour from the history rollups"""
+        is_valid, error_msg, window = validate_query(start, end, by=by, default_days=30)
+        if not is_valid:
+            return False, error_msg, None
+        return True, "History statistics", self._history.stats(*window, by)
+    
+    @instrumented('memory')
     def clear_queue(self):
         with self._lock:
-            self._heap.clear()
-            self._entries_by_cert.clear()
-            self._sequence_counter = 0
-            self._last_updated = datetime.utcnow().isoformat() + "Z"
+            self._reset_state()
+            ticket = self._mark_updated('cleared', {})
+        
+        self._await_durable(ticket)
     
+    @instrumented('memory')
     def get_entry_by_cert(self, cert_no: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
         """Get specific person's queue information by certificate number"""
+        snapshot = self._published
+        if snapshot.version == self._version:
+            position = snapshot.positions.get(cert_no)
+            if position is None:
+                return False, f"Person with certificate {cert_no} not found in queue", None
+            entry_dict = snapshot.queue(position - 1, position)[0]
+            return True, "Entry found", dict(entry_dict, people_ahead=position - 1)
+        
         with self._lock:
             if cert_no not in self._entries_by_cert:
                 return False, f"Person with certificate {cert_no} not found in queue", None
             
             entry = self._entries_by_cert[cert_no]
-            sorted_entries = sorted(self._heap)
-            
-            # Find position in queue
-            position = next((i + 1 for i, e in enumerate(sorted_entries) if e.life_certificate_no == cert_no), None)
-            
-            entry_dict = entry.to_dict()
-            entry_dict['position'] = position
-            entry_dict['people_ahead'] = position - 1 if position else 0
             
-            return True, "Entry found", entry_dict
+            # Position comes from the order-statistic index, no sort needed
+            position = self._order.rank(entry) + 1
+            ahead_in_mode = self._lanes[entry.verification_mode].rank(entry)
+            seconds_per_person = self._service_times.seconds_per_person(entry.verification_mode)
+        
+        entry_dict = entry.to_dict()
+        entry_dict['position'] = position
+        entry_dict['estimated_wait_time_minutes'] = eta_minutes(ahead_in_mode, seconds_per_person)
+        entry_dict['people_ahead'] = position - 1
+        
+        return True, "Entry found", entry_dict
     
+    @instrumented('memory')
     def remove_entry_by_cert(self, cert_no: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
         """Remove specific person from queue by certificate number"""
         with self._lock:
@@ -109,11 +774,66 @@ class QueueManager:
                 return False, f"Person with certificate {cert_no} not found in queue", None
             
             entry = self._entries_by_cert[cert_no]
-            del self._entries_by_cert[cert_no]
-            
-            # Remove from heap
-            self._heap.remove(entry)
-            heapq.heapify(self._heap)
-            self._last_updated = datetime.utcnow().isoformat() + "Z"
+            self._drop_entry(entry)
+            finished_at = time.time()
+            ticket = self._mark_updated('removed', {'life_certificate_nos': [cert_no]})
+        
+        self._history.record(entry, 'removed', finished_at=finished_at)
+        self._await_durable(ticket)
+        return True, "Person removed from queue successfully", entry.to_dict()
+    
+    @instrumented('memory')
+    def remove_entries_by_cert(self,
+                               cert_nos: List[str]) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Remove many people from queue under a single lock acquisition"""
+        removed = []
+        not_found = []
+        ticket = 0
+        finished_at = None
+        with self._lock:
+            for cert_no in cert_nos:
+                entry = self._entries_by_cert.get(cert_no)
+                if entry is None:
+                    not_found.append(cert_no)
+                    continue
+                self._drop_entry(entry)
+                removed.append(entry)
             
-            return True, "Person removed from queue successfully", entry.to_dict()
+            if removed:
+                finished_at = time.time()
+                ticket = self._mark_updated('removed', {
+                    'life_certificate_nos': [entry.life_certificate_no for entry in removed]
+                })
+        
+        self._history.record_many(removed, 'removed', finished_at=finished_at)
+        self._await_durable(ticket)
+        removed = [entry.to_dict() for entry in removed]
+        
+        if not removed:
+            return False, "None of the given certificates were found in queue", {
+                'removed': [], 'not_found': not_found
+            }
+        
+        message = f"Removed {len(removed)} person(s) from queue"
+        return True, message, {'removed': removed, 'not_found': not_found}
+    
+    @instrumented('memory')
+    def expire_stale(self, cutoff: datetime,
+                     limit: int = 500) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Move up to ``limit`` people whose slot ended by ``cutoff`` to history as expired"""
+        ticket = 0
+        with self._lock:
+            cert_nos = self._slots.started_before(self._slots.schedule.slot_start(cutoff), limit)
+            expired = [self._entries_by_cert[cert_no] for cert_no in cert_nos]
+            for entry in expired:
+                self._drop_entry(entry)
+            finished_at = time.time()
+            if cert_nos:
+                ticket = self._mark_updated('expired', {'life_certificate_nos': cert_nos})
+        
+        self._history.record_many(expired, 'expired', finished_at=finished_at)
+        self._await_durable(ticket)
+        return True, f"Expired {len(cert_nos)} person(s)", {
+            'life_certificate_nos': cert_nos,
+            'has_more': len(cert_nos) == limit
+        }
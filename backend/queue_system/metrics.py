@@ -0,0 +1,175 @@
+import time
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock, get_ident
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, from 10us (an uncontended lock) to 10s (a slow full-queue read)
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Prometheus-style histogram with a fixed bucket layout per label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._lock = Lock()
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labelvalues: str) -> '_Timer':
+        return _Timer(self, labelvalues)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts), total)
+                            for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                bucket_labels = _format_labels(self.labelnames, labels, le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labelvalues', 'started')
+
+    def __init__(self, histogram: Histogram, labelvalues: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labelvalues)
+
+
+OPERATION_SECONDS = Histogram(
+    'queue_operation_duration_seconds', 'Time spent in each queue manager operation',
+    ('backend', 'operation')
+)
+LOCK_WAIT_SECONDS = Histogram(
+    'queue_lock_wait_seconds', 'Time spent waiting to acquire the queue write lock', ('backend',)
+)
+LOCK_HOLD_SECONDS = Histogram(
+    'queue_lock_hold_seconds', 'Time the queue write lock was held per acquisition', ('backend',)
+)
+SERIALIZATION_SECONDS = Histogram(
+    'queue_serialization_duration_seconds',
+    'Time spent turning queue state into JSON-ready data or bytes', ('stage',)
+)
+REQUEST_SECONDS = Histogram(
+    'queue_http_request_duration_seconds', 'HTTP request latency by route',
+    ('method', 'route', 'status')
+)
+
+HISTOGRAMS = [OPERATION_SECONDS, LOCK_WAIT_SECONDS, LOCK_HOLD_SECONDS, SERIALIZATION_SECONDS,
+              REQUEST_SECONDS]
+
+
+def instrumented(backend: str, operation: Optional[str] = None) -> Callable:
+    """Record a manager method's duration under ``operation`` (defaults to its name)"""
+    def decorate(method):
+        label = operation or method.__name__
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                OPERATION_SECONDS.observe(time.perf_counter() - started, backend, label)
+        return wrapper
+    return decorate
+
+
+class TimedLock:
+    """A Lock that records how long callers waited for it and how long they held it"""
+
+    def __init__(self, backend: str):
+        self._lock = Lock()
+        self._backend = backend
+        self._owner = None
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        started = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self._acquired_at = time.perf_counter()
+            self._owner = get_ident()
+            LOCK_WAIT_SECONDS.observe(self._acquired_at - started, self._backend)
+        return acquired
+
+    def release(self):
+        held = time.perf_counter() - self._acquired_at
+        self._owner = None
+        self._lock.release()
+        LOCK_HOLD_SECONDS.observe(held, self._backend)
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def _is_owned(self) -> bool:
+        # Lets Condition check ownership without a trial acquire
+        return self._owner == get_ident()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def render(extra: Optional[List[str]] = None) -> str:
+    """All histograms plus any extra pre-rendered lines, in Prometheus text format"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    if extra:
+        lines.extend(extra)
+    return '\n'.join(lines) + '\n'
+
+
+def gauge(name: str, documentation: str, samples: List[Tuple[Dict[str, str], float]],
+          kind: str = 'gauge') -> List[str]:
+    """Render one gauge (or counter, with ``kind``) family from (labels, value) pairs"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = _format_labels(tuple(labels), tuple(labels.values()))
+        lines.append(f"{name}{label_text} {_format_value(value)}")
+    return lines
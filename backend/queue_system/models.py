@@ -1,7 +1,46 @@
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 from typing import Dict, Any
 
+from .serialization import encode_fields
+
+# Bit layout of QueueEntry.sort_key, most significant field first
+SEQUENCE_BITS = 40
+MINUTE_BITS = 11
+# 22 day bits hold every ordinal up to 9999-12-31, the last date validation accepts
+DAY_BITS = 22
+
+@lru_cache(maxsize=4096)
+def parse_day(preferred_date: str) -> int:
+    """Proleptic ordinal of a YYYY-MM-DD date"""
+    year, month, day = preferred_date.split('-')
+    return date(int(year), int(month), int(day)).toordinal()
+
+@lru_cache(maxsize=4096)
+def parse_minutes(preferred_time: str) -> int:
+    """Minutes since midnight of an HH:MM time"""
+    hours, minutes = preferred_time.split(':')
+    return int(hours) * 60 + int(minutes)
+
+@lru_cache(maxsize=4096)
+def format_day(day: int) -> str:
+    return date.fromordinal(day).isoformat()
+
+@lru_cache(maxsize=2048)
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def make_sort_key(priority: int, day: int, minutes: int, sequence: int) -> int:
+    """Pack the serving order into one integer, so comparisons are a single int compare"""
+    return (((((priority << DAY_BITS) | day) << MINUTE_BITS) | minutes) << SEQUENCE_BITS) | sequence
+
 class QueueEntry:
+    __slots__ = (
+        'life_certificate_no', 'name', 'age', 'phone', 'proof_guardian_name', 'verification_mode',
+        'priority', 'sequence', 'preferred_date', 'preferred_time', 'day', 'minutes', 'sort_key',
+        'disability', 'created_at', 'status', '_fields'
+    )
+
     def __init__(
         self,
         life_certificate_no: str,
@@ -13,7 +52,8 @@ class QueueEntry:
         priority: int,
         sequence: int,
         preferred_date: str,
-        preferred_time: str
+        preferred_time: str,
+        disability: bool = False
     ):
         self.life_certificate_no = life_certificate_no
         self.name = name
@@ -23,11 +63,17 @@ class QueueEntry:
         self.verification_mode = verification_mode
         self.priority = priority
         self.sequence = sequence
-        self.preferred_date = preferred_date
-        self.preferred_time = preferred_time
+        # Parsed once; the strings are kept in canonical zero-padded form
+        self.day = parse_day(preferred_date)
+        self.minutes = parse_minutes(preferred_time)
+        self.preferred_date = format_day(self.day)
+        self.preferred_time = format_minutes(self.minutes)
+        self.sort_key = make_sort_key(priority, self.day, self.minutes, sequence)
+        self.disability = disability
         self.created_at = datetime.utcnow().isoformat() + "Z"
         self.status = "waiting"
-    
+        self._fields = None
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             'life_certificate_no': self.life_certificate_no,
@@ -38,23 +84,54 @@ class QueueEntry:
             'preferred_date': self.preferred_date,
             'preferred_time': self.preferred_time,
             'verification_mode': self.verification_mode,
+            'disability': self.disability,
             'priority': self.priority,
             'status': self.status,
             'created_at': self.created_at
         }
-    
+
+    @property
+    def json_fields(self) -> bytes:
+        """Encoded ``to_dict()`` fields, computed once since a queued entry never changes"""
+        if self._fields is None:
+            self._fields = encode_fields(self.to_dict())
+        return self._fields
+
+    def to_record(self) -> Dict[str, Any]:
+        """Full internal state, for journaling and snapshots"""
+        record = self.to_dict()
+        record['sequence'] = self.sequence
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'QueueEntry':
+        entry = cls(
+            life_certificate_no=record['life_certificate_no'],
+            name=record['name'],
+            age=record['age'],
+            phone=record['phone'],
+            proof_guardian_name=record['proof_guardian_name'],
+            verification_mode=record['verification_mode'],
+            priority=record['priority'],
+            sequence=record['sequence'],
+            preferred_date=record['preferred_date'],
+            preferred_time=record['preferred_time'],
+            disability=bool(record.get('disability', False))
+        )
+        entry.created_at = record['created_at']
+        entry.status = record['status']
+        return entry
+
+    def with_priority(self, priority: int) -> 'QueueEntry':
+        """Copy at another priority level, since a queued entry is never changed in place"""
+        return QueueEntry.from_record(dict(self.to_record(), priority=priority))
+
     def __lt__(self, other):
         """Compare entries for priority queue ordering
         Lower values have higher priority (served first)
         """
-        if self.priority != other.priority:
-            return self.priority < other.priority
-        if self.preferred_date != other.preferred_date:
-            return self.preferred_date < other.preferred_date
-        if self.preferred_time != other.preferred_time:
-            return self.preferred_time < other.preferred_time
-        return self.sequence < other.sequence
-    
+        return self.sort_key < other.sort_key
+
     def __eq__(self, other):
         """Equality based on life certificate number"""
         return self.life_certificate_no == other.life_certificate_no
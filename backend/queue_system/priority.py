@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .history import parse_timestamp
+
+
+class PriorityPolicy:
+    """Priority level of a person, lower served first, and how waiting raises it"""
+
+    def __init__(self, age_bands: Sequence[int] = (80,), disability_level: Optional[int] = None,
+                 aging_seconds: Optional[float] = None, aging_floor: int = 0):
+        self.age_bands = tuple(sorted(age_bands, reverse=True))
+        self.lowest = len(self.age_bands)
+        if disability_level is not None and not 0 <= disability_level <= self.lowest:
+            raise ValueError(f"disability_level must be between 0 and {self.lowest}")
+        self.disability_level = disability_level
+        self.aging_seconds = aging_seconds or None
+        self.aging_floor = aging_floor
+
+    @property
+    def levels(self) -> Tuple[int, ...]:
+        return tuple(range(self.lowest + 1))
+
+    def level(self, age: int, disability: bool = False) -> int:
+        """Level a person joins the queue at"""
+        level = self.lowest
+        for index, minimum_age in enumerate(self.age_bands):
+            if age >= minimum_age:
+                level = index
+                break
+        if disability and self.disability_level is not None:
+            level = min(level, self.disability_level)
+        return level
+
+    def due(self, joined: float, base: int, level: int) -> Optional[float]:
+        """When an entry that joined at ``base`` and is now at ``level`` moves up next, or None"""
+        if self.aging_seconds is None or level <= self.aging_floor:
+            return None
+        return joined + (base - level + 1) * self.aging_seconds
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'levels': list(self.levels),
+            'age_bands': list(self.age_bands),
+            'disability_level': self.disability_level,
+            'aging_seconds': self.aging_seconds,
+            'aging_floor': self.aging_floor
+        }
+
+
+class AgingSchedule:
+    """Entries waiting to move up a level, in the order they become due"""
+
+    def __init__(self, policy: PriorityPolicy, is_queued: Callable[[object], bool]):
+        self._policy = policy
+        self._is_queued = is_queued
+        self._fifos: Dict[Tuple[int, int], deque] = {}
+
+    def add(self, entry, base: int):
+        due = self._policy.due(parse_timestamp(entry.created_at), base, entry.priority)
+        if due is not None:
+            self._fifos.setdefault((base, entry.priority), deque()).append((due, entry))
+
+    def pop_due(self, now: float) -> List[Tuple[object, int]]:
+        """(entry, new level) for every queued entry due by ``now``"""
+        promotions = []
+        for (base, level), fifo in self._fifos.items():
+            while fifo and fifo[0][0] <= now:
+                due, entry = fifo.popleft()
+                if not self._is_queued(entry):
+                    continue
+                # A long-idle queue may owe several steps at once
+                steps = 1 + int((now - due) // self._policy.aging_seconds)
+                promotions.append((entry, max(level - steps, self._policy.aging_floor)))
+        return promotions
+
+    def clear(self):
+        self._fifos.clear()
+
+    def __len__(self) -> int:
+        return sum(len(fifo) for fifo in self._fifos.values())
+
@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+
+from .models import QueueEntry
+
+
+class JournalRecovery:
+    """QueueManager's journal writes and their replay on start"""
+
+    def _recover(self, snapshot: Optional[Dict[str, Any]], records: List[Dict[str, Any]]):
+        """Rebuild state from a journal snapshot plus the records written after it"""
+        if snapshot is not None:
+            for record in snapshot['entries']:
+                self._add_entry(QueueEntry.from_record(record))
+            self._sequence_counter = snapshot['sequence_counter']
+            self._version = snapshot['version']
+
+        for record in records:
+            self._replay(record['type'], record['data'])
+            self._version = record['version']
+
+        self._now_serving_cert = self._order.first().life_certificate_no if self._order else None
+        self._records_since_snapshot = len(records)
+
+    def _replay(self, record_type: str, data: Dict[str, Any]):
+        if record_type == 'enqueued':
+            self._add_entry(QueueEntry.from_record(data))
+            self._sequence_counter = max(self._sequence_counter, data['sequence'] + 1)
+        elif record_type == 'bulk_enqueued':
+            for entry_record in data['entries']:
+                self._add_entry(QueueEntry.from_record(entry_record))
+                self._sequence_counter = max(self._sequence_counter, entry_record['sequence'] + 1)
+        elif record_type == 'dequeued':
+            self._drop_entry(self._entries_by_cert[data['life_certificate_no']])
+        elif record_type in ('bulk_dequeued', 'removed', 'expired'):
+            for cert_no in data['life_certificate_nos']:
+                self._drop_entry(self._entries_by_cert[cert_no])
+        elif record_type == 'promoted':
+            for promotion in data['promotions']:
+                entry = self._entries_by_cert[promotion['life_certificate_no']]
+                self._promote(entry, promotion['priority'])
+        elif record_type == 'cleared':
+            self._reset_state()
+
+    def _journal_write(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Journal a mutation at the current version and return its ticket"""
+        if self._journal is None:
+            return 0
+        ticket = self._journal.append({'version': self._version, 'type': event_type, 'data': data})
+        self._records_since_snapshot += 1
+        if self._records_since_snapshot >= self._journal.snapshot_every:
+            if self._journal.snapshot(self._version, self._sequence_counter, list(self._order)):
+                self._records_since_snapshot = 0
+        return ticket
+
+    def _await_durable(self, ticket: int):
+        if ticket:
+            self._journal.wait(ticket)
@@ -0,0 +1,204 @@
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class _Branch:
+    __slots__ = ('name', 'lock', 'manager', 'users', 'last_used', 'removed')
+
+    def __init__(self, name: str):
+        self.name = name
+        # Held while the manager loads or unloads, never while it serves
+        self.lock = Lock()
+        self.manager = None
+        self.users = 0
+        self.last_used = 0.0
+        # Set once unloaded and dropped from the registry; acquire then starts a fresh entry
+        self.removed = False
+
+
+class QueueRegistry:
+    """Queue managers by branch name, loaded on first use and unloaded when idle"""
+
+    def __init__(self, factory: Callable[[str, Optional[Dict[str, Any]]], Any],
+                 idle_seconds: float = 900, max_loaded: Optional[int] = None,
+                 sweep_interval: float = 30,
+                 on_unload: Optional[Callable[[str], None]] = None, known: Iterable[str] = (),
+                 pinned: Iterable[str] = (), allowed: Optional[Iterable[str]] = None):
+        self._factory = factory
+        self._allowed = frozenset(allowed) if allowed is not None else None
+        self._pinned = frozenset(pinned)
+        self._idle_seconds = idle_seconds
+        self._max_loaded = max_loaded or None
+        self._sweep_interval = sweep_interval
+        self._on_unload = on_unload
+        self._lock = Lock()
+        self._known = {name for name in known if self.is_allowed(name)}
+        # Loaded (or loading) branches only; the rest live on as a name and what they left behind
+        self._branches: Dict[str, _Branch] = {}
+        self._last_stats: Dict[str, Dict[str, Any]] = {}
+        # What an unloaded manager handed over for the next one
+        self._carryover: Dict[str, Dict[str, Any]] = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def is_allowed(self, name: str) -> bool:
+        return self._allowed is None or name in self._allowed
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self._known
+
+    def create(self, name: str) -> bool:
+        """Make an allowed branch servable; returns False if it already was"""
+        if not self.is_allowed(name):
+            raise KeyError(name)
+        with self._lock:
+            if name in self._known:
+                return False
+            self._known.add(name)
+        return True
+
+    def acquire(self, name: str):
+        """Pin a known branch, loading its manager if needed, and return the manager"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if name not in self._known:
+                    raise KeyError(name)
+                branch = self._branches.get(name)
+                if branch is None:
+                    branch = self._branches[name] = _Branch(name)
+                sweep = now >= self._next_sweep
+                if sweep:
+                    self._next_sweep = now + self._sweep_interval
+            loaded = False
+            with branch.lock:
+                if branch.removed:
+                    # Unloaded between the lookup and the lock; look again
+                    continue
+                if branch.manager is None:
+                    with self._lock:
+                        carryover = self._carryover.get(name)
+                    branch.manager = self._factory(name, carryover)
+                    with self._lock:
+                        self._carryover.pop(name, None)
+                    loaded = True
+                branch.users += 1
+                branch.last_used = now
+                manager = branch.manager
+            break
+        if sweep or (loaded and self._max_loaded is not None):
+            self.sweep()
+        return manager
+
+    def release(self, name: str):
+        branch = self._branches[name]
+        with branch.lock:
+            branch.users -= 1
+            branch.last_used = time.monotonic()
+
+    @contextmanager
+    def use(self, name: str):
+        manager = self.acquire(name)
+        try:
+            yield manager
+        finally:
+            self.release(name)
+
+    @contextmanager
+    def borrow(self, name: str):
+        """Pin a branch only if it is loaded, without counting as use; yields its manager or None"""
+        with self._lock:
+            branch = self._branches.get(name)
+        manager = None
+        if branch is not None:
+            with branch.lock:
+                manager = branch.manager
+                if manager is not None:
+                    branch.users += 1
+        try:
+            yield manager
+        finally:
+            if manager is not None:
+                with branch.lock:
+                    branch.users -= 1
+
+    def _can_unload(self, branch: _Branch, now: float, force: bool) -> bool:
+        manager = branch.manager
+        if manager is None or branch.users or branch.name in self._pinned:
+            return False
+        if not force and now - branch.last_used < self._idle_seconds:
+            return False
+        return manager.survives_close()
+
+    def _unload(self, branch: _Branch, now: float, force: bool) -> bool:
+        with branch.lock:
+            if not self._can_unload(branch, now, force):
+                return False
+            last_stats = branch.manager.get_stats()
+            carryover = branch.manager.carryover()
+            branch.manager.close()
+            branch.manager = None
+            with self._lock:
+                self._last_stats[branch.name] = last_stats
+                self._carryover[branch.name] = carryover
+                del self._branches[branch.name]
+            branch.removed = True
+        if self._on_unload is not None:
+            self._on_unload(branch.name)
+        return True
+
+    def sweep(self) -> List[str]:
+        """Unload idle branches, then least recently used ones beyond ``max_loaded``"""
+        now = time.monotonic()
+        with self._lock:
+            loaded = sorted((branch for branch in self._branches.values()
+                             if branch.manager is not None),
+                            key=lambda branch: branch.last_used)
+        unloaded = [branch.name for branch in loaded if self._unload(branch, now, force=False)]
+        if self._max_loaded is not None:
+            excess = len(loaded) - len(unloaded) - self._max_loaded
+            for branch in loaded:
+                if excess <= 0:
+                    break
+                if branch.name not in unloaded and self._unload(branch, now, force=True):
+                    unloaded.append(branch.name)
+                    excess -= 1
+        return unloaded
+
+    def summary(self) -> Dict[str, Any]:
+        """Statistics of every known branch: live for loaded ones, as last seen for the rest"""
+        with self._lock:
+            branches = [(name, self._branches.get(name), self._last_stats.get(name))
+                        for name in sorted(self._known)]
+        rows = []
+        for name, branch, last_stats in branches:
+            manager = branch.manager if branch is not None else None
+            stats = manager.get_stats() if manager is not None else last_stats
+            row = {'branch': name, 'loaded': manager is not None}
+            for field in ('total_in_queue', 'estimated_wait_time_minutes', 'now_serving',
+                          'last_updated', 'version'):
+                row[field] = stats[field] if stats else None
+            rows.append(row)
+        return {
+            'branch_count': len(rows),
+            'loaded_count': sum(row['loaded'] for row in rows),
+            'total_in_queue': sum(row['total_in_queue'] or 0 for row in rows),
+            'branches': rows
+        }
+
+    def loaded(self) -> Dict[str, Any]:
+        """Currently loaded managers by branch name, for reads that must not load anything"""
+        with self._lock:
+            return {name: branch.manager for name, branch in self._branches.items()
+                    if branch.manager is not None}
+
+    def close(self):
+        with self._lock:
+            branches = list(self._branches.values())
+        for branch in branches:
+            with branch.lock:
+                if branch.manager is not None:
+                    branch.manager.close()
+                    branch.manager = None
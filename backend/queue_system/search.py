@@ -0,0 +1,71 @@
+from itertools import islice, takewhile
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .index import RankedIndex
+from .models import QueueEntry
+from .utils import fold_name
+
+
+def _name_key(entry: QueueEntry) -> tuple:
+    return fold_name(entry.name), entry.sort_key
+
+
+def _scan(index, start: int, chunk: int = 256) -> Iterator[QueueEntry]:
+    """Entries of an index from position ``start`` on, fetched a chunk at a time"""
+    while True:
+        entries = index.islice(start, start + chunk)
+        yield from entries
+        if len(entries) < chunk:
+            return
+        start += chunk
+
+
+class SearchIndex:
+    """Exact phone numbers and case-folded name prefixes of the queued entries"""
+
+    def __init__(self):
+        self._by_phone: Dict[str, Dict[str, QueueEntry]] = {}
+        self._by_name = RankedIndex(key=_name_key)
+
+    def _add_phone(self, entry: QueueEntry):
+        phone = str(entry.phone).strip()
+        self._by_phone.setdefault(phone, {})[entry.life_certificate_no] = entry
+
+    def add(self, entry: QueueEntry):
+        self._add_phone(entry)
+        self._by_name.insert(entry)
+
+    def add_many(self, entries: List[QueueEntry]):
+        for entry in entries:
+            self._add_phone(entry)
+        self._by_name.update(entries)
+
+    def remove(self, entry: QueueEntry):
+        phone = str(entry.phone).strip()
+        del self._by_phone[phone][entry.life_certificate_no]
+        if not self._by_phone[phone]:
+            del self._by_phone[phone]
+        self._by_name.remove(entry)
+
+    def clear(self):
+        self._by_phone.clear()
+        self._by_name.clear()
+
+    def find(self, phone: Optional[str], prefix: Optional[str], mode: Optional[str],
+             lane: Iterable[QueueEntry], offset: int, limit: int) -> List[QueueEntry]:
+        """Up to ``limit + 1`` matches after the first ``offset``"""
+        def matches(entry: QueueEntry) -> bool:
+            return ((mode is None or entry.verification_mode == mode)
+                    and (prefix is None or fold_name(entry.name).startswith(prefix)))
+
+        if phone is not None:
+            candidates = iter(sorted(self._by_phone.get(str(phone).strip(), {}).values(),
+                                     key=attrgetter('sort_key')))
+        elif prefix is not None:
+            start = self._by_name.rank_key((prefix,))
+            candidates = takewhile(lambda entry: fold_name(entry.name).startswith(prefix),
+                                   _scan(self._by_name, start))
+        else:
+            candidates = _scan(lane, 0)
+        return list(islice(filter(matches, candidates), offset, offset + limit + 1))
@@ -0,0 +1,64 @@
+import json
+from typing import Any, List
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+class RawJSON:
+    """A value that is already encoded, spliced into ``dumps`` output as is"""
+    __slots__ = ('encoded',)
+
+    def __init__(self, encoded: bytes):
+        self.encoded = encoded
+
+
+def encode_fields(value: dict) -> bytes:
+    """Compact JSON of a dict without its braces, so fields can be added around it"""
+    return _encode(value)[1:-1].encode()
+
+
+def entry_json(fields: bytes, position: int, eta_minutes: int) -> RawJSON:
+    """An entry's cached fields plus the per-snapshot position and wait estimate"""
+    return RawJSON(b'{%s,"position":%d,"estimated_wait_time_minutes":%d}'
+                   % (fields, position, eta_minutes))
+
+
+def present_entry(entry, position: int, eta_minutes: int, raw: bool = False) -> Any:
+    """An entry as list responses show it: a dict, or with ``raw`` its JSON fragment"""
+    if raw:
+        return entry_json(entry.json_fields, position, eta_minutes)
+    entry_dict = entry.to_dict()
+    entry_dict['position'] = position
+    entry_dict['estimated_wait_time_minutes'] = eta_minutes
+    return entry_dict
+
+
+def _write(value: Any, parts: List[bytes]):
+    if isinstance(value, RawJSON):
+        parts.append(value.encoded)
+    elif isinstance(value, dict):
+        parts.append(b'{')
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                parts.append(b',')
+            parts.append(_encode(str(key)).encode())
+            parts.append(b':')
+            _write(item, parts)
+        parts.append(b'}')
+    elif isinstance(value, list) and value and isinstance(value[0], RawJSON):
+        parts.append(b'[')
+        parts.append(b','.join(item.encoded for item in value))
+        parts.append(b']')
+    else:
+        # Anything without fragments in it goes through the C encoder in one call
+        parts.append(_encode(value).encode())
+
+
+def dumps(value: Any, pretty: bool = False) -> bytes:
+    """Compact UTF-8 JSON of ``value``, splicing in RawJSON fragments"""
+    parts: List[bytes] = []
+    _write(value, parts)
+    body = b''.join(parts)
+    if pretty:
+        body = json.dumps(json.loads(body), ensure_ascii=False, indent=2).encode()
+    return body
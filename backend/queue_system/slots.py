@@ -0,0 +1,153 @@
+import heapq
+import re
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .models import QueueEntry, parse_day, parse_minutes, format_day, format_minutes
+
+MINUTES_PER_DAY = 24 * 60
+# What full_message says, so callers can tell a full slot from other refusals
+SLOT_FULL_PATTERN = re.compile(r'Time slot \d\d:\d\d on \d{4}-\d\d-\d\d is full')
+
+
+class SlotSchedule:
+    """How preferred times are grouped into slots, and how many people each slot takes"""
+
+    def __init__(self, slot_minutes: int = 30, opening: str = '09:00', closing: str = '17:00',
+                 capacity: Optional[int] = None, capacities: Optional[Dict[str, int]] = None):
+        if slot_minutes < 1 or MINUTES_PER_DAY % slot_minutes:
+            raise ValueError("slot_minutes must divide a day evenly")
+        self.slot_minutes = slot_minutes
+        self.opening = self.bucket(parse_minutes(opening))
+        self.closing = parse_minutes(closing)
+        self.capacity = capacity or None
+        self._daily: Dict[int, int] = {}
+        self._dated: Dict[Tuple[int, int], int] = {}
+        for slot, slot_capacity in (capacities or {}).items():
+            if ' ' in slot:
+                day, time = slot.split(' ', 1)
+                self._dated[(parse_day(day), self.bucket(parse_minutes(time)))] = slot_capacity
+            else:
+                self._daily[self.bucket(parse_minutes(slot))] = slot_capacity
+
+    def bucket(self, minutes: int) -> int:
+        """Start of the slot containing ``minutes`` past midnight"""
+        return minutes - minutes % self.slot_minutes
+
+    def slot_start(self, moment: datetime) -> int:
+        """Start of the slot containing a wall-clock time, in minutes since day 1"""
+        minutes = moment.toordinal() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+        return self.bucket(minutes)
+
+    def slot_of(self, preferred_date: str, preferred_time: str) -> Tuple[int, int]:
+        """(day ordinal, slot start) of a validated date and time"""
+        return parse_day(preferred_date), self.bucket(parse_minutes(preferred_time))
+
+    def capacity_for(self, day: int, bucket: int) -> Optional[int]:
+        capacity = self._dated.get((day, bucket))
+        if capacity is None:
+            capacity = self._daily.get(bucket, self.capacity)
+        return capacity
+
+    def is_full(self, day: int, bucket: int, booked: int) -> bool:
+        capacity = self.capacity_for(day, bucket)
+        return capacity is not None and booked >= capacity
+
+    def full_message(self, day: int, bucket: int) -> str:
+        return f"Time slot {format_minutes(bucket)} on {format_day(day)} is full"
+
+    def availability(self, day: int, booked: Dict[int, int]) -> List[Dict[str, Any]]:
+        """Every slot in opening hours plus any booked outside them, given slot -> booked count"""
+        buckets = set(range(self.opening, self.closing, self.slot_minutes))
+        buckets.update(booked)
+        return [self.describe(day, bucket, booked.get(bucket, 0)) for bucket in sorted(buckets)]
+
+    def describe(self, day: int, bucket: int, booked: int) -> Dict[str, Any]:
+        capacity = self.capacity_for(day, bucket)
+        return {
+            'time': format_minutes(bucket),
+            'booked': booked,
+            'capacity': capacity,
+            'available': None if capacity is None else max(capacity - booked, 0),
+            'full': capacity is not None and booked >= capacity
+        }
+
+
+class _Slot:
+    __slots__ = ('keys', 'members')
+
+    def __init__(self):
+        self.keys: List[int] = []
+        self.members: List[str] = []
+
+
+class SlotIndex:
+    """Entries grouped by day and time slot: a count and the members in serving order"""
+
+    def __init__(self, schedule: SlotSchedule):
+        self.schedule = schedule
+        self._days: Dict[int, Dict[int, _Slot]] = {}
+        self._starts: List[Tuple[int, int]] = []
+        self._pushed: Set[Tuple[int, int]] = set()
+
+    def add(self, entry: QueueEntry):
+        bucket = self.schedule.bucket(entry.minutes)
+        day = self._days.setdefault(entry.day, {})
+        slot = day.get(bucket)
+        if slot is None:
+            slot = day[bucket] = _Slot()
+            if (entry.day, bucket) not in self._pushed:
+                self._pushed.add((entry.day, bucket))
+                heapq.heappush(self._starts, (entry.day, bucket))
+        index = bisect_left(slot.keys, entry.sort_key)
+        slot.keys.insert(index, entry.sort_key)
+        slot.members.insert(index, entry.life_certificate_no)
+
+    def remove(self, entry: QueueEntry):
+        bucket = self.schedule.bucket(entry.minutes)
+        day = self._days[entry.day]
+        slot = day[bucket]
+        index = bisect_left(slot.keys, entry.sort_key)
+        del slot.keys[index]
+        del slot.members[index]
+        if not slot.keys:
+            del day[bucket]
+            if not day:
+                del self._days[entry.day]
+
+    def clear(self):
+        self._days.clear()
+        self._starts.clear()
+        self._pushed.clear()
+
+    def started_before(self, before: int, limit: int) -> List[str]:
+        """Up to ``limit`` members of slots starting before ``before``, oldest slot first"""
+        members: List[str] = []
+        while self._starts and len(members) < limit:
+            day, bucket = self._starts[0]
+            if day * MINUTES_PER_DAY + bucket >= before:
+                break
+            slot = self._days.get(day, {}).get(bucket)
+            if slot is None:
+                heapq.heappop(self._starts)
+                self._pushed.discard((day, bucket))
+                continue
+            taken = slot.members[:limit - len(members)]
+            members.extend(taken)
+            if len(taken) < len(slot.members):
+                break
+            heapq.heappop(self._starts)
+            self._pushed.discard((day, bucket))
+        return members
+
+    def count(self, day: int, bucket: int) -> int:
+        slot = self._days.get(day, {}).get(bucket)
+        return len(slot.keys) if slot is not None else 0
+
+    def members(self, day: int, bucket: int) -> List[str]:
+        slot = self._days.get(day, {}).get(bucket)
+        return list(slot.members) if slot is not None else []
+
+    def booked(self, day: int) -> Dict[int, int]:
+        return {bucket: len(slot.keys) for bucket, slot in self._days.get(day, {}).items()}
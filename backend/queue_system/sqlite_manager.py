@@ -0,0 +1,1009 @@
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from threading import local
+from typing import Any, Dict, List, Optional, Sequence
+
+from .counters import ServiceCounter
+from .eta import ServiceTimeEstimator, eta_minutes
+from .history import (
+    HourStats, format_timestamp, parse_timestamp, record_dict, summarize_hours, validate_query
+)
+from .metrics import LOCK_HOLD_SECONDS, LOCK_WAIT_SECONDS, instrumented
+from .models import QueueEntry, format_day, format_minutes, parse_minutes
+from .priority import PriorityPolicy
+from .serialization import present_entry
+from .slots import MINUTES_PER_DAY, SlotSchedule
+from .utils import (
+    VERIFICATION_MODES, QUEUE_FULL_MESSAGE, parse_flag, validate_person_data, validate_people,
+    import_result, import_summary, validate_slot, validate_search, fold_name, encode_cursor,
+    decode_cursor, already_queued
+)
+
+ENTRY_COLUMNS = (
+    'life_certificate_no', 'name', 'age', 'phone', 'proof_guardian_name', 'verification_mode',
+    'priority', 'sequence', 'preferred_date', 'preferred_time', 'created_at', 'status', 'disability'
+)
+ORDER_BY = 'priority, preferred_date, preferred_time, sequence'
+SELECT_ENTRIES = f"SELECT {', '.join(ENTRY_COLUMNS)} FROM queue_entries"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS queue_entries (
+    life_certificate_no TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    proof_guardian_name TEXT NOT NULL,
+    verification_mode TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    sequence INTEGER NOT NULL,
+    preferred_date TEXT NOT NULL,
+    preferred_time TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    disability INTEGER NOT NULL DEFAULT 0,
+    name_folded TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_queue_entries_order ON queue_entries ({ORDER_BY});
+CREATE INDEX IF NOT EXISTS idx_queue_entries_lane ON queue_entries (verification_mode, {ORDER_BY});
+CREATE INDEX IF NOT EXISTS idx_queue_entries_slot ON queue_entries (preferred_date, preferred_time);
+CREATE INDEX IF NOT EXISTS idx_queue_entries_phone ON queue_entries (phone);
+CREATE TABLE IF NOT EXISTS queue_meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS queue_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS slot_counts (
+    day TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    booked INTEGER NOT NULL,
+    PRIMARY KEY (day, slot)
+);
+CREATE TABLE IF NOT EXISTS service_counters (
+    name TEXT PRIMARY KEY,
+    config TEXT NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queue_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    finished_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    life_certificate_no TEXT NOT NULL,
+    counter TEXT,
+    verification_mode TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_history_finished ON queue_history (finished_at);
+CREATE TABLE IF NOT EXISTS history_hours (
+    hour INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    verification_mode TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    wait_sum REAL NOT NULL,
+    wait_max REAL NOT NULL,
+    PRIMARY KEY (hour, outcome, verification_mode)
+);
+CREATE TABLE IF NOT EXISTS queue_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    version INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_events_version ON queue_events (version);
+"""
+
+
+class SQLiteQueueManager:
+    """QueueManager backed by a shared SQLite database in WAL mode"""
+
+    def __init__(self, path: str, event_buffer_size: int = 1000, poll_interval: float = 0.1,
+                 service_times: Optional[ServiceTimeEstimator] = None,
+                 slots: Optional[SlotSchedule] = None, policy: Optional[PriorityPolicy] = None,
+                 capacity: Optional[int] = None):
+        self.path = path
+        self._slots = slots or SlotSchedule()
+        # Levels only: aging would mean rewriting rows, so it is left to the in-memory manager
+        self._policy = policy or PriorityPolicy()
+        self._capacity = capacity or None
+        # Only the settings are used; estimator state lives in queue_meta so every process shares it
+        self._service_time_config = service_times or ServiceTimeEstimator()
+        self._event_buffer_size = event_buffer_size
+        self._poll_interval = poll_interval
+        self._local = local()
+
+        self._conn().executescript(SCHEMA)
+        columns = {row[1] for row in self._conn().execute("PRAGMA table_info(queue_entries)")}
+        if 'disability' not in columns:
+            self._conn().execute(
+                "ALTER TABLE queue_entries ADD COLUMN disability INTEGER NOT NULL DEFAULT 0"
+            )
+        if 'name_folded' not in columns:
+            self._fold_names()
+        self._conn().execute("CREATE INDEX IF NOT EXISTS idx_queue_entries_name_folded "
+                             f"ON queue_entries (name_folded, {ORDER_BY})")
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO queue_meta (key, value) VALUES ('version', 0), "
+                "('sequence_counter', 0), ('instance_id', ?), ('last_updated', ?), "
+                "('now_serving', NULL), ('service_times', '{}')",
+                (os.urandom(4).hex(), datetime.utcnow().isoformat() + "Z")
+            )
+            if self._meta(conn, 'slot_minutes') != self._slots.slot_minutes:
+                self._rebuild_slot_counts(conn)
+        self.instance_id = self._meta(self._conn(), 'instance_id')
+
+    def _fold_names(self):
+        """Add the searched name column to a database made before it"""
+        with self._write() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(queue_entries)")}
+            if 'name_folded' in columns:
+                return
+            conn.execute("ALTER TABLE queue_entries "
+                         "ADD COLUMN name_folded TEXT NOT NULL DEFAULT ''")
+            conn.execute("DROP INDEX IF EXISTS idx_queue_entries_name")
+            names = conn.execute("SELECT life_certificate_no, name FROM queue_entries").fetchall()
+            conn.executemany(
+                "UPDATE queue_entries SET name_folded = ? WHERE life_certificate_no = ?",
+                [(fold_name(name), cert_no) for cert_no, name in names]
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        started = time.perf_counter()
+        # The database write lock plays the part of QueueManager's lock
+        conn.execute('BEGIN IMMEDIATE')
+        acquired = time.perf_counter()
+        LOCK_WAIT_SECONDS.observe(acquired - started, 'sqlite')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            if conn.in_transaction:
+                conn.execute('COMMIT')
+            LOCK_HOLD_SECONDS.observe(time.perf_counter() - acquired, 'sqlite')
+
+    @contextmanager
+    def _read(self):
+        conn = self._conn()
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            conn.execute('COMMIT')
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str) -> Any:
+        row = conn.execute("SELECT value FROM queue_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _rebuild_slot_counts(self, conn: sqlite3.Connection):
+        """Recount slot bookings, for databases created before slots or with another slot length"""
+        booked = Counter()
+        for preferred_date, preferred_time, count in conn.execute(
+                "SELECT preferred_date, preferred_time, COUNT(*) FROM queue_entries "
+                "GROUP BY preferred_date, preferred_time"):
+            slot = format_minutes(self._slots.bucket(parse_minutes(preferred_time)))
+            booked[(preferred_date, slot)] += count
+        conn.execute("DELETE FROM slot_counts")
+        conn.executemany("INSERT INTO slot_counts (day, slot, booked) VALUES (?, ?, ?)",
+                         [(day, slot, count) for (day, slot), count in booked.items()])
+        conn.execute("INSERT OR REPLACE INTO queue_meta (key, value) VALUES ('slot_minutes', ?)",
+                     (self._slots.slot_minutes,))
+
+    @staticmethod
+    def _entry(row) -> QueueEntry:
+        return QueueEntry.from_record(dict(zip(ENTRY_COLUMNS, row)))
+
+    @property
+    def version(self) -> int:
+        return self._meta(self._conn(), 'version')
+
+    def survives_close(self) -> bool:
+        return True
+
+    def carryover(self) -> Optional[Dict[str, Any]]:
+        # Counters and service times live in the database
+        return None
+
+    def close(self):
+        """Close this thread's connection; other threads' close when the manager is dropped"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _service_times(self, conn: sqlite3.Connection) -> ServiceTimeEstimator:
+        config = self._service_time_config
+        estimator = ServiceTimeEstimator(config.default_seconds, config.smoothing,
+                                         config.outlier_factor)
+        estimator.load(json.loads(self._meta(conn, 'service_times')))
+        return estimator
+
+    def _mark_updated(self, conn: sqlite3.Connection, event_type: str, data: Dict[str, Any],
+                      served: Sequence[str] = (), counter: Optional[str] = None):
+        """Bump the version and record change events inside the current write transaction"""
+        service_times = self._service_times(conn)
+        if served:
+            service_times.served(served, counter)
+        for mode in VERIFICATION_MODES:
+            if self._counter(conn, f'mode:{mode}') > 0:
+                service_times.waiting(mode)
+            else:
+                service_times.idle(mode)
+        conn.execute("UPDATE queue_meta SET value = ? WHERE key = 'service_times'",
+                     (json.dumps(service_times.to_dict()),))
+
+        version = self._meta(conn, 'version') + 1
+        conn.execute("UPDATE queue_meta SET value = ? WHERE key = 'version'", (version,))
+        conn.execute("UPDATE queue_meta SET value = ? WHERE key = 'last_updated'",
+                     (datetime.utcnow().isoformat() + "Z",))
+
+        events = [(version, event_type, json.dumps(data))]
+        head = conn.execute(
+            f"SELECT life_certificate_no FROM queue_entries ORDER BY {ORDER_BY} LIMIT 1"
+        ).fetchone()
+        head = head[0] if head else None
+        if head != self._meta(conn, 'now_serving'):
+            conn.execute("UPDATE queue_meta SET value = ? WHERE key = 'now_serving'", (head,))
+            events.append((version, 'now_serving', json.dumps({'life_certificate_no': head})))
+        conn.executemany("INSERT INTO queue_events (version, type, data) VALUES (?, ?, ?)", events)
+        conn.execute("DELETE FROM queue_events WHERE version <= ?",
+                     (version - self._event_buffer_size,))
+
+    def _count(self, conn: sqlite3.Connection, entry: QueueEntry, delta: int):
+        conn.executemany(
+            "INSERT INTO queue_counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [
+                ('total', delta),
+                (f'priority:{entry.priority}', delta),
+                (f'mode:{entry.verification_mode}', delta),
+                (f'date:{entry.preferred_date}', delta),
+                ('age_sum', delta * entry.age),
+            ]
+        )
+        slot = format_minutes(self._slots.bucket(entry.minutes))
+        conn.execute(
+            "INSERT INTO slot_counts (day, slot, booked) VALUES (?, ?, ?) "
+            "ON CONFLICT(day, slot) DO UPDATE SET booked = booked + excluded.booked",
+            (entry.preferred_date, slot, delta)
+        )
+        if delta < 0:
+            conn.execute("DELETE FROM queue_counters WHERE name = ? AND value <= 0",
+                         (f'date:{entry.preferred_date}',))
+            conn.execute("DELETE FROM slot_counts WHERE day = ? AND slot = ? AND booked <= 0",
+                         (entry.preferred_date, slot))
+
+    @staticmethod
+    def _archive(conn: sqlite3.Connection, entries: List[QueueEntry], outcome: str,
+                 counter: Optional[str] = None):
+        """Record entries leaving the queue in the history table and its hourly rollup"""
+        finished_at = time.time()
+        hour = int(finished_at // 3600 * 3600)
+        records = []
+        for entry in entries:
+            enqueued_at = parse_timestamp(entry.created_at) or 0.0
+            records.append((finished_at, enqueued_at, entry.life_certificate_no, counter,
+                            entry.verification_mode, entry.priority, outcome))
+        conn.executemany(
+            "INSERT INTO queue_history (finished_at, enqueued_at, life_certificate_no, counter, "
+            "verification_mode, priority, outcome) VALUES (?, ?, ?, ?, ?, ?, ?)", records
+        )
+        conn.executemany(
+            "INSERT INTO history_hours "
+            "(hour, outcome, verification_mode, count, wait_sum, wait_max) "
+            "VALUES (?, ?, ?, 1, ?, ?) "
+            "ON CONFLICT(hour, outcome, verification_mode) DO UPDATE SET "
+            "count = count + 1, wait_sum = wait_sum + excluded.wait_sum, "
+            "wait_max = max(wait_max, excluded.wait_max)",
+            [(hour, outcome, mode, max(finished - enqueued, 0.0), max(finished - enqueued, 0.0))
+             for finished, enqueued, _, _, mode, _, _ in records]
+        )
+
+    def _slot_full(self, conn: sqlite3.Connection, person_data: dict) -> Optional[str]:
+        """Why a validated person can't be booked into their time slot, if they can't"""
+        day, bucket = self._slots.slot_of(person_data['preferred_date'],
+                                          person_data['preferred_time'])
+        row = conn.execute("SELECT booked FROM slot_counts WHERE day = ? AND slot = ?",
+                           (format_day(day), format_minutes(bucket))).fetchone()
+        if self._slots.is_full(day, bucket, row[0] if row else 0):
+            return self._slots.full_message(day, bucket)
+        return None
+
+    @staticmethod
+    def _ahead_in_mode(conn: sqlite3.Connection, entry: QueueEntry, mode: str) -> int:
+        """People of ``mode`` who come before ``entry`` in serving order"""
+        return conn.execute(
+            "SELECT COUNT(*) FROM queue_entries WHERE verification_mode = ? "
+            "AND (priority, preferred_date, preferred_time, sequence) < (?, ?, ?, ?)",
+            (mode, entry.priority, entry.preferred_date, entry.preferred_time, entry.sequence)
+        ).fetchone()[0]
+
+    @staticmethod
+    def _position(conn: sqlite3.Connection, entry: QueueEntry) -> int:
+        return conn.execute(
+            "SELECT COUNT(*) FROM queue_entries "
+            "WHERE (priority, preferred_date, preferred_time, sequence) < (?, ?, ?, ?)",
+            (entry.priority, entry.preferred_date, entry.preferred_time, entry.sequence)
+        ).fetchone()[0] + 1
+
+    def _new_entry(self, conn: sqlite3.Connection, person_data: dict, sequence: int) -> QueueEntry:
+        age = int(person_data['age'])
+        disability = parse_flag(person_data.get('disability'))
+        entry = QueueEntry(
+            life_certificate_no=person_data['life_certificate_no'],
+            name=person_data['name'],
+            age=age,
+            phone=person_data['phone'],
+            proof_guardian_name=person_data['proof_guardian_name'],
+            verification_mode=person_data['verification_mode'],
+            priority=self._policy.level(age, disability),
+            sequence=sequence,
+            preferred_date=person_data['preferred_date'],
+            preferred_time=person_data['preferred_time'],
+            disability=disability
+        )
+        record = entry.to_record()
+        conn.execute(
+            f"INSERT INTO queue_entries ({', '.join(ENTRY_COLUMNS)}, name_folded) "
+            f"VALUES ({', '.join('?' * len(ENTRY_COLUMNS))}, ?)",
+            [record[column] for column in ENTRY_COLUMNS] + [fold_name(entry.name)]
+        )
+        return entry
+
+    @instrumented('sqlite')
+    def enqueue(self, person_data: dict) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        is_valid, error_msg = validate_person_data(person_data)
+        if not is_valid:
+            return False, error_msg, None
+
+        cert_no = person_data['life_certificate_no']
+        with self._write() as conn:
+            exists = conn.execute("SELECT 1 FROM queue_entries WHERE life_certificate_no = ?",
+                                  (cert_no,)).fetchone()
+            if exists:
+                return False, already_queued(cert_no), None
+            if self._capacity is not None and self._counter(conn, 'total') >= self._capacity:
+                return False, QUEUE_FULL_MESSAGE, None
+            full = self._slot_full(conn, person_data)
+            if full is not None:
+                return False, full, None
+
+            sequence = self._meta(conn, 'sequence_counter')
+            entry = self._new_entry(conn, person_data, sequence)
+            conn.execute("UPDATE queue_meta SET value = ? WHERE key = 'sequence_counter'",
+                         (sequence + 1,))
+            self._count(conn, entry, 1)
+
+            entry_dict = entry.to_dict()
+            position = self._position(conn, entry)
+            self._mark_updated(conn, 'enqueued', dict(entry_dict, position=position))
+
+        return True, "Person added to queue successfully", entry_dict
+
+    @instrumented('sqlite')
+    def enqueue_many(self, people: List[dict],
+                     first_row: int = 1) -> tuple[bool, str, Dict[str, Any]]:
+        """Validate and add many people in a single transaction"""
+        results = []
+        valid = []
+        records = [person_data for person_data in people if isinstance(person_data, dict)]
+        row_errors = iter(validate_people(records))
+        for row, person_data in enumerate(people, start=first_row):
+            if not isinstance(person_data, dict):
+                results.append({'row': row, 'life_certificate_no': None, 'success': False,
+                                'message': "Row must be a JSON object"})
+                continue
+            results.append(import_result(row, person_data, next(row_errors)))
+            if results[-1]['success']:
+                valid.append((results[-1], person_data))
+
+        added = []
+        with self._write() as conn:
+            sequence = self._meta(conn, 'sequence_counter')
+            room = None
+            if self._capacity is not None:
+                room = self._capacity - self._counter(conn, 'total')
+            for result, person_data in valid:
+                cert_no = person_data['life_certificate_no']
+                if room is not None and len(added) >= room:
+                    result['success'] = False
+                    result['message'] = QUEUE_FULL_MESSAGE
+                    continue
+                full = self._slot_full(conn, person_data)
+                if full is not None:
+                    result['success'] = False
+                    result['message'] = full
+                    continue
+                try:
+                    entry = self._new_entry(conn, person_data, sequence)
+                except sqlite3.IntegrityError:
+                    result['success'] = False
+                    result['message'] = already_queued(cert_no)
+                    continue
+                sequence += 1
+                self._count(conn, entry, 1)
+                added.append(cert_no)
+                result['message'] = "Person added to queue successfully"
+
+            if added:
+                conn.execute("UPDATE queue_meta SET value = ? WHERE key = 'sequence_counter'",
+                             (sequence,))
+                self._mark_updated(conn, 'bulk_enqueued',
+                                   {'count': len(added), 'life_certificate_nos': added})
+
+        return import_summary(results, len(added))
+
+    def _take_next(self, conn: sqlite3.Connection,
+                   counter: Optional[ServiceCounter]) -> Optional[QueueEntry]:
+        """Delete and return the next entry a counter may serve, inside a write transaction"""
+        if counter is None:
+            row = conn.execute(f"{SELECT_ENTRIES} ORDER BY {ORDER_BY} LIMIT 1").fetchone()
+            if row is None:
+                return None
+            entry = self._entry(row)
+        else:
+            heads = {}
+            for mode in counter.modes:
+                for priority in counter.priorities or (None,):
+                    if priority is None:
+                        row = conn.execute(
+                            f"{SELECT_ENTRIES} WHERE verification_mode = ? "
+                            f"ORDER BY {ORDER_BY} LIMIT 1", (mode,)
+                        ).fetchone()
+                    else:
+                        row = conn.execute(
+                            f"{SELECT_ENTRIES} WHERE verification_mode = ? AND priority = ? "
+                            f"ORDER BY {ORDER_BY} LIMIT 1", (mode, priority)
+                        ).fetchone()
+                    if row is not None:
+                        heads[mode] = self._entry(row)
+                        break
+            if not heads:
+                return None
+            entry = heads[counter.pick(heads)]
+
+        conn.execute("DELETE FROM queue_entries WHERE life_certificate_no = ?",
+                     (entry.life_certificate_no,))
+        self._count(conn, entry, -1)
+        return entry
+
+    def _load_counter(self, conn: sqlite3.Connection,
+                      name: Optional[str]) -> tuple[bool, str, Optional[ServiceCounter]]:
+        if name is None:
+            return True, "", None
+        row = conn.execute("SELECT config, state FROM service_counters WHERE name = ?",
+                           (name,)).fetchone()
+        if row is None:
+            return False, f"Counter {name} not found", None
+        _, _, counter = ServiceCounter.from_config(name, json.loads(row[0]), self._policy.levels)
+        counter.current.update(json.loads(row[1]))
+        return True, "", counter
+
+    @staticmethod
+    def _save_counter_state(conn: sqlite3.Connection, counter: Optional[ServiceCounter]):
+        if counter is not None:
+            conn.execute("UPDATE service_counters SET state = ? WHERE name = ?",
+                         (json.dumps(counter.current), counter.name))
+
+    @instrumented('sqlite')
+    def dequeue(self, counter: Optional[str] = None) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        with self._write() as conn:
+            found, message, service_counter = self._load_counter(conn, counter)
+            if not found:
+                return False, message, None
+
+            entry = self._take_next(conn, service_counter)
+            if entry is None:
+                if counter is None:
+                    return False, "Queue is empty", None
+                return False, f"No one in queue can be served at counter {counter}", None
+
+            self._save_counter_state(conn, service_counter)
+            self._archive(conn, [entry], 'served', counter)
+            data = {'life_certificate_no': entry.life_certificate_no}
+            if counter is not None:
+                data['counter'] = counter
+            self._mark_updated(conn, 'dequeued', data, served=[entry.verification_mode],
+                               counter=counter)
+
+        return True, "Person dequeued successfully", entry.to_dict()
+
+    @instrumented('sqlite')
+    def dequeue_many(self, count: int,
+                     counter: Optional[str] = None) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Serve up to ``count`` people in one transaction, optionally for one counter"""
+        with self._write() as conn:
+            found, message, service_counter = self._load_counter(conn, counter)
+            if not found:
+                return False, message, None
+
+            served = []
+            while len(served) < count:
+                entry = self._take_next(conn, service_counter)
+                if entry is None:
+                    break
+                served.append(entry)
+
+            if not served:
+                if counter is None:
+                    return False, "Queue is empty", None
+                return False, f"No one in queue can be served at counter {counter}", None
+
+            self._save_counter_state(conn, service_counter)
+            self._archive(conn, served, 'served', counter)
+            self._mark_updated(conn, 'bulk_dequeued', {
+                'life_certificate_nos': [entry.life_certificate_no for entry in served],
+                'counter': counter
+            }, served=[entry.verification_mode for entry in served], counter=counter)
+            remaining = self._counter(conn, 'total')
+
+        return True, f"Served {len(served)} person(s)", {
+            'served': [entry.to_dict() for entry in served],
+            'remaining_in_queue': remaining
+        }
+
+    @instrumented('sqlite')
+    def configure_counter(self, name: str,
+                          config: Dict[str, Any]) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Create or replace a named service counter shared by all processes"""
+        success, message, counter = ServiceCounter.from_config(name, config, self._policy.levels)
+        if not success:
+            return False, message, None
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO service_counters (name, config, state) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET config = excluded.config, state = excluded.state",
+                (name, json.dumps(counter.to_dict()), json.dumps(counter.current))
+            )
+        return True, message, counter.to_dict()
+
+    @instrumented('sqlite')
+    def remove_counter(self, name: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        with self._write() as conn:
+            found, message, counter = self._load_counter(conn, name)
+            if not found:
+                return False, message, None
+            conn.execute("DELETE FROM service_counters WHERE name = ?", (name,))
+            service_times = self._service_times(conn)
+            service_times.forget_counter(name)
+            conn.execute("UPDATE queue_meta SET value = ? WHERE key = 'service_times'",
+                         (json.dumps(service_times.to_dict()),))
+        return True, "Counter removed", counter.to_dict()
+
+    @instrumented('sqlite')
+    def get_counters(self) -> List[Dict[str, Any]]:
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT name, config FROM service_counters ORDER BY name"
+            ).fetchall()
+            service_times = self._service_times(conn)
+        return [dict(json.loads(config),
+                     average_service_seconds=service_times.counter_service_seconds(name))
+                for name, config in rows]
+
+    @instrumented('sqlite')
+    def get_slot_availability(self,
+                              preferred_date: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Booked and free places in every time slot of a day, from the slot counts table"""
+        is_valid, error_msg = validate_slot(preferred_date)
+        if not is_valid:
+            return False, error_msg, None
+
+        day = self._slots.slot_of(preferred_date, '00:00')[0]
+        with self._read() as conn:
+            rows = conn.execute("SELECT slot, booked FROM slot_counts WHERE day = ?",
+                                (format_day(day),)).fetchall()
+            version = self._meta(conn, 'version')
+
+        return True, "Slot availability", {
+            'date': format_day(day),
+            'slot_minutes': self._slots.slot_minutes,
+            'version': version,
+            'slots': self._slots.availability(
+                day, {parse_minutes(slot): booked for slot, booked in rows}
+            )
+        }
+
+    @instrumented('sqlite')
+    def get_slot(self, preferred_date: str,
+                 preferred_time: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Who is booked into one time slot, in serving order"""
+        is_valid, error_msg = validate_slot(preferred_date, preferred_time)
+        if not is_valid:
+            return False, error_msg, None
+
+        day, bucket = self._slots.slot_of(preferred_date, preferred_time)
+        with self._read() as conn:
+            # Canonical HH:MM strings sort like the times they stand for
+            members = [row[0] for row in conn.execute(
+                "SELECT life_certificate_no FROM queue_entries "
+                "WHERE preferred_date = ? AND preferred_time >= ? AND preferred_time < ? "
+                f"ORDER BY {ORDER_BY}",
+                (format_day(day), format_minutes(bucket),
+                 format_minutes(bucket + self._slots.slot_minutes))
+            )]
+            version = self._meta(conn, 'version')
+
+        return True, "Slot found", {
+            'date': format_day(day),
+            **self._slots.describe(day, bucket, len(members)),
+            'version': version,
+            'life_certificate_nos': members
+        }
+
+    @instrumented('sqlite')
+    def search(self, phone: Optional[str] = None, name: Optional[str] = None,
+               mode: Optional[str] = None, offset: int = 0,
+               limit: int = 50) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Find entries by phone, name prefix and/or mode through the secondary indexes"""
+        is_valid, error_msg = validate_search(phone, name, mode)
+        if not is_valid:
+            return False, error_msg, None
+
+        conditions, params = [], []
+        order_by = ORDER_BY
+        if phone is not None:
+            conditions.append("phone = ?")
+            params.append(str(phone).strip())
+        if name is not None:
+            # A range on the name_folded index, folded in Python as the memory backend does
+            # (SQLite's lower() only folds ASCII); the bound is the prefix then the last code point
+            prefix = fold_name(name.strip())
+            conditions.append("name_folded >= ? AND name_folded < ?")
+            params.extend([prefix, prefix + '\U0010ffff'])
+            if phone is None:
+                order_by = f"name_folded, {ORDER_BY}"
+        if mode is not None:
+            conditions.append("verification_mode = ?")
+            params.append(mode)
+
+        with self._read() as conn:
+            rows = conn.execute(
+                f"{SELECT_ENTRIES} WHERE {' AND '.join(conditions)} "
+                f"ORDER BY {order_by} LIMIT ? OFFSET ?",
+                params + [limit + 1, offset]
+            ).fetchall()
+            entries = [self._entry(row) for row in rows[:limit]]
+            results = [dict(entry.to_dict(), position=self._position(conn, entry))
+                       for entry in entries]
+            version = self._meta(conn, 'version')
+
+        return True, f"Found {len(results)} matching person(s)", {
+            'offset': offset,
+            'limit': limit,
+            'has_more': len(rows) > limit,
+            'version': version,
+            'results': results
+        }
+
+    @instrumented('sqlite')
+    def get_queue_state(self, raw: bool = False) -> Dict[str, Any]:
+        with self._read() as conn:
+            rows = conn.execute(f"{SELECT_ENTRIES} ORDER BY {ORDER_BY}").fetchall()
+            last_updated = self._meta(conn, 'last_updated')
+            version = self._meta(conn, 'version')
+            seconds_per_person = self._service_times(conn).rates()
+
+        queue_list = []
+        ahead_in_mode = dict.fromkeys(VERIFICATION_MODES, 0)
+        for position, row in enumerate(rows, start=1):
+            entry = self._entry(row)
+            mode = entry.verification_mode
+            eta = eta_minutes(ahead_in_mode[mode], seconds_per_person[mode])
+            ahead_in_mode[mode] += 1
+            queue_list.append(present_entry(entry, position, eta, raw))
+
+        return {
+            'queue_length': len(queue_list),
+            'now_serving': queue_list[0] if queue_list else None,
+            'last_updated': last_updated,
+            'version': version,
+            'queue': queue_list
+        }
+
+    @instrumented('sqlite')
+    def get_queue_page(self, offset: int = 0, limit: int = 50, cursor: Optional[str] = None,
+                       raw: bool = False) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        key = None
+        if cursor is not None:
+            key = decode_cursor(cursor)
+            if key is None:
+                return False, "Invalid cursor", None
+
+        with self._read() as conn:
+            if key is not None:
+                # Keyset pagination straight off the order index
+                key_params = (key.priority, key.preferred_date, key.preferred_time, key.sequence)
+                start = conn.execute(
+                    "SELECT COUNT(*) FROM queue_entries "
+                    "WHERE (priority, preferred_date, preferred_time, sequence) <= (?, ?, ?, ?)",
+                    key_params
+                ).fetchone()[0]
+                rows = conn.execute(
+                    f"{SELECT_ENTRIES} "
+                    "WHERE (priority, preferred_date, preferred_time, sequence) > (?, ?, ?, ?) "
+                    f"ORDER BY {ORDER_BY} LIMIT ?",
+                    key_params + (limit,)
+                ).fetchall()
+            else:
+                start = offset
+                rows = conn.execute(f"{SELECT_ENTRIES} ORDER BY {ORDER_BY} LIMIT ? OFFSET ?",
+                                    (limit, offset)).fetchall()
+            head = rows[0] if rows and start == 0 else \
+                conn.execute(f"{SELECT_ENTRIES} ORDER BY {ORDER_BY} LIMIT 1").fetchone()
+            queue_length = self._counter(conn, 'total')
+            last_updated = self._meta(conn, 'last_updated')
+            version = self._meta(conn, 'version')
+            seconds_per_person = self._service_times(conn).rates()
+            entries = [self._entry(row) for row in rows]
+            # People of each mode ahead of the window, counted off the (mode, order) index
+            ahead_in_mode = {mode: self._ahead_in_mode(conn, entries[0], mode) if entries else 0
+                             for mode in VERIFICATION_MODES}
+
+        queue_list = []
+        for position, entry in enumerate(entries, start=start + 1):
+            mode = entry.verification_mode
+            eta = eta_minutes(ahead_in_mode[mode], seconds_per_person[mode])
+            ahead_in_mode[mode] += 1
+            queue_list.append(present_entry(entry, position, eta, raw))
+
+        has_more = start + len(entries) < queue_length
+        return True, "Queue page", {
+            'queue_length': queue_length,
+            'now_serving': present_entry(self._entry(head), 1, 0, raw) if head else None,
+            'last_updated': last_updated,
+            'version': version,
+            'offset': start,
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': encode_cursor(entries[-1]) if has_more else None,
+            'queue': queue_list
+        }
+
+    @staticmethod
+    def _counter(conn: sqlite3.Connection, name: str) -> int:
+        row = conn.execute("SELECT value FROM queue_counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    @instrumented('sqlite')
+    def get_stats(self) -> Dict[str, Any]:
+        with self._read() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM queue_counters").fetchall())
+            head = conn.execute(
+                f"SELECT life_certificate_no FROM queue_entries ORDER BY {ORDER_BY} LIMIT 1"
+            ).fetchone()
+            last_updated = self._meta(conn, 'last_updated')
+            version = self._meta(conn, 'version')
+            seconds_per_person = self._service_times(conn).rates()
+
+        queue_length = counters.get('total', 0)
+        by_date = {name[5:]: value for name, value in counters.items()
+                   if name.startswith('date:') and value > 0}
+        return {
+            'total_in_queue': queue_length,
+            'priority_0_count': counters.get('priority:0', 0),
+            'priority_1_count': counters.get('priority:1', 0),
+            'by_priority': {level: counters.get(f'priority:{level}', 0)
+                            for level in self._policy.levels},
+            'presence_mode_count': counters.get('mode:presence', 0),
+            'online_mode_count': counters.get('mode:online', 0),
+            'average_age': (round(counters.get('age_sum', 0) / queue_length, 1)
+                            if queue_length else 0),
+            # Lanes are served side by side, so the longest one sets the wait for the last person
+            'estimated_wait_time_minutes': max(
+                eta_minutes(counters.get(f'mode:{mode}', 0), seconds_per_person[mode])
+                for mode in VERIFICATION_MODES
+            ),
+            'service_minutes_per_person': {
+                mode: round(seconds / 60, 1) for mode, seconds in seconds_per_person.items()
+            },
+            'by_preferred_date': dict(sorted(by_date.items())),
+            'now_serving': head[0] if head else None,
+            'last_updated': last_updated,
+            'version': version,
+            'queue_empty': queue_length == 0,
+            'capacity': self._capacity,
+            'queue_full': self._capacity is not None and queue_length >= self._capacity
+        }
+
+    @instrumented('sqlite')
+    def get_history(self, start: Optional[str] = None, end: Optional[str] = None,
+                    outcome: Optional[str] = None, mode: Optional[str] = None, offset: int = 0,
+                    limit: int = 100) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Served and removed entries that left the queue in [start, end), oldest first"""
+        is_valid, error_msg, window = validate_query(start, end, outcome, mode, default_days=1)
+        if not is_valid:
+            return False, error_msg, None
+
+        conditions, params = ["finished_at >= ? AND finished_at < ?"], list(window)
+        if outcome is not None:
+            conditions.append("outcome = ?")
+            params.append(outcome)
+        if mode is not None:
+            conditions.append("verification_mode = ?")
+            params.append(mode)
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT finished_at, enqueued_at, life_certificate_no, counter, "
+                "verification_mode, priority, outcome "
+                f"FROM queue_history WHERE {' AND '.join(conditions)} "
+                "ORDER BY finished_at, id LIMIT ? OFFSET ?",
+                params + [limit + 1, offset]
+            ).fetchall()
+
+        return True, "History", {
+            'from': format_timestamp(window[0]),
+            'to': format_timestamp(window[1]),
+            'offset': offset,
+            'limit': limit,
+            'has_more': len(rows) > limit,
+            'retained_from': None,
+            'records': [record_dict(*row) for row in rows[:limit]]
+        }
+
+    @instrumented('sqlite')
+    def get_history_stats(self, start: Optional[str] = None, end: Optional[str] = None,
+                          by: str = 'day') -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Throughput and waits per day or hour from the hourly rollup table"""
+        is_valid, error_msg, window = validate_query(start, end, by=by, default_days=30)
+        if not is_valid:
+            return False, error_msg, None
+
+        hours: Dict[int, HourStats] = {}
+        with self._read() as conn:
+            for hour, outcome, mode, count, wait_sum, wait_max in conn.execute(
+                    "SELECT hour, outcome, verification_mode, count, wait_sum, wait_max "
+                    "FROM history_hours WHERE hour >= ? AND hour < ? ORDER BY hour", window):
+                stats = hours.setdefault(hour, HourStats())
+                stats.add_count(outcome, mode, count, wait_sum, wait_max)
+
+        return True, "History statistics", summarize_hours(hours.items(), *window, by)
+
+    @instrumented('sqlite')
+    def clear_queue(self):
+        with self._write() as conn:
+            conn.execute("DELETE FROM queue_entries")
+            conn.execute("DELETE FROM queue_counters")
+            conn.execute("DELETE FROM slot_counts")
+            conn.execute("UPDATE queue_meta SET value = 0 WHERE key = 'sequence_counter'")
+            self._mark_updated(conn, 'cleared', {})
+
+    @instrumented('sqlite')
+    def get_entry_by_cert(self, cert_no: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Get specific person's queue information by certificate number"""
+        with self._read() as conn:
+            row = conn.execute(f"{SELECT_ENTRIES} WHERE life_certificate_no = ?",
+                               (cert_no,)).fetchone()
+            if row is None:
+                return False, f"Person with certificate {cert_no} not found in queue", None
+            entry = self._entry(row)
+            position = self._position(conn, entry)
+            ahead_in_mode = self._ahead_in_mode(conn, entry, entry.verification_mode)
+            service_times = self._service_times(conn)
+            seconds_per_person = service_times.seconds_per_person(entry.verification_mode)
+
+        entry_dict = entry.to_dict()
+        entry_dict['position'] = position
+        entry_dict['estimated_wait_time_minutes'] = eta_minutes(ahead_in_mode, seconds_per_person)
+        entry_dict['people_ahead'] = position - 1
+        return True, "Entry found", entry_dict
+
+    @instrumented('sqlite')
+    def remove_entry_by_cert(self, cert_no: str) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Remove specific person from queue by certificate number"""
+        with self._write() as conn:
+            row = conn.execute(f"{SELECT_ENTRIES} WHERE life_certificate_no = ?",
+                               (cert_no,)).fetchone()
+            if row is None:
+                return False, f"Person with certificate {cert_no} not found in queue", None
+            entry = self._entry(row)
+            conn.execute("DELETE FROM queue_entries WHERE life_certificate_no = ?", (cert_no,))
+            self._count(conn, entry, -1)
+            self._archive(conn, [entry], 'removed')
+            self._mark_updated(conn, 'removed', {'life_certificate_nos': [cert_no]})
+
+        return True, "Person removed from queue successfully", entry.to_dict()
+
+    @instrumented('sqlite')
+    def remove_entries_by_cert(self,
+                               cert_nos: List[str]) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Remove many people from queue in a single transaction"""
+        removed = []
+        not_found = []
+        with self._write() as conn:
+            for cert_no in cert_nos:
+                row = conn.execute(f"{SELECT_ENTRIES} WHERE life_certificate_no = ?",
+                               (cert_no,)).fetchone()
+                if row is None:
+                    not_found.append(cert_no)
+                    continue
+                entry = self._entry(row)
+                conn.execute("DELETE FROM queue_entries WHERE life_certificate_no = ?", (cert_no,))
+                self._count(conn, entry, -1)
+                removed.append(entry)
+
+            if removed:
+                self._archive(conn, removed, 'removed')
+                self._mark_updated(conn, 'removed', {
+                    'life_certificate_nos': [entry.life_certificate_no for entry in removed]
+                })
+
+        if not removed:
+            return False, "None of the given certificates were found in queue", {
+                'removed': [], 'not_found': not_found
+            }
+
+        message = f"Removed {len(removed)} person(s) from queue"
+        return True, message, {
+            'removed': [entry.to_dict() for entry in removed], 'not_found': not_found
+        }
+
+    @instrumented('sqlite')
+    def expire_stale(self, cutoff: datetime,
+                     limit: int = 500) -> tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Move up to ``limit`` people whose slot ended by ``cutoff`` to history as expired"""
+        day, minutes = divmod(self._slots.slot_start(cutoff), MINUTES_PER_DAY)
+        with self._write() as conn:
+            # Canonical date and time strings compare like the moments they stand for
+            entries = [self._entry(row) for row in conn.execute(
+                f"{SELECT_ENTRIES} WHERE (preferred_date, preferred_time) < (?, ?) "
+                "ORDER BY preferred_date, preferred_time LIMIT ?",
+                (format_day(day), format_minutes(minutes), limit)
+            )]
+            if entries:
+                conn.executemany("DELETE FROM queue_entries WHERE life_certificate_no = ?",
+                                 [(entry.life_certificate_no,) for entry in entries])
+                for entry in entries:
+                    self._count(conn, entry, -1)
+                self._archive(conn, entries, 'expired')
+                self._mark_updated(conn, 'expired', {
+                    'life_certificate_nos': [entry.life_certificate_no for entry in entries]
+                })
+
+        return True, f"Expired {len(entries)} person(s)", {
+            'life_certificate_nos': [entry.life_certificate_no for entry in entries],
+            'has_more': len(entries) == limit
+        }
+
+    def get_events(self, since: int, timeout: float = 0) -> Dict[str, Any]:
+        """Change events newer than ``since``, polling the event table up to ``timeout`` seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._read() as conn:
+                version = self._meta(conn, 'version')
+                if version != since or time.monotonic() >= deadline:
+                    oldest = conn.execute("SELECT MIN(version) FROM queue_events").fetchone()[0]
+                    oldest = oldest if oldest is not None else version + 1
+                    reset = since > version or since < oldest - 1
+                    rows = [] if reset else conn.execute(
+                        "SELECT version, type, data FROM queue_events "
+                        "WHERE version > ? ORDER BY id", (since,)
+                    ).fetchall()
+                    return {
+                        'version': version,
+                        'reset': reset,
+                        'events': [{'version': v, 'type': t, 'data': json.loads(d)}
+                                   for v, t, d in rows]
+                    }
+            time.sleep(self._poll_interval)
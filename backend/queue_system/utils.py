@@ -1,57 +1,237 @@
-from datetime import datetime
+import base64
+import re
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
 
-def calculate_priority(age: int) -> int:
-    return 0 if age >= 80 else 1
+from .models import parse_day, parse_minutes, make_sort_key
 
-def validate_person_data(data: dict) -> tuple[bool, str]:
-    required_fields = [
-        'life_certificate_no',
-        'name',
-        'age',
-        'phone',
-        'proof_guardian_name',
-        'verification_mode',
-        'preferred_date',
-        'preferred_time'
-    ]
-    for field in required_fields:
-        if field not in data:
-            return False, f"Missing required field: {field}"
-        if not data[field]:
-            return False, f"Field cannot be empty: {field}"
-    
-    # Validate age
-    try:
-        age = int(data['age'])
-        if age < 0 or age > 150:
-            return False, "Age must be between 0 and 150"
-    except (ValueError, TypeError):
-        return False, "Age must be a valid integer"
-    
-    # Validate verification_mode
-    valid_modes = ['presence', 'online']
-    if data['verification_mode'] not in valid_modes:
-        return False, f"verification_mode must be 'presence' or 'online'"
-    
-    # Validate life_certificate_no format (non-empty string)
-    if not isinstance(data['life_certificate_no'], str) or len(str(data['life_certificate_no']).strip()) == 0:
-        return False, "life_certificate_no must be a non-empty string"
-    
-    # Validate preferred_date format (YYYY-MM-DD)
-    try:
-        datetime.strptime(data['preferred_date'], '%Y-%m-%d')
-    except (ValueError, TypeError):
-        return False, "preferred_date must be in YYYY-MM-DD format (e.g., 2026-01-25)"
-    
-    # Validate preferred_time format (HH:MM)
+VERIFICATION_MODES = ('presence', 'online')
+
+QUEUE_FULL_MESSAGE = "Queue is full, please try again later"
+
+def already_queued(cert_no: str) -> str:
+    return f"Person with life_certificate_no {cert_no} already in queue"
+
+REQUIRED_FIELDS = (
+    'life_certificate_no',
+    'name',
+    'age',
+    'phone',
+    'proof_guardian_name',
+    'verification_mode',
+    'preferred_date',
+    'preferred_time'
+)
+
+# Same patterns strptime uses for '%Y-%m-%d' and '%H:%M'
+_DATE_RE = re.compile(r'(\d\d\d\d)-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])')
+_TIME_RE = re.compile(r'(2[0-3]|[0-1]\d|\d):([0-5]\d|\d)')
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# Branch names end up in URLs and file names
+_BRANCH_RE = re.compile(r'[a-z0-9][a-z0-9_-]{0,63}')
+
+@lru_cache(maxsize=4096)
+def _is_valid_date(value: str) -> bool:
+    match = _DATE_RE.fullmatch(value)
+    if match is None:
+        return False
+    year, month, day = int(match[1]), int(match[2]), int(match[3])
+    if year < 1:
+        return False
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return day <= 29
+    return day <= _DAYS_IN_MONTH[month - 1]
+
+@lru_cache(maxsize=4096)
+def _is_valid_time(value: str) -> bool:
+    return _TIME_RE.fullmatch(value) is not None
+
+def _check_age(value) -> Optional[str]:
     try:
-        datetime.strptime(data['preferred_time'], '%H:%M')
+        age = int(value)
     except (ValueError, TypeError):
-        return False, "preferred_time must be in HH:MM format (e.g., 09:30 or 14:00)"
-    
-    # Validate phone (10 digits)
-    phone = str(data['phone']).strip()
+        return "Age must be a valid integer"
+    if age < 0 or age > 150:
+        return "Age must be between 0 and 150"
+    return None
+
+def _check_verification_mode(value) -> Optional[str]:
+    if value not in VERIFICATION_MODES:
+        return "verification_mode must be 'presence' or 'online'"
+    return None
+
+def _check_life_certificate_no(value) -> Optional[str]:
+    if not isinstance(value, str) or len(value.strip()) == 0:
+        return "life_certificate_no must be a non-empty string"
+    return None
+
+def _check_preferred_date(value) -> Optional[str]:
+    if not isinstance(value, str) or not _is_valid_date(value):
+        return "preferred_date must be in YYYY-MM-DD format (e.g., 2026-01-25)"
+    return None
+
+def _check_preferred_time(value) -> Optional[str]:
+    if not isinstance(value, str) or not _is_valid_time(value):
+        return "preferred_time must be in HH:MM format (e.g., 09:30 or 14:00)"
+    return None
+
+def _check_phone(value) -> Optional[str]:
+    phone = str(value).strip()
     if not phone.isdigit() or len(phone) != 10:
-        return False, "phone must be a 10-digit number"
-    
+        return "phone must be a 10-digit number"
+    return None
+
+_FLAGS = {'true': True, 'yes': True, '1': True, 'false': False, 'no': False, '0': False, '': False}
+
+def parse_flag(value) -> Optional[bool]:
+    """A yes/no field as a JSON boolean, 0/1 or CSV text; missing is False, anything else None"""
+    if value is None:
+        return False
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        return _FLAGS.get(value.strip().lower())
+    return None
+
+def _check_disability(value) -> Optional[str]:
+    if parse_flag(value) is None:
+        return "disability must be true or false"
+    return None
+
+# Value checks in the order their errors are reported
+_VALUE_CHECKS = (
+    ('age', _check_age),
+    ('verification_mode', _check_verification_mode),
+    ('life_certificate_no', _check_life_certificate_no),
+    ('preferred_date', _check_preferred_date),
+    ('preferred_time', _check_preferred_time),
+    ('phone', _check_phone)
+)
+# Checks of optional fields, applied when the field is given
+_OPTIONAL_CHECKS = (
+    ('disability', _check_disability),
+)
+
+def person_errors(data: dict) -> Dict[str, str]:
+    """Problems with a person record keyed by field, empty when it is valid"""
+    errors = {}
+    for field in REQUIRED_FIELDS:
+        if field not in data:
+            errors[field] = f"Missing required field: {field}"
+        elif not data[field]:
+            errors[field] = f"Field cannot be empty: {field}"
+    for field, check in _VALUE_CHECKS:
+        if field not in errors:
+            message = check(data[field])
+            if message is not None:
+                errors[field] = message
+    for field, check in _OPTIONAL_CHECKS:
+        if field in data:
+            message = check(data[field])
+            if message is not None:
+                errors[field] = message
+    return errors
+
+def validate_people(rows: List[dict]) -> List[Dict[str, str]]:
+    """``person_errors`` for many records at once, checked a column at a time"""
+    errors = [{} for _ in rows]
+    for field in REQUIRED_FIELDS:
+        missing = f"Missing required field: {field}"
+        empty = f"Field cannot be empty: {field}"
+        for row_errors, data in zip(errors, rows):
+            if field not in data:
+                row_errors[field] = missing
+            elif not data[field]:
+                row_errors[field] = empty
+    for field, check in _VALUE_CHECKS:
+        for row_errors, data in zip(errors, rows):
+            if field not in row_errors:
+                message = check(data[field])
+                if message is not None:
+                    row_errors[field] = message
+    for field, check in _OPTIONAL_CHECKS:
+        for row_errors, data in zip(errors, rows):
+            if field in data:
+                message = check(data[field])
+                if message is not None:
+                    row_errors[field] = message
+    return errors
+
+def import_result(row: int, data: dict, errors: Dict[str, str]) -> Dict[str, Any]:
+    """Per-row outcome of a bulk import, with field errors when validation failed"""
+    result = {'row': row, 'life_certificate_no': data.get('life_certificate_no'),
+              'success': not errors, 'message': next(iter(errors.values()), "")}
+    if errors:
+        result['errors'] = errors
+    return result
+
+def import_summary(results: List[Dict[str, Any]], added: int) -> tuple[bool, str, Dict[str, Any]]:
+    """Outcome of a bulk import from its per-row results"""
+    summary = {'total': len(results), 'added': added, 'failed': len(results) - added,
+               'results': results}
+    if not added:
+        return False, "No rows were added to queue", summary
+    return True, f"Added {added} of {len(results)} row(s) to queue", summary
+
+def validate_person_data(data: dict) -> tuple[bool, str]:
+    errors = person_errors(data)
+    if errors:
+        return False, next(iter(errors.values()))
     return True, ""
+
+def validate_slot(preferred_date, preferred_time=None) -> tuple[bool, str]:
+    """Check a slot lookup; the time is optional"""
+    message = _check_preferred_date(preferred_date)
+    if message is None and preferred_time is not None:
+        message = _check_preferred_time(preferred_time)
+    if message is not None:
+        return False, message
+    return True, ""
+
+def fold_name(name: str) -> str:
+    """Case-insensitive form of a name for search, the same in every backend"""
+    return name.casefold()
+
+def validate_search(phone=None, name=None, mode=None) -> tuple[bool, str]:
+    """Check search criteria; at least one of phone, name or mode is needed"""
+    if phone is None and name is None and mode is None:
+        return False, "Give a phone, name or mode to search by"
+    if name is not None and not name.strip():
+        return False, "name cannot be empty"
+    if mode is not None:
+        message = _check_verification_mode(mode)
+        if message is not None:
+            return False, message
+    return True, ""
+
+def validate_branch(name: str, reserved=()) -> tuple[bool, str]:
+    """Check a branch name: lowercase letters, digits, '-' and '_', not a reserved path segment"""
+    if not _BRANCH_RE.fullmatch(name):
+        return False, "Branch names are 1-64 lowercase letters, digits, '-' or '_'"
+    if name in reserved:
+        return False, f"'{name}' cannot be used as a branch name"
+    return True, ""
+
+def encode_cursor(entry) -> str:
+    """Opaque page cursor holding the ordering key of the last entry on a page"""
+    raw = f"{entry.priority}|{entry.preferred_date}|{entry.preferred_time}|{entry.sequence}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Optional[SimpleNamespace]:
+    """Turn a page cursor back into an ordering key, or None if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        priority, preferred_date, preferred_time, sequence = \
+            base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        key = SimpleNamespace(
+            priority=int(priority),
+            preferred_date=preferred_date,
+            preferred_time=preferred_time,
+            sequence=int(sequence)
+        )
+        key.sort_key = make_sort_key(key.priority, parse_day(preferred_date),
+                                     parse_minutes(preferred_time), key.sequence)
+        return key
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
@@ -0,0 +1,79 @@
+import math
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+
+RATE_LIMITED_MESSAGE = 'Too many requests, please slow down'
+
+
+def retry_after(wait: float) -> str:
+    """Retry-After value for a wait in seconds, rounded up to at least one"""
+    return str(max(1, math.ceil(wait)))
+
+
+class RateLimiter:
+    """Token buckets per (client, route) in a fixed-size table"""
+
+    def __init__(self, rate: float, burst: int,
+                 limits: Optional[Dict[str, Dict[str, float]]] = None, max_clients: int = 10000):
+        self._default = (rate, max(burst, 1))
+        self._limits = {route: (limit.get('rate', rate), max(limit.get('burst', burst), 1))
+                        for route, limit in (limits or {}).items()}
+        self._max_clients = max_clients
+        self._lock = Lock()
+        # (client, route) -> [tokens, last refill]
+        self._buckets: 'OrderedDict[Tuple[str, str], list]' = OrderedDict()
+        self.rejected = 0
+
+    def limit_for(self, route: str) -> Tuple[float, int]:
+        return self._limits.get(route, self._default)
+
+    def take(self, client: str, route: str) -> float:
+        """Take a token for a request; returns 0 if allowed, else seconds until one is available"""
+        rate, burst = self.limit_for(route)
+        if rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        key = (client, route)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                if len(self._buckets) > self._max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            self.rejected += 1
+            return (1 - bucket[0]) / rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ConcurrencyLimit:
+    """Caps requests in flight, turning away the excess at once"""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit or None
+        self._lock = Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def enter(self) -> bool:
+        with self._lock:
+            if self.limit is not None and self.in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
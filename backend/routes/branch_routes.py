@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify
+from queue_system.utils import validate_branch
+from .queue_routes import registry, route_segments
+
+branches_bp = Blueprint('branches', __name__, url_prefix='/branches')
+
+@branches_bp.route('', methods=['GET'])
+def get_branches():
+    """Queue length, wait and now serving for every branch, without loading unloaded ones"""
+    return jsonify({'success': True, 'data': registry.summary()}), 200
+
+@branches_bp.route('/<branch>', methods=['PUT'])
+def create_branch(branch):
+    """Create a branch listed in BRANCHES, with its database or directories"""
+    is_valid, error_msg = validate_branch(branch, route_segments())
+    if not is_valid or not registry.is_allowed(branch):
+        message = error_msg or f"Branch {branch} is not configured"
+        return jsonify({'success': False, 'message': message}), 404
+    created = registry.create(branch)
+    # Loading the manager is what creates its files
+    with registry.use(branch):
+        pass
+    message = f"Branch {branch} created" if created else f"Branch {branch} already exists"
+    response = {'success': True, 'message': message, 'data': {'branch': branch}}
+    return jsonify(response), 201 if created else 200
@@ -0,0 +1,36 @@
+from flask import Blueprint, Response
+from queue_system import metrics
+from queue_system.utils import VERIFICATION_MODES
+from .queue_routes import concurrency, rate_limiter, registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of latency histograms and queue depth of the loaded branches"""
+    loaded = registry.loaded()
+    branches = sorted((branch, manager.get_stats()) for branch, manager in loaded.items())
+    extra = metrics.gauge('queue_length', 'People currently waiting', [
+        ({'branch': branch}, stats['total_in_queue']) for branch, stats in branches
+    ])
+    extra += metrics.gauge('queue_depth_by_priority', 'People waiting per priority level', [
+        ({'branch': branch, 'priority': str(priority)}, count)
+        for branch, stats in branches for priority, count in stats['by_priority'].items()
+    ])
+    extra += metrics.gauge('queue_depth_by_mode', 'People waiting per verification mode', [
+        ({'branch': branch, 'mode': mode}, stats[f'{mode}_mode_count'])
+        for branch, stats in branches for mode in VERIFICATION_MODES
+    ])
+    extra += metrics.gauge('queue_version', 'Current queue state version', [
+        ({'branch': branch}, stats['version']) for branch, stats in branches
+    ])
+    extra += metrics.gauge('queue_branches_loaded', 'Branch queues currently loaded in memory',
+                           [({}, len(branches))])
+    extra += metrics.gauge('queue_requests_in_flight', 'Queue requests being handled',
+                           [({}, concurrency.in_flight)])
+    extra += metrics.gauge('queue_requests_rejected_total',
+                           'Queue requests turned away by admission control', [
+        ({'reason': 'rate_limit'}, rate_limiter.rejected),
+        ({'reason': 'concurrency'}, concurrency.rejected)
+    ], kind='counter')
+    return Response(metrics.render(extra), mimetype='text/plain; version=0.0.4')
@@ -1,8 +1,229 @@
-from flask import Blueprint, request, jsonify
-from queue_system import QueueManager
+import csv
+import glob
+import io
+import json
+import os
+import time
+from flask import Blueprint, Response, current_app, g, request, jsonify, stream_with_context
+from werkzeug.local import LocalProxy
+from config import Config
+from queue_system import (
+    ExpirySweeper, HistoryStore, Journal, PriorityPolicy, QueueManager, QueueRegistry,
+    ServiceTimeEstimator, SlotSchedule, SQLiteQueueManager
+)
+from queue_system.utils import QUEUE_FULL_MESSAGE, import_summary, validate_branch
+from queue_system.metrics import REQUEST_SECONDS, SERIALIZATION_SECONDS
+from queue_system.serialization import dumps
+from queue_system.slots import SLOT_FULL_PATTERN
+from .admission import RATE_LIMITED_MESSAGE, ConcurrencyLimit, RateLimiter, retry_after
+from .compression import choose_encoding, compress
+from .response_cache import VersionedResponseCache
+
+def branch_directory(directory, branch):
+    """Where a branch keeps its files: the configured directory itself for the default branch"""
+    if not directory or branch == Config.DEFAULT_BRANCH:
+        return directory
+    return os.path.join(directory, 'branches', branch)
+
+def branch_database(branch):
+    if branch == Config.DEFAULT_BRANCH:
+        return Config.SQLITE_PATH
+    root, ext = os.path.splitext(Config.SQLITE_PATH)
+    return f"{root}-{branch}{ext}"
+
+def discover_branches():
+    """Branches with data on disk, so the summary lists them before they are first used"""
+    branches = {Config.DEFAULT_BRANCH}
+    if Config.QUEUE_BACKEND == 'sqlite':
+        root, ext = os.path.splitext(Config.SQLITE_PATH)
+        paths = glob.glob(f"{glob.escape(root)}-*{ext}")
+        branches.update(path[len(root) + 1:len(path) - len(ext)] for path in paths)
+    else:
+        for directory in (Config.JOURNAL_DIR, Config.HISTORY_DIR):
+            if directory and os.path.isdir(os.path.join(directory, 'branches')):
+                branches.update(os.listdir(os.path.join(directory, 'branches')))
+    return sorted(branch for branch in branches if validate_branch(branch)[0])
+
+def create_queue_manager(branch=None, carryover=None):
+    """A manager for ``branch``, taking over the ``carryover`` of the last one unloaded"""
+    branch = branch or Config.DEFAULT_BRANCH
+    if carryover is not None:
+        service_times = carryover['service_times']
+    else:
+        service_times = ServiceTimeEstimator(Config.SERVICE_TIME_SECONDS,
+                                             Config.SERVICE_TIME_SMOOTHING)
+    slots = SlotSchedule(Config.SLOT_MINUTES, Config.SLOT_OPENING, Config.SLOT_CLOSING,
+                         Config.SLOT_CAPACITY, Config.get_slot_capacities())
+    policy = PriorityPolicy(Config.PRIORITY_AGE_BANDS, Config.PRIORITY_DISABILITY_LEVEL,
+                            Config.PRIORITY_AGING_SECONDS, Config.PRIORITY_AGING_FLOOR)
+    if Config.QUEUE_BACKEND == 'sqlite':
+        manager = SQLiteQueueManager(branch_database(branch), service_times=service_times,
+                                     slots=slots, policy=policy, capacity=Config.QUEUE_CAPACITY)
+    else:
+        journal = None
+        if Config.JOURNAL_DIR:
+            journal = Journal(branch_directory(Config.JOURNAL_DIR, branch),
+                              sync=Config.JOURNAL_SYNC,
+                              snapshot_every=Config.JOURNAL_SNAPSHOT_EVERY)
+        history = HistoryStore(branch_directory(Config.HISTORY_DIR, branch) or None,
+                               Config.HISTORY_CAPACITY)
+        manager = QueueManager(journal=journal, service_times=service_times, slots=slots,
+                               history=history, policy=policy, engine=Config.QUEUE_ENGINE,
+                               capacity=Config.QUEUE_CAPACITY)
+    
+    if carryover is not None:
+        manager.adopt_counters(carryover['counters'])
+    else:
+        for name, counter_config in Config.get_service_counters().items():
+            manager.configure_counter(name, counter_config)
+    return manager
 
 queue_bp = Blueprint('queue', __name__, url_prefix='/queue')
-queue_manager = QueueManager()
+# Serialized bodies per branch, each valid for that branch's current version
+response_caches = {}
+registry = QueueRegistry(create_queue_manager, Config.BRANCH_IDLE_SECONDS,
+                         Config.MAX_LOADED_BRANCHES,
+                         on_unload=lambda branch: response_caches.pop(branch, None),
+                         known=discover_branches(), pinned=[Config.DEFAULT_BRANCH],
+                         allowed=Config.get_branches())
+expiry = None
+if Config.EXPIRY_GRACE_MINUTES is not None:
+    expiry = ExpirySweeper(registry, Config.EXPIRY_GRACE_MINUTES, Config.EXPIRY_INTERVAL_SECONDS,
+                           Config.EXPIRY_BATCH, Config.BOOKING_TIMEZONE or None)
+    expiry.start()
+rate_limiter = RateLimiter(Config.RATE_LIMIT_PER_SECOND, Config.RATE_LIMIT_BURST,
+                           Config.get_rate_limits(), Config.RATE_LIMIT_CLIENTS)
+concurrency = ConcurrencyLimit(Config.MAX_CONCURRENT_REQUESTS)
+# The manager of the branch the current request is for; see pin_branch
+queue_manager = LocalProxy(lambda: g.queue_manager)
+reserved_branches = None
+
+def route_segments():
+    """First path segments under /queue, which a branch name would shadow"""
+    global reserved_branches
+    if reserved_branches is None:
+        reserved_branches = frozenset(
+            rule.rule.split('/')[2] for rule in current_app.url_map.iter_rules()
+            if rule.endpoint.startswith(f'{queue_bp.name}.') and rule.rule.count('/') >= 2
+        ) - {''}
+    return reserved_branches
+
+@queue_bp.url_value_preprocessor
+def pop_branch(endpoint, values):
+    g.branch = values.pop('branch', Config.DEFAULT_BRANCH) if values else Config.DEFAULT_BRANCH
+
+@queue_bp.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+def too_many_requests(message, wait):
+    response = jsonify({'success': False, 'message': message})
+    response.status_code = 429
+    response.headers['Retry-After'] = retry_after(wait)
+    return response
+
+@queue_bp.before_request
+def admit():
+    """Turn away requests over the client's rate or the concurrency cap"""
+    route = request.endpoint.rpartition('.')[2] if request.endpoint else 'unmatched'
+    wait = rate_limiter.take(request.remote_addr or '', route)
+    if wait:
+        return too_many_requests(RATE_LIMITED_MESSAGE, wait)
+    if route != 'queue_events':
+        if not concurrency.enter():
+            return too_many_requests('Server is busy, please try again shortly', 1)
+        g.admitted = True
+
+@queue_bp.before_request
+def pin_branch():
+    """Load the request's branch and keep it loaded until the request (or its stream) ends"""
+    is_valid, error_msg = validate_branch(g.branch, route_segments())
+    if not is_valid:
+        return jsonify({'success': False, 'message': error_msg}), 404
+    try:
+        g.queue_manager = registry.acquire(g.branch)
+    except KeyError:
+        return jsonify({'success': False, 'message': f"Branch {g.branch} does not exist"}), 404
+
+@queue_bp.teardown_request
+def unpin_branch(error=None):
+    if 'queue_manager' in g:
+        registry.release(g.branch)
+
+@queue_bp.teardown_request
+def leave(error=None):
+    if g.pop('admitted', False):
+        concurrency.leave()
+
+@queue_bp.after_request
+def record_latency(response):
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    elapsed = time.perf_counter() - g.request_started
+    REQUEST_SECONDS.observe(elapsed, request.method, rule, str(response.status_code))
+    return response
+
+def response_encoding(body):
+    """The encoding to compress ``body`` with, or None if it is too small to bother"""
+    if len(body) < Config.COMPRESS_MIN_BYTES:
+        return None
+    return choose_encoding(request.accept_encodings)
+
+@queue_bp.after_request
+def compress_response(response):
+    """Compress large JSON responses that cached_response did not already encode"""
+    if (response.status_code == 200 and response.mimetype == 'application/json'
+            and not response.is_streamed and 'Content-Encoding' not in response.headers):
+        body = response.get_data()
+        encoding = response_encoding(body)
+        if encoding is not None:
+            response.set_data(compress(body, encoding))
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+    return response
+
+def cached_response(build):
+    """Serve a GET from the per-version cache, answering If-None-Match with 304"""
+    etag = f"{queue_manager.instance_id}-{queue_manager.version}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        return response
+    
+    response_cache = response_caches.get(g.branch)
+    if response_cache is None:
+        response_cache = response_caches.setdefault(g.branch, VersionedResponseCache())
+    key = request.full_path
+    version = queue_manager.version
+    body = response_cache.get(key, version)
+    if body is None:
+        payload, status = build()
+        if status != 200:
+            return jsonify(payload), status
+        version = payload['data']['version']
+        pretty = Config.JSON_PRETTY or request.args.get('pretty') in ('1', 'true')
+        with SERIALIZATION_SECONDS.time('response'):
+            body = dumps(payload, pretty=pretty)
+        response_cache.put(key, version, body)
+        etag = f"{queue_manager.instance_id}-{version}"
+    
+    encoding = response_encoding(body)
+    if encoding is not None:
+        encoded_key = f"{key}|{encoding}"
+        encoded = response_cache.get(encoded_key, version)
+        if encoded is None:
+            with SERIALIZATION_SECONDS.time(encoding):
+                encoded = compress(body, encoding)
+            response_cache.put(encoded_key, version, encoded)
+        body = encoded
+    
+    response = Response(body, status=200, mimetype='application/json')
+    response.set_etag(etag, weak=encoding is not None)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @queue_bp.route('/enqueue', methods=['POST'])
 def enqueue():
@@ -10,27 +231,250 @@ def enqueue():
         return jsonify({'success': False, 'message': 'Invalid content type'}), 400
     
     person_data = request.get_json()
+    if not isinstance(person_data, dict):
+        return jsonify({'success': False, 'message': 'Request body must be a JSON object'}), 400
+    
     success, message, entry = queue_manager.enqueue(person_data)
     
     if success:
         return jsonify({'success': True, 'message': message, 'data': entry}), 201
+    elif message == QUEUE_FULL_MESSAGE or SLOT_FULL_PATTERN.fullmatch(message):
+        return jsonify({'success': False, 'message': message}), 503
     else:
         return jsonify({'success': False, 'message': message}), 400
 
+# Rows handed to enqueue_many at a time, so an upload is never held in memory whole
+IMPORT_CHUNK_ROWS = 1000
+
+class UnreadableRow(ValueError):
+    def __init__(self, row, reason):
+        super().__init__(f"Row {row} could not be read: {reason}")
+        self.row = row
+
+def read_ndjson_rows(stream):
+    """Parse newline-delimited JSON from a byte stream, one row per non-blank line"""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def decoded_lines(stream):
+    """UTF-8 lines of a byte stream, decoded one at a time so a bad byte is pinned to its row"""
+    encoding = 'utf-8-sig'
+    for line in stream:
+        yield line.decode(encoding)
+        encoding = 'utf-8'
+
+def read_csv_rows(stream):
+    """Parse CSV with a header row from a byte stream"""
+    reader = csv.DictReader(decoded_lines(stream))
+    row = 0
+    while True:
+        row += 1
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            raise UnreadableRow(row, "not valid UTF-8")
+        except csv.Error as error:
+            raise UnreadableRow(row, error)
+        yield {key.strip(): (value.strip() if isinstance(value, str) else value)
+               for key, value in values.items() if key is not None}
+
+@queue_bp.route('/import', methods=['POST'])
+def import_entries():
+    """Bulk enqueue from a streamed NDJSON or CSV body"""
+    content_type = request.mimetype
+    # Buffer the raw WSGI stream so line iteration doesn't read byte by byte
+    stream = io.BufferedReader(request.stream, buffer_size=1 << 16)
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        rows = read_ndjson_rows(stream)
+    elif content_type in ('text/csv', 'application/csv'):
+        rows = read_csv_rows(stream)
+    else:
+        message = 'Content type must be application/x-ndjson or text/csv'
+        return jsonify({'success': False, 'message': message}), 415
+    
+    results = []
+    
+    def enqueue_chunk(chunk):
+        summary = queue_manager.enqueue_many(chunk, first_row=len(results) + 1)[2]
+        results.extend(summary['results'])
+        return summary['added']
+    
+    added = 0
+    chunk = []
+    unreadable = None
+    try:
+        for person_data in rows:
+            chunk.append(person_data)
+            if len(chunk) == IMPORT_CHUNK_ROWS:
+                added += enqueue_chunk(chunk)
+                chunk = []
+    except UnreadableRow as error:
+        unreadable = error
+    if chunk:
+        added += enqueue_chunk(chunk)
+    
+    if unreadable is not None:
+        # The rows before it are in the queue; the summary says which
+        summary = import_summary(results, added)[2]
+        return jsonify({'success': False, 'message': str(unreadable), 'row': unreadable.row,
+                        'data': summary}), 400
+    success, message, summary = import_summary(results, added)
+    if success:
+        return jsonify({'success': True, 'message': message, 'data': summary}), 201
+    else:
+        return jsonify({'success': False, 'message': message, 'data': summary}), 400
+
+MAX_PAGE_LIMIT = 500
+
 @queue_bp.route('', methods=['GET'])
 def get_queue():
-    queue_state = queue_manager.get_queue_state()
-    return jsonify({'success': True, 'data': queue_state}), 200
+    args = request.args
+    if not any(param in args for param in ('limit', 'offset', 'cursor')):
+        return cached_response(
+            lambda: ({'success': True, 'data': queue_manager.get_queue_state(raw=True)}, 200)
+        )
+    
+    try:
+        limit = int(args.get('limit', 50))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit and offset must be integers'}), 400
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        return jsonify({'success': False,
+                        'message': f'limit must be between 1 and {MAX_PAGE_LIMIT}'}), 400
+    if offset < 0:
+        return jsonify({'success': False, 'message': 'offset cannot be negative'}), 400
+    
+    def build():
+        success, message, page = queue_manager.get_queue_page(offset, limit, args.get('cursor'),
+                                                              raw=True)
+        if success:
+            return {'success': True, 'data': page}, 200
+        return {'success': False, 'message': message}, 400
+    
+    return cached_response(build)
+
+MAX_EVENT_WAIT_SECONDS = 30
+SSE_KEEPALIVE_SECONDS = 15
+
+def parse_since(value, instance_id):
+    """Accept a bare version or an ETag-style '<prefix>-<version>' token"""
+    if value is None:
+        return None
+    prefix, _, version = value.strip().strip('"').rpartition('-')
+    if prefix and prefix != instance_id:
+        # Token from before a restart, force the client to resync
+        return -1
+    return int(version)
+
+def sse_frames(feed, instance_id):
+    """Server-Sent Events text for one change feed result"""
+    if feed['reset']:
+        return f"id: {instance_id}-{feed['version']}\nevent: reset\ndata: {{}}\n\n"
+    if not feed['events']:
+        return ": keepalive\n\n"
+    return ''.join(
+        f"id: {instance_id}-{event['version']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event['data'])}\n\n"
+        for event in feed['events']
+    )
+
+def event_stream(manager, since):
+    while True:
+        feed = manager.get_events(since, timeout=SSE_KEEPALIVE_SECONDS)
+        yield sse_frames(feed, manager.instance_id)
+        since = feed['version']
+
+@queue_bp.route('/events', methods=['GET'])
+def queue_events():
+    """Change feed: Server-Sent Events, or long-poll JSON with ?since=<version>"""
+    try:
+        since = parse_since(request.headers.get('Last-Event-ID') or request.args.get('since'),
+                            queue_manager.instance_id)
+        timeout = float(request.args.get('timeout', 25))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'since and timeout must be numbers'}), 400
+    if since is None:
+        since = queue_manager.version
+    
+    if 'text/event-stream' in request.headers.get('Accept', '') or request.args.get('stream'):
+        # stream_with_context keeps the branch pinned for as long as the stream is open
+        stream = stream_with_context(event_stream(g.queue_manager, since))
+        return Response(stream, mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    timeout = max(0.0, min(timeout, MAX_EVENT_WAIT_SECONDS))
+    feed = queue_manager.get_events(since, timeout=timeout)
+    return jsonify({'success': True, 'data': feed}), 200
 
 @queue_bp.route('/dequeue', methods=['POST'])
 def dequeue():
-    success, message, entry = queue_manager.dequeue()
+    return serve_next(None)
+
+def serve_next(counter):
+    """Serve one person, or a batch when ?count=N is given"""
+    count = request.args.get('count')
+    if count is None:
+        success, message, entry = queue_manager.dequeue(counter)
+        if success:
+            return jsonify({'success': True, 'message': message, 'data': entry}), 200
+        else:
+            return jsonify({'success': False, 'message': message}), 404
+    
+    try:
+        count = int(count)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'count must be an integer'}), 400
+    if count < 1 or count > MAX_PAGE_LIMIT:
+        return jsonify({'success': False,
+                        'message': f'count must be between 1 and {MAX_PAGE_LIMIT}'}), 400
+    
+    success, message, result = queue_manager.dequeue_many(count, counter)
     
     if success:
-        return jsonify({'success': True, 'message': message, 'data': entry}), 200
+        return jsonify({'success': True, 'message': message, 'data': result}), 200
     else:
         return jsonify({'success': False, 'message': message}), 404
 
+@queue_bp.route('/counters', methods=['GET'])
+def list_counters():
+    return jsonify({'success': True, 'data': queue_manager.get_counters()}), 200
+
+@queue_bp.route('/counters/<name>', methods=['PUT'])
+def configure_counter(name):
+    """Create or replace a service counter (modes, priorities, weights)"""
+    if not request.is_json:
+        return jsonify({'success': False, 'message': 'Invalid content type'}), 400
+    
+    success, message, counter = queue_manager.configure_counter(name, request.get_json())
+    
+    if success:
+        return jsonify({'success': True, 'message': message, 'data': counter}), 200
+    else:
+        return jsonify({'success': False, 'message': message}), 400
+
+@queue_bp.route('/counters/<name>', methods=['DELETE'])
+def remove_counter(name):
+    success, message, counter = queue_manager.remove_counter(name)
+    
+    if success:
+        return jsonify({'success': True, 'message': message, 'data': counter}), 200
+    else:
+        return jsonify({'success': False, 'message': message}), 404
+
+@queue_bp.route('/counters/<name>/dequeue', methods=['POST'])
+def counter_dequeue(name):
+    """Serve the next eligible person at a named counter"""
+    return serve_next(name)
+
 @queue_bp.route('/clear', methods=['POST'])
 def clear_queue():
     queue_manager.clear_queue()
@@ -56,38 +500,108 @@ def remove_entry(cert_no):
     else:
         return jsonify({'success': False, 'message': message}), 404
 
+@queue_bp.route('/entries/remove', methods=['POST'])
+def remove_entries():
+    """Remove many people from queue in one call"""
+    if not request.is_json:
+        return jsonify({'success': False, 'message': 'Invalid content type'}), 400
+    
+    body = request.get_json()
+    if not isinstance(body, dict):
+        return jsonify({'success': False, 'message': 'Request body must be a JSON object'}), 400
+    
+    cert_nos = body.get('life_certificate_nos')
+    if not isinstance(cert_nos, list) or not all(isinstance(c, str) for c in cert_nos):
+        return jsonify({'success': False,
+                        'message': 'life_certificate_nos must be a list of strings'}), 400
+    
+    success, message, result = queue_manager.remove_entries_by_cert(cert_nos)
+    
+    if success:
+        return jsonify({'success': True, 'message': message, 'data': result}), 200
+    else:
+        return jsonify({'success': False, 'message': message, 'data': result}), 404
+
+@queue_bp.route('/slots', methods=['GET'])
+def get_slots():
+    """Booking availability for ?date=YYYY-MM-DD, or one slot's bookings with &time=HH:MM"""
+    preferred_date = request.args.get('date')
+    if preferred_date is None:
+        return jsonify({'success': False, 'message': 'date is required'}), 400
+    preferred_time = request.args.get('time')
+    
+    def build():
+        if preferred_time is None:
+            success, message, slots = queue_manager.get_slot_availability(preferred_date)
+        else:
+            success, message, slots = queue_manager.get_slot(preferred_date, preferred_time)
+        if success:
+            return {'success': True, 'data': slots}, 200
+        return {'success': False, 'message': message}, 400
+    
+    return cached_response(build)
+
+@queue_bp.route('/search', methods=['GET'])
+def search():
+    """Find people by ?phone=, ?name= (prefix, any case) and/or ?mode="""
+    args = request.args
+    try:
+        limit = int(args.get('limit', 50))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit and offset must be integers'}), 400
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        return jsonify({'success': False,
+                        'message': f'limit must be between 1 and {MAX_PAGE_LIMIT}'}), 400
+    if offset < 0:
+        return jsonify({'success': False, 'message': 'offset cannot be negative'}), 400
+    
+    def build():
+        success, message, found = queue_manager.search(args.get('phone'), args.get('name'),
+                                                       args.get('mode'), offset, limit)
+        if success:
+            return {'success': True, 'message': message, 'data': found}, 200
+        return {'success': False, 'message': message}, 400
+    
+    return cached_response(build)
+
+MAX_HISTORY_LIMIT = 1000
+
+@queue_bp.route('/history', methods=['GET'])
+def get_history():
+    """People who left the queue between ?from= and ?to= (default: the last day), oldest first"""
+    args = request.args
+    try:
+        limit = int(args.get('limit', 100))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit and offset must be integers'}), 400
+    if limit < 1 or limit > MAX_HISTORY_LIMIT:
+        return jsonify({'success': False,
+                        'message': f'limit must be between 1 and {MAX_HISTORY_LIMIT}'}), 400
+    if offset < 0:
+        return jsonify({'success': False, 'message': 'offset cannot be negative'}), 400
+    
+    success, message, history = queue_manager.get_history(args.get('from'), args.get('to'),
+                                                          args.get('outcome'), args.get('mode'),
+                                                          offset, limit)
+    if success:
+        return jsonify({'success': True, 'message': message, 'data': history}), 200
+    else:
+        return jsonify({'success': False, 'message': message}), 400
+
+@queue_bp.route('/history/stats', methods=['GET'])
+def get_history_stats():
+    """Served and removed counts and waits per ?by=day|hour between ?from= and ?to="""
+    args = request.args
+    success, message, stats = queue_manager.get_history_stats(args.get('from'), args.get('to'),
+                                                              args.get('by', 'day'))
+    if success:
+        return jsonify({'success': True, 'message': message, 'data': stats}), 200
+    else:
+        return jsonify({'success': False, 'message': message}), 400
+
 @queue_bp.route('/stats', methods=['GET'])
 def get_stats():
     """Get queue statistics"""
-    queue_state = queue_manager.get_queue_state()
-    queue_list = queue_state.get('queue', [])
-    
-    # Count by priority
-    priority_0_count = sum(1 for entry in queue_list if entry.get('priority') == 0)
-    priority_1_count = sum(1 for entry in queue_list if entry.get('priority') == 1)
-    
-    # Count by mode
-    presence_count = sum(1 for entry in queue_list if entry.get('verification_mode') == 'presence')
-    online_count = sum(1 for entry in queue_list if entry.get('verification_mode') == 'online')
-    
-    # Calculate average age
-    ages = [entry.get('age', 0) for entry in queue_list]
-    avg_age = sum(ages) / len(ages) if ages else 0
-    
-    # Estimate wait time (5 minutes per person)
-    estimated_wait = queue_state['queue_length'] * 5
-    
-    stats = {
-        'total_in_queue': queue_state['queue_length'],
-        'priority_0_count': priority_0_count,
-        'priority_1_count': priority_1_count,
-        'presence_mode_count': presence_count,
-        'online_mode_count': online_count,
-        'average_age': round(avg_age, 1),
-        'estimated_wait_time_minutes': estimated_wait,
-        'now_serving': queue_state['now_serving']['life_certificate_no'] if queue_state['now_serving'] else None,
-        'last_updated': queue_state['last_updated'],
-        'queue_empty': queue_state['queue_length'] == 0
-    }
-    
-    return jsonify({'success': True, 'data': stats}), 200
+    return cached_response(lambda: ({'success': True, 'data': queue_manager.get_stats()}, 200))
@@ -0,0 +1,29 @@
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+
+class VersionedResponseCache:
+    """Serialized response bodies keyed by request path, valid for one queue version"""
+
+    def __init__(self, max_entries: int = 256):
+        self._lock = Lock()
+        self._max_entries = max_entries
+        self._version = -1
+        self._bodies: Dict[str, Tuple[int, bytes]] = {}
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        cached = self._bodies.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        return None
+
+    def put(self, key: str, version: int, body: bytes):
+        with self._lock:
+            if version < self._version:
+                return
+            if version > self._version:
+                self._bodies = {}
+                self._version = version
+            if len(self._bodies) >= self._max_entries:
+                self._bodies.pop(next(iter(self._bodies)))
+            self._bodies[key] = (version, body)
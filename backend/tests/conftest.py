@@ -0,0 +1,64 @@
+import os
+import sys
+
+# Pin the settings the tests rely on before config.py is imported; load_dotenv never overrides them,
+# so a developer's .env can't point the tests at a journal, a database or rate limits
+os.environ.update({
+    'QUEUE_BACKEND': 'memory',
+    'QUEUE_ENGINE': 'ranked',
+    'JOURNAL_DIR': '',
+    'HISTORY_DIR': '',
+    'DEFAULT_BRANCH': 'default',
+    'BRANCHES': 'north,south,capped,booking',
+    'BRANCH_IDLE_SECONDS': '900',
+    'MAX_LOADED_BRANCHES': '0',
+    'SERVICE_COUNTERS': '',
+    'SLOT_OPENING': '09:00',
+    'SLOT_CLOSING': '17:00',
+    'SLOT_CAPACITY': '0',
+    'SLOT_CAPACITIES': '',
+    'PRIORITY_AGE_BANDS': '80',
+    'PRIORITY_DISABILITY_LEVEL': '',
+    'PRIORITY_AGING_SECONDS': '0',
+    'EXPIRY_GRACE_MINUTES': '',
+    'QUEUE_CAPACITY': '0',
+    'RATE_LIMIT_PER_SECOND': '0',
+    'RATE_LIMITS': '',
+    'MAX_CONCURRENT_REQUESTS': '0',
+    'TRUSTED_PROXIES': '0',
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+# Drives a running server by hand rather than testing anything itself
+collect_ignore = ['test_api.py']
+
+
+@pytest.fixture
+def person():
+    """Builds a valid person record; ``number`` makes the certificate unique"""
+    def build(number, **fields):
+        record = {
+            'life_certificate_no': f'LC{number:04d}',
+            'name': f'Person {number}',
+            'age': 70,
+            'phone': '9876543210',
+            'proof_guardian_name': 'Guardian',
+            'verification_mode': 'presence',
+            'preferred_date': '2026-01-25',
+            'preferred_time': '10:00'
+        }
+        record.update(fields)
+        return record
+    return build
+
+
+@pytest.fixture
+def client():
+    """Test client of a fresh app whose default branch starts empty"""
+    from app import create_app
+    app = create_app('testing')
+    with app.test_client() as client:
+        client.post('/queue/clear')
+        yield client
@@ -15,6 +15,10 @@ BASE_URL = os.environ.get('API_BASE_URL', 'http://localhost:5000')
 REQUEST_FILE = Path(__file__).parent / "request.json"
 QUEUE_FILE = Path(__file__).parent / "queue.json"
 
+# Last seen ETag and queue data, so unchanged polls can be answered with 304
+_last_etag = None
+_last_queue = None
+
 
 def send_request_from_file():
     """Send request using data from request.json"""
@@ -54,12 +58,18 @@ def send_request_from_file():
 
 
 def fetch_queue():
-    """Fetch current queue state"""
+    """Fetch current queue state, reusing the last copy if the server says it is unchanged"""
+    global _last_etag, _last_queue
     try:
-        response = requests.get(f"{BASE_URL}/queue")
+        headers = {"If-None-Match": _last_etag} if _last_etag else {}
+        response = requests.get(f"{BASE_URL}/queue", headers=headers)
         
+        if response.status_code == 304:
+            return _last_queue
         if response.status_code == 200:
-            return response.json().get('data', {})
+            _last_etag = response.headers.get('ETag')
+            _last_queue = response.json().get('data', {})
+            return _last_queue
         else:
             print(f"❌ Error fetching queue: {response.status_code}")
             return None
@@ -101,15 +111,39 @@ def update_queue_file():
     return False
 
 
+def wait_for_change(since, timeout=25):
+    """Long-poll the change feed; returns the new version, or None if the feed is unavailable"""
+    try:
+        response = requests.get(
+            f"{BASE_URL}/queue/events",
+            params={"since": since, "timeout": timeout},
+            timeout=timeout + 5
+        )
+        if response.status_code != 200:
+            return None
+        return response.json().get('data', {}).get('version')
+    except requests.exceptions.RequestException:
+        return None
+
+
 def monitor_queue(interval=2):
-    """Continuously monitor and update queue"""
-    print(f"\n🔄 Starting queue monitor (updating every {interval}s)")
+    """Continuously monitor and update queue, refreshing only when it changes"""
+    print(f"\n🔄 Starting queue monitor (waiting on change feed, retry every {interval}s)")
     print("Press Ctrl+C to stop\n")
     
     try:
+        update_queue_file()
+        version = (_last_queue or {}).get('version', 0)
         while True:
-            update_queue_file()
-            time.sleep(interval)
+            new_version = wait_for_change(version)
+            if new_version is None:
+                # Feed unavailable, fall back to fixed-interval polling
+                time.sleep(interval)
+                update_queue_file()
+                version = (_last_queue or {}).get('version', 0)
+            elif new_version != version:
+                version = new_version
+                update_queue_file()
     except KeyboardInterrupt:
         print("\n\n⏹️  Monitor stopped")
 
@@ -118,7 +152,7 @@ def main():
     parser = argparse.ArgumentParser(description='Queue Monitor - Send requests and monitor queue')
     parser.add_argument('--send', action='store_true', help='Send request from request.json')
     parser.add_argument('--monitor', action='store_true', help='Continuously monitor queue')
-    parser.add_argument('--interval', type=int, default=2, help='Monitor interval in seconds (default: 2)')
+    parser.add_argument('--interval', type=int, default=2, help='Retry interval in seconds when the change feed is unavailable (default: 2)')
     parser.add_argument('--once', action='store_true', help='Fetch queue once and update queue.json')
     
     args = parser.parse_args()
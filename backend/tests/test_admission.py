@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from config import Config
+from queue_system.utils import QUEUE_FULL_MESSAGE
+from routes import queue_routes
+from routes.admission import ConcurrencyLimit, RateLimiter
+
+SLOTS = {'date': '2026-01-25'}
+
+
+@pytest.fixture
+def rate_limiter(monkeypatch):
+    # A negligible refill rate, so only the burst is available during the test
+    limits = {'get_stats': {'rate': 0.001, 'burst': 1}, 'get_queue': {'rate': 0}}
+    limiter = RateLimiter(0.001, 3, limits=limits)
+    monkeypatch.setattr(queue_routes, 'rate_limiter', limiter)
+    return limiter
+
+
+@pytest.fixture
+def concurrency(monkeypatch):
+    limit = ConcurrencyLimit(1)
+    monkeypatch.setattr(queue_routes, 'concurrency', limit)
+    return limit
+
+
+def test_rate_limit_answers_429_per_client_and_route(client, rate_limiter):
+    statuses = [client.get('/queue/slots', query_string=SLOTS).status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    response = client.get('/queue/slots', query_string=SLOTS)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json() == {'success': False,
+                                   'message': 'Too many requests, please slow down'}
+    # Other routes have their own buckets, clients too, and a rate of 0 means unlimited
+    assert client.get('/queue/stats').status_code == 200
+    assert client.get('/queue/stats').status_code == 429
+    other_client = {'REMOTE_ADDR': '10.0.0.2'}
+    assert client.get('/queue/slots', query_string=SLOTS,
+                      environ_base=other_client).status_code == 200
+    assert all(client.get('/queue').status_code == 200 for _ in range(10))
+    assert rate_limiter.rejected == 3
+
+
+def test_rate_limiter_forgets_least_recent_clients():
+    limiter = RateLimiter(0.001, 1, max_clients=2)
+    assert limiter.take('a', 'route') == 0
+    assert limiter.take('a', 'route') > 0
+    limiter.take('b', 'route')
+    limiter.take('c', 'route')
+    assert len(limiter) == 2
+    # Evicted, so 'a' starts over with a full bucket
+    assert limiter.take('a', 'route') == 0
+
+
+def test_concurrency_cap_answers_429_when_busy(client, concurrency):
+    assert concurrency.enter()  # a request already in flight
+    response = client.get('/queue/stats')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    # The change feed is exempt: long-polls would otherwise hold the cap
+    assert client.get('/queue/events', query_string={'timeout': 0}).status_code == 200
+    concurrency.leave()
+    assert client.get('/queue/stats').status_code == 200
+    assert concurrency.in_flight == 0 and concurrency.rejected == 1
+
+
+def test_full_queue_answers_503(client, person, monkeypatch):
+    monkeypatch.setattr(Config, 'QUEUE_CAPACITY', 2)
+    client.put('/branches/capped')
+    client.post('/queue/capped/clear')
+    statuses = [client.post('/queue/capped/enqueue', json=person(number)).status_code
+                for number in range(3)]
+    assert statuses == [201, 201, 503]
+    response = client.post('/queue/capped/import', data=json.dumps(person(4)),
+                           content_type='application/x-ndjson')
+    assert response.status_code == 400
+    assert response.get_json()['data']['results'][0]['message'] == QUEUE_FULL_MESSAGE
+    client.post('/queue/capped/dequeue')
+    assert client.post('/queue/capped/enqueue', json=person(3)).status_code == 201
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+asgi = pytest.importorskip('asgi')
+
+from queue_system.metrics import REQUEST_SECONDS
+from routes import queue_routes
+from routes.admission import RateLimiter
+
+
+@pytest.fixture(scope='module')
+def loop():
+    # One loop for the module: the change notifier binds to the first loop it runs on
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def get(loop, path, query='', headers=(), first_body_only=False):
+    """Status, headers and body of a GET through the ASGI app"""
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'raw_path': path.encode(),
+             'query_string': query.encode(),
+             'headers': [(name.encode(), value.encode()) for name, value in headers],
+             'client': ('10.1.2.3', 50000), 'server': ('test', 80), 'scheme': 'http',
+             'http_version': '1.1', 'root_path': '', 'asgi': {'version': '3.0'}}
+    messages = []
+    done = asyncio.Event()
+    requested = []
+
+    async def receive():
+        if not requested:
+            requested.append(True)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if first_body_only and message['type'] == 'http.response.body':
+            done.set()
+
+    async def run():
+        task = asyncio.ensure_future(asgi.app(scope, receive, send))
+        await asyncio.wait_for(done.wait() if first_body_only else task, 10)
+        if first_body_only:
+            await asyncio.wait_for(task, 10)
+
+    loop.run_until_complete(run())
+    start = messages[0]
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], dict(start['headers']), body
+
+
+def event_counts():
+    """Observed /queue/events requests by status"""
+    prefix = 'queue_http_request_duration_seconds_count{method="GET",route="/queue/events",status="'
+    return {line[len(prefix):].partition('"')[0]: int(line.rpartition(' ')[2])
+            for line in REQUEST_SECONDS.render() if line.startswith(prefix)}
+
+
+def test_long_poll_answers_from_the_loop(loop, person):
+    manager = asgi.queue_manager
+    manager.clear_queue()
+    since = manager.version
+    loop.call_later(0.05, manager.enqueue, person(1))
+    status, headers, body = get(loop, '/queue/events', f'since={since}&timeout=5')
+    assert status == 200 and headers[b'content-type'] == b'application/json'
+    feed = json.loads(body)['data']
+    assert feed['version'] > since
+    assert [event['type'] for event in feed['events']][:1] == ['enqueued']
+
+
+def test_stream_starts_with_events_after_last_event_id(loop, person):
+    manager = asgi.queue_manager
+    since = manager.version
+    manager.enqueue(person(2))
+    status, headers, body = get(loop, '/queue/events', headers=[
+        ('accept', 'text/event-stream'), ('last-event-id', f'{manager.instance_id}-{since}')
+    ], first_body_only=True)
+    assert status == 200 and headers[b'content-type'].startswith(b'text/event-stream')
+    assert body.startswith(f'id: {manager.instance_id}-{since + 1}\nevent: enqueued\n'.encode())
+
+
+def test_rate_limit_and_metrics_apply(loop, monkeypatch):
+    limiter = RateLimiter(0.001, 1, limits={'queue_events': {'rate': 0.001, 'burst': 1}})
+    monkeypatch.setattr(queue_routes, 'rate_limiter', limiter)
+    before = event_counts()
+    assert get(loop, '/queue/events', 'timeout=0')[0] == 200
+    # Behind no trusted proxy X-Forwarded-For is ignored, so this is the same client
+    status, headers, body = get(loop, '/queue/events', 'timeout=0',
+                                headers=[('x-forwarded-for', '192.0.2.9')])
+    assert status == 429 and int(headers[b'retry-after']) >= 1
+    assert json.loads(body) == {'success': False, 'message': 'Too many requests, please slow down'}
+    after = event_counts()
+    assert after['200'] == before.get('200', 0) + 1
+    assert after['429'] == before.get('429', 0) + 1
@@ -0,0 +1,169 @@
+import os
+import threading
+
+import pytest
+
+from config import Config
+from queue_system import QueueRegistry
+from routes.queue_routes import create_queue_manager
+
+
+@pytest.fixture
+def registry():
+    # Every unpinned branch is idle at once; sweeps only run when the test asks
+    registry = QueueRegistry(create_queue_manager, idle_seconds=0, sweep_interval=3600,
+                             known=[Config.DEFAULT_BRANCH, 'north'], pinned=[Config.DEFAULT_BRANCH])
+    yield registry
+    registry.close()
+
+
+def summary(registry):
+    return {row['branch']: row for row in registry.summary()['branches']}
+
+
+@pytest.fixture
+def on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'JOURNAL_DIR', str(tmp_path / 'journal'))
+    monkeypatch.setattr(Config, 'HISTORY_DIR', str(tmp_path / 'history'))
+
+
+def test_branches_are_independent(client, person):
+    client.put('/branches/north')
+    client.post('/queue/north/clear')
+    assert client.post('/queue/north/enqueue', json=person(1)).status_code == 201
+    assert client.post('/queue/enqueue', json=person(1)).status_code == 201
+    client.post('/queue/dequeue')
+    assert client.get('/queue/north/stats').get_json()['data']['total_in_queue'] == 1
+    assert client.get('/queue/stats').get_json()['data']['total_in_queue'] == 0
+    summary = client.get('/branches').get_json()['data']
+    assert {'default', 'north'} <= {row['branch'] for row in summary['branches']}
+    assert client.post('/queue/stats/enqueue', json=person(2)).status_code in (404, 405)
+
+
+def test_journaled_branch_reloads_with_queue_history_and_counters(registry, on_disk, person):
+    with registry.use('north') as manager:
+        manager.configure_counter('desk', {'modes': ['presence']})
+        for number in range(4):
+            manager.enqueue(person(number, age=60 + 10 * number))
+        manager.dequeue('desk')
+        order = [entry['life_certificate_no'] for entry in manager.get_queue_state()['queue']]
+        service_times = manager.carryover()['service_times']
+    assert registry.sweep() == ['north']
+    assert registry.loaded() == {}
+    assert summary(registry)['north']['total_in_queue'] == 3
+
+    with registry.use('north') as manager:
+        queue = manager.get_queue_state()['queue']
+        assert [entry['life_certificate_no'] for entry in queue] == order
+        assert [record['outcome'] for record in manager.get_history()[2]['records']] == ['served']
+        assert [counter['name'] for counter in manager.get_counters()] == ['desk']
+        assert manager.carryover()['service_times'] is service_times
+
+
+def test_in_memory_history_keeps_a_branch_loaded(registry, person):
+    with registry.use('north') as manager:
+        manager.enqueue(person(1))
+        manager.dequeue()
+    assert registry.sweep() == []
+    with registry.use('north') as manager:
+        assert len(manager.get_history()[2]['records']) == 1
+
+
+def test_empty_branch_reloads_with_its_counters(registry, person):
+    with registry.use('north') as manager:
+        manager.configure_counter('online-desk', {'modes': ['online']})
+    assert registry.sweep() == ['north']
+    with registry.use('north') as manager:
+        assert manager.get_counters()[0]['modes'] == ['online']
+
+
+def test_pinned_and_in_use_branches_stay_loaded(registry):
+    registry.acquire(Config.DEFAULT_BRANCH)
+    registry.release(Config.DEFAULT_BRANCH)
+    registry.acquire('north')
+    assert registry.sweep() == []
+    registry.release('north')
+    assert registry.sweep() == ['north']
+    assert list(registry.loaded()) == [Config.DEFAULT_BRANCH]
+
+
+def test_least_recently_used_go_beyond_max_loaded(on_disk):
+    registry = QueueRegistry(create_queue_manager, idle_seconds=3600, max_loaded=2,
+                             sweep_interval=3600, known=['a', 'b', 'c'])
+    for name in ('a', 'b', 'c'):
+        with registry.use(name):
+            pass
+    assert sorted(registry.loaded()) == ['b', 'c']
+    registry.close()
+
+
+def test_only_configured_branches_are_created(client, person, on_disk, tmp_path):
+    # Neither a read nor a write makes an unknown branch
+    assert client.get('/queue/east/stats').status_code == 404
+    assert client.post('/queue/east/enqueue', json=person(1)).status_code == 404
+    assert client.put('/branches/east').status_code == 404
+    assert client.put('/branches/stats').status_code == 404
+    branches = client.get('/branches').get_json()['data']['branches']
+    assert 'east' not in {row['branch'] for row in branches}
+
+    assert client.get('/queue/south/stats').status_code == 404
+    assert client.put('/branches/south').status_code == 201
+    assert client.put('/branches/south').status_code == 200
+    assert client.get('/queue/south/stats').status_code == 200
+    assert os.listdir(tmp_path / 'journal' / 'branches') == ['south']
+
+
+def test_unloaded_branches_leave_the_registry(registry, on_disk, person):
+    with registry.use('north') as manager:
+        manager.enqueue(person(1))
+    assert registry.sweep() == ['north']
+    assert list(registry._branches) == []
+    assert summary(registry)['north']['total_in_queue'] == 1
+    with pytest.raises(KeyError):
+        registry.acquire('east')
+    with pytest.raises(KeyError):
+        QueueRegistry(create_queue_manager, allowed=['north']).create('east')
+
+
+def test_acquire_racing_unload_never_loads_a_branch_twice():
+    live = []
+    overlaps = []
+    lock = threading.Lock()
+
+    class Manager:
+        def __init__(self, name, carryover):
+            with lock:
+                if live:
+                    overlaps.append(name)
+                live.append(name)
+
+        def survives_close(self):
+            return True
+
+        def get_stats(self):
+            return None
+
+        def carryover(self):
+            return None
+
+        def close(self):
+            with lock:
+                live.remove('north')
+
+    registry = QueueRegistry(Manager, idle_seconds=0, sweep_interval=3600, known=['north'])
+
+    def use():
+        for _ in range(2000):
+            with registry.use('north'):
+                pass
+
+    def sweep():
+        for _ in range(2000):
+            registry.sweep()
+
+    threads = [threading.Thread(target=use) for _ in range(3)] + [threading.Thread(target=sweep)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == [] and len(live) <= 1
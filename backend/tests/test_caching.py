@@ -0,0 +1,57 @@
+from queue_system import serialization
+from routes import queue_routes
+from routes.response_cache import VersionedResponseCache
+
+
+def test_unchanged_queue_answers_304_until_a_write(client, person):
+    first = client.get('/queue/stats')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and not etag.startswith('W/')
+
+    unchanged = client.get('/queue/stats', headers={'If-None-Match': etag})
+    assert unchanged.status_code == 304
+    assert unchanged.get_data() == b''
+    assert unchanged.headers['ETag'] == etag
+
+    # Any one of several tags matches, weak or strong
+    assert client.get('/queue', headers={'If-None-Match': f'"stale", W/{etag}'}).status_code == 304
+
+    client.post('/queue/enqueue', json=person(1))
+    changed = client.get('/queue/stats', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['data']['total_in_queue'] == 1
+
+
+def test_repeat_reads_serialize_once_per_version(client, person, monkeypatch):
+    encoded = []
+
+    def dumps(payload, pretty=False):
+        encoded.append(pretty)
+        return serialization.dumps(payload, pretty)
+
+    monkeypatch.setattr(queue_routes, 'dumps', dumps)
+    client.post('/queue/enqueue', json=person(1))
+    bodies = [client.get('/queue', query_string={'limit': 10}).get_data() for _ in range(3)]
+    assert encoded == [False] and bodies[0] == bodies[2]
+    # Pretty output is a separate variant of the same version
+    assert client.get('/queue', query_string={'limit': 10, 'pretty': 1}).get_data() != bodies[0]
+    client.post('/queue/dequeue')
+    client.get('/queue', query_string={'limit': 10})
+    assert encoded == [False, True, False]
+
+
+def test_cache_keeps_the_newest_version_only():
+    cache = VersionedResponseCache(max_entries=2)
+    cache.put('/queue', 3, b'three')
+    cache.put('/queue', 2, b'late writer')
+    assert cache.get('/queue', 3) == b'three'
+    assert cache.get('/queue', 2) is None
+
+    cache.put('/queue/stats', 4, b'four')
+    assert cache.get('/queue', 3) is None
+    cache.put('/queue', 4, b'a')
+    cache.put('/queue?limit=5', 4, b'b')
+    # Bounded: the oldest key of the version goes first
+    assert cache.get('/queue/stats', 4) is None
+    assert cache.get('/queue?limit=5', 4) == b'b'
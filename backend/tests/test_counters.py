@@ -0,0 +1,39 @@
+import pytest
+
+from queue_system import QueueManager, SQLiteQueueManager
+from queue_system.counters import ServiceCounter
+
+HEADS = {'presence': (1, 'a'), 'online': (0, 'b')}
+
+
+def test_weighted_pick_interleaves_two_to_one():
+    counter = ServiceCounter('desk', weights={'presence': 2, 'online': 1})
+    picks = [counter.pick(HEADS) for _ in range(9)]
+    assert picks == ['presence', 'online', 'presence'] * 3
+    # A lone eligible mode is served without touching the rotation
+    assert counter.pick({'online': HEADS['online']}) == 'online'
+    assert counter.pick(HEADS) == 'presence'
+
+
+def test_unweighted_pick_follows_queue_order():
+    assert ServiceCounter('desk').pick(HEADS) == 'online'
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_weighted_counter_serves_both_lanes_two_to_one(backend, person, tmp_path):
+    if backend == 'memory':
+        manager = QueueManager()
+    else:
+        manager = SQLiteQueueManager(str(tmp_path / 'queue.db'))
+    for number in range(12):
+        mode = 'online' if number % 2 else 'presence'
+        manager.enqueue(person(number, verification_mode=mode))
+    manager.configure_counter('desk', {'weights': {'presence': 2, 'online': 1}})
+    # Served one at a time, so the rotation has to survive between calls (in SQLite, between
+    # transactions)
+    modes = [manager.dequeue('desk')[2]['verification_mode'] for _ in range(9)]
+    assert modes == ['presence', 'online', 'presence'] * 3
+    # Presence ran out first; the rest are online, in queue order
+    rest = manager.dequeue_many(10, 'desk')[2]['served']
+    assert [entry['life_certificate_no'] for entry in rest] == ['LC0007', 'LC0009', 'LC0011']
+    manager.close()
@@ -0,0 +1,118 @@
+import random
+import time
+
+import pytest
+
+from queue_system import PriorityPolicy, QueueManager
+from queue_system.index import BucketIndex, RankedIndex
+
+ENGINES = ('ranked', 'buckets')
+
+
+class Value:
+    def __init__(self, key):
+        self.key = key
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_bucket_index_matches_ranked_index(seed):
+    rnd = random.Random(seed)
+    bucket_count = rnd.choice([1, 3, 20, 200])
+    buckets = BucketIndex(key=lambda value: value.key, bucket=lambda key: key // 1000)
+    ranked = RankedIndex(key=lambda value: value.key)
+    live = []
+    for step in range(500):
+        roll = rnd.random()
+        if roll < 0.45:
+            # Mostly in order within a bucket, as sequence numbers are, sometimes not
+            offset = step if rnd.random() < 0.8 else rnd.randrange(999)
+            value = Value(rnd.randrange(bucket_count) * 1000 + offset % 1000 + step / 1000)
+            buckets.insert(value)
+            ranked.insert(value)
+            live.append(value)
+        elif roll < 0.7 and live:
+            value = buckets.pop_first()
+            assert value is ranked.pop_first()
+            live.remove(value)
+        elif roll < 0.85 and live:
+            value = live.pop(rnd.randrange(len(live)))
+            buckets.remove(value)
+            ranked.remove(value)
+        elif roll < 0.86:
+            buckets.clear()
+            ranked.clear()
+            live = []
+        assert len(buckets) == len(ranked)
+        if live:
+            index = rnd.randrange(len(live))
+            assert buckets.first() is ranked.first()
+            assert buckets[index] is ranked[index] and buckets[-1] is ranked[-1]
+            assert buckets.islice(index, index + 7) == ranked.islice(index, index + 7)
+            value = rnd.choice(live)
+            assert buckets.rank(value) == ranked.rank(value)
+            key = rnd.randrange(bucket_count * 1000)
+            assert buckets.rank_key(key) == ranked.rank_key(key)
+    assert list(buckets) == list(ranked)
+
+
+def queue_view(state):
+    return [(entry['life_certificate_no'], entry['position'], entry['priority'])
+            for entry in state['queue']]
+
+
+def priorities(manager):
+    return [(entry['life_certificate_no'], entry['priority'])
+            for entry in manager.get_queue_state()['queue']]
+
+
+def test_engines_serve_identically(person):
+    rnd = random.Random(23)
+    policy = PriorityPolicy((80, 70), disability_level=0)
+    managers = [QueueManager(engine=engine, policy=policy) for engine in ENGINES]
+    for manager in managers:
+        manager.configure_counter('online', {'modes': ['online'], 'priorities': [0, 2]})
+    served = [[] for _ in managers]
+    for number in range(1500):
+        roll = rnd.random()
+        data = person(number, age=rnd.choice([30, 72, 85]), disability=rnd.random() < 0.1,
+                      verification_mode=rnd.choice(['presence', 'online']),
+                      preferred_time=f'{rnd.randint(9, 16)}:{rnd.choice(["00", "15", "45"])}')
+        counter = rnd.choice([None, 'online'])
+        cert_no = f'LC{rnd.randrange(number + 1):04d}'
+        for manager, log in zip(managers, served):
+            if roll < 0.6:
+                manager.enqueue(data)
+            elif roll < 0.8:
+                success, _, entry = manager.dequeue(counter)
+                log.append(entry['life_certificate_no'] if success else None)
+            else:
+                manager.remove_entry_by_cert(cert_no)
+    assert served[0] == served[1]
+    states = [manager.get_queue_state() for manager in managers]
+    assert queue_view(states[0]) == queue_view(states[1])
+    pages = [manager.get_queue_page(100, 20)[2] for manager in managers]
+    assert queue_view(pages[0]) == queue_view(pages[1])
+    assert managers[0].get_stats()['by_priority'] == managers[1].get_stats()['by_priority']
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_aging_promotes_waiting_people(engine, person, monkeypatch):
+    started = time.time()
+    clock = [started]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    manager = QueueManager(engine=engine, policy=PriorityPolicy((80, 70), aging_seconds=60))
+    manager.enqueue(person(1, age=30))
+    manager.enqueue(person(2, age=75))
+    assert [entry['priority'] for entry in manager.get_queue_state()['queue']] == [1, 2]
+
+    clock[0] = started + 61
+    manager.enqueue(person(3, age=85))
+    # Both moved up a step; the promoted 75-year-old joined before the new 85-year-old
+    assert manager.dequeue()[2]['life_certificate_no'] == 'LC0002'
+    assert priorities(manager) == [('LC0003', 0), ('LC0001', 1)]
+
+    clock[0] = started + 1000
+    # At the top level the 30-year-old's earlier arrival puts them first
+    assert manager.dequeue()[2]['life_certificate_no'] == 'LC0001'
+    assert priorities(manager) == [('LC0003', 0)]
+    assert any(event['type'] == 'promoted' for event in manager.get_events(0)['events'])
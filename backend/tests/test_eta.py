@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from queue_system import QueueManager, ServiceTimeEstimator, SQLiteQueueManager
+
+
+def test_estimator_smooths_intervals_and_skips_idle_time_and_outliers():
+    estimator = ServiceTimeEstimator(default_seconds=300, smoothing=0.5, outlier_factor=5)
+    estimator.waiting('presence', now=0)
+    estimator.served(['presence'], now=100)
+    # One dequeue is no interval yet
+    assert estimator.seconds_per_person('presence') == 300
+    estimator.served(['presence'], now=300)
+    assert estimator.seconds_per_person('presence') == 200
+    estimator.served(['presence', 'presence'], now=500)
+    assert estimator.seconds_per_person('presence') == 150
+
+    # The lane sat empty from 500 to 10000; only the time since it filled again counts
+    estimator.idle('presence')
+    estimator.waiting('presence', now=10000)
+    estimator.served(['presence'], now=10250)
+    assert estimator.seconds_per_person('presence') == 200
+    # A lunch break is far over five times the estimate and ignored
+    estimator.served(['presence'], now=20000)
+    assert estimator.seconds_per_person('presence') == 200
+    assert estimator.rates() == {'presence': 200, 'online': 300}
+
+
+def test_counters_are_timed_separately():
+    estimator = ServiceTimeEstimator(default_seconds=300, smoothing=0.5)
+    estimator.waiting('online', now=0)
+    estimator.served(['online'], counter='desk', now=60)
+    estimator.served(['online'], counter='desk', now=180)
+    assert estimator.counter_service_seconds('desk') == 120
+    assert estimator.counter_service_seconds('other') is None
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, tmp_path):
+    service_times = ServiceTimeEstimator(default_seconds=120, smoothing=1)
+    if request.param == 'memory':
+        manager = QueueManager(service_times=service_times)
+    else:
+        manager = SQLiteQueueManager(str(tmp_path / 'queue.db'), service_times=service_times)
+    yield manager
+    manager.close()
+
+
+def test_eta_counts_people_ahead_in_the_same_mode(manager, person, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    for number in range(7):
+        manager.enqueue(person(number, verification_mode='online' if number % 2 else 'presence'))
+    # Two presence dequeues 10 minutes apart: 600 seconds per presence person
+    manager.configure_counter('desk', {'modes': ['presence']})
+    manager.dequeue('desk')
+    clock[0] += 600
+    manager.dequeue('desk')
+    assert manager.get_stats()['service_minutes_per_person'] == {'presence': 10.0, 'online': 2.0}
+
+    etas = {entry['life_certificate_no']: entry['estimated_wait_time_minutes']
+            for entry in manager.get_queue_state()['queue']}
+    # Presence: LC0004 and LC0006 remain; online keeps the default two minutes each
+    assert etas == {'LC0001': 0, 'LC0003': 2, 'LC0004': 0, 'LC0005': 4, 'LC0006': 10}
+    assert manager.get_entry_by_cert('LC0006')[2]['estimated_wait_time_minutes'] == 10
+    page = manager.get_queue_page(3, 2)[2]['queue']
+    assert len(page) == 2
+    for entry in page:
+        assert entry['estimated_wait_time_minutes'] == etas[entry['life_certificate_no']]
+    # The longest lane sets the wait for the queue as a whole
+    assert manager.get_stats()['estimated_wait_time_minutes'] == 20
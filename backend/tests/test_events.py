@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+
+from queue_system import QueueManager
+
+
+def test_long_poll_wakes_on_the_next_write(person):
+    manager = QueueManager()
+    since = manager.version
+    timer = threading.Timer(0.05, manager.enqueue, [person(1)])
+    timer.start()
+    started = time.monotonic()
+    feed = manager.get_events(since, timeout=5)
+    timer.join()
+    assert time.monotonic() - started < 4
+    assert feed['version'] == since + 1 and not feed['reset']
+    assert [event['type'] for event in feed['events']] == ['enqueued', 'now_serving']
+
+
+def test_resume_returns_only_newer_events_until_the_buffer_runs_out(person):
+    manager = QueueManager(event_buffer_size=3)
+    for number in range(3):
+        manager.enqueue(person(number))
+    resumed = manager.get_events(manager.version - 1)
+    assert [event['data']['life_certificate_no'] for event in resumed['events']] == ['LC0002']
+    caught_up = manager.get_events(manager.version)
+    assert caught_up == {'version': manager.version, 'reset': False, 'events': []}
+
+    manager.dequeue()
+    # Version 1 fell out of the buffer, so a client that saw only version 0 has to refetch
+    assert manager.get_events(0)['reset']
+    assert not manager.get_events(1)['reset']
+    assert manager.get_events(manager.version + 5)['reset']
+
+
+def test_long_poll_endpoint_resumes_from_an_etag(client, person):
+    etag = client.get('/queue').headers['ETag']
+    client.post('/queue/enqueue', json=person(1))
+    feed = client.get('/queue/events', query_string={'since': etag, 'timeout': 0}).json['data']
+    assert [event['type'] for event in feed['events']] == ['enqueued', 'now_serving']
+
+    # A token minted by another process start can't be resumed
+    stale = client.get('/queue/events', query_string={'since': 'feedbeef-1', 'timeout': 0})
+    assert stale.json['data']['reset']
+    assert client.get('/queue/events', query_string={'since': 'x'}).status_code == 400
+
+
+def test_event_stream_resumes_after_last_event_id(client, person):
+    client.post('/queue/enqueue', json=person(1))
+    last_seen = client.get('/queue').headers['ETag'].strip('"')
+    client.post('/queue/enqueue', json=person(2))
+    headers = {'Accept': 'text/event-stream', 'Last-Event-ID': last_seen}
+    response = client.get('/queue/events', headers=headers, buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    frames = next(response.response).decode().split('\n\n')
+    response.close()
+    instance_id, _, version = last_seen.rpartition('-')
+    event_id, event_type, data = frames[0].split('\n')
+    assert (event_id, event_type) == (f'id: {instance_id}-{int(version) + 1}', 'event: enqueued')
+    assert json.loads(data[len('data: '):])['life_certificate_no'] == 'LC0002'
+    # Only what came after the resumed version: the head did not change
+    assert len(frames) == 2 and frames[1] == ''
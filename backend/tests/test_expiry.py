@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from queue_system import ExpirySweeper, QueueManager, QueueRegistry, SQLiteQueueManager
+
+BOOKINGS = [('2026-01-25', '10:15'), ('2026-01-25', '09:40'), ('2026-01-24', '16:00'),
+            ('2026-01-25', '10:00'), ('2026-01-25', '09:10')]
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, tmp_path):
+    if request.param == 'memory':
+        manager = QueueManager()
+    else:
+        manager = SQLiteQueueManager(str(tmp_path / 'queue.db'))
+    yield manager
+    manager.close()
+
+
+def book(manager, person, bookings=BOOKINGS):
+    for number, (preferred_date, preferred_time) in enumerate(bookings):
+        data = person(number, preferred_date=preferred_date, preferred_time=preferred_time)
+        assert manager.enqueue(data)[0]
+
+
+def test_expires_slots_that_ended_by_the_cutoff(manager, person):
+    book(manager, person)
+    # 10:29 is inside the 10:00 slot, which has not ended yet
+    success, _, result = manager.expire_stale(datetime(2026, 1, 25, 10, 29))
+    assert success
+    assert result == {'life_certificate_nos': ['LC0002', 'LC0004', 'LC0001'], 'has_more': False}
+    assert manager.get_stats()['total_in_queue'] == 2
+    history = manager.get_history('2000-01-01', '2100-01-01')[2]['records']
+    assert [(record['life_certificate_no'], record['outcome']) for record in history] == \
+        [('LC0002', 'expired'), ('LC0004', 'expired'), ('LC0001', 'expired')]
+    assert 'expired' in [event['type'] for event in manager.get_events(0)['events']]
+
+    expired = manager.expire_stale(datetime(2026, 1, 25, 10, 30))[2]
+    assert expired['life_certificate_nos'] == ['LC0003', 'LC0000']
+    assert manager.expire_stale(datetime(2026, 1, 26))[2] == {'life_certificate_nos': [],
+                                                               'has_more': False}
+
+
+def test_expires_in_batches(manager, person):
+    book(manager, person)
+    batches = []
+    has_more = True
+    while has_more:
+        result = manager.expire_stale(datetime(2026, 1, 26), limit=2)[2]
+        batches.append(result['life_certificate_nos'])
+        has_more = result['has_more']
+    assert batches == [['LC0002', 'LC0004'], ['LC0001', 'LC0003'], ['LC0000']]
+
+
+def test_sweeper_expires_loaded_branches_only(person):
+    registry = QueueRegistry(lambda name, carryover: QueueManager(), idle_seconds=3600,
+                             sweep_interval=3600, known=['north', 'south'])
+    with registry.use('north') as manager:
+        book(manager, person)
+        manager.enqueue(person(9, preferred_date='2999-01-01'))
+    sweeper = ExpirySweeper(registry, grace_minutes=0, batch=2)
+    assert sweeper.sweep() == 5
+    assert registry.loaded()['north'].get_stats()['total_in_queue'] == 1
+    assert 'south' not in registry.loaded()
+    registry.close()
+    assert sweeper.sweep() == 0
+
+
+def test_cutoff_uses_the_booking_timezone():
+    sweeper = ExpirySweeper(None, grace_minutes=30, timezone='Asia/Kolkata')
+    expected = datetime.now(ZoneInfo('Asia/Kolkata')).replace(tzinfo=None) - timedelta(minutes=30)
+    assert abs(sweeper.cutoff() - expected) < timedelta(seconds=5)
@@ -0,0 +1,54 @@
+import os
+from types import SimpleNamespace
+
+from queue_system import HistoryStore
+from queue_system.history import RECORD
+
+DAY = 1769299200.0  # 2026-01-25T00:00:00Z
+
+
+def entry(cert_no, mode='presence'):
+    return SimpleNamespace(life_certificate_no=cert_no, verification_mode=mode, priority=1,
+                           created_at='2026-01-25T08:00:00Z')
+
+
+def certificates(store):
+    records = store.query(DAY, DAY + 86400, limit=1000)['records']
+    return [(record['life_certificate_no'], record['counter']) for record in records]
+
+
+def test_day_files_keep_text_of_any_length(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    long_cert = 'LC-' + 'प्रमाणपत्र' * 20
+    store.record(entry('LC1'), 'served', 'desk', finished_at=DAY + 3600)
+    store.record(entry(long_cert), 'served', 'counter-for-walk-in-visitors', finished_at=DAY + 7200)
+    store.record_many([entry('LC2'), entry('')], 'removed', finished_at=DAY + 7300)
+    expected = [('LC1', 'desk'), (long_cert, 'counter-for-walk-in-visitors'),
+                ('LC2', None), ('', None)]
+    assert certificates(store) == expected
+    window = store.query(DAY + 7000, DAY + 7250)['records']
+    assert [record['life_certificate_no'] for record in window] == [long_cert]
+    store.close()
+
+    # The open day has no saved rollup, so reopening reads every record back
+    reopened = HistoryStore(str(tmp_path))
+    assert certificates(reopened) == expected
+    assert reopened.stats(DAY, DAY + 86400)['totals']['served'] == 2
+    reopened.close()
+
+
+def test_torn_record_is_dropped_and_its_text_skipped(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.record(entry('LC1'), 'served', finished_at=DAY + 60)
+    store.close()
+    # A crash after the text was written but part way through its record
+    with open(tmp_path / 'history-2026-01-25.txt', 'ab') as text:
+        text.write(b'LC-LOST')
+    with open(tmp_path / 'history-2026-01-25.bin', 'ab') as records:
+        records.write(b'\0' * (RECORD.size // 2))
+
+    store = HistoryStore(str(tmp_path))
+    store.record(entry('LC2'), 'served', 'desk', finished_at=DAY + 120)
+    assert certificates(store) == [('LC1', None), ('LC2', 'desk')]
+    assert os.path.getsize(tmp_path / 'history-2026-01-25.bin') == 2 * RECORD.size
+    store.close()
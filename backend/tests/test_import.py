@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from routes import queue_routes
+
+
+def ndjson(rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows) + '\n'
+
+
+def test_ndjson_import_reports_each_row(client, person):
+    body = ndjson([person(1), 'not json', person(2, age='old'), '', person(1), [1, 2],
+                   person(3, age=90)])
+    response = client.post('/queue/import', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 201
+    summary = response.get_json()['data']
+    assert (summary['total'], summary['added'], summary['failed']) == (6, 2, 4)
+    assert [result['success'] for result in summary['results']] == [True, False, False, False,
+                                                                     False, True]
+    assert [result['row'] for result in summary['results']] == [1, 2, 3, 4, 5, 6]
+    assert 'already in queue' in summary['results'][3]['message']
+    queue = client.get('/queue').get_json()['data']['queue']
+    # Imported rows are ordered like enqueued ones: the over-80 first
+    assert [entry['life_certificate_no'] for entry in queue] == ['LC0003', 'LC0001']
+
+
+def test_csv_import(client, person):
+    rows = [person(number, age=60 + number) for number in range(5)]
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    response = client.post('/queue/import', data=out.getvalue().encode('utf-8-sig'),
+                           content_type='text/csv')
+    assert response.status_code == 201
+    assert response.get_json()['data']['added'] == 5
+    assert client.get('/queue/stats').get_json()['data']['total_in_queue'] == 5
+
+
+def test_import_with_nothing_valid_is_rejected(client, person):
+    response = client.post('/queue/import', data=ndjson([person(1, phone='12')]),
+                           content_type='application/x-ndjson')
+    assert response.status_code == 400
+    assert response.get_json()['data']['failed'] == 1
+
+
+
+def test_unsupported_content_types_answer_415(client, person):
+    for content_type in ('text/plain', 'application/json'):
+        body = json.dumps([person(1)])
+        assert client.post('/queue/import', data=body, content_type=content_type).status_code == 415
+    assert client.get('/queue/stats').get_json()['data']['total_in_queue'] == 0
+
+
+def csv_body(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+def test_rows_are_numbered_across_chunks(client, person, monkeypatch):
+    monkeypatch.setattr(queue_routes, 'IMPORT_CHUNK_ROWS', 2)
+    body = ndjson([person(1), person(2), person(3), person(1), person(4)])
+    response = client.post('/queue/import', data=body, content_type='application/x-ndjson')
+    summary = response.get_json()['data']
+    assert [result['row'] for result in summary['results']] == [1, 2, 3, 4, 5]
+    # A duplicate of a row from an earlier chunk is still caught
+    assert [result['success'] for result in summary['results']] == [True, True, True, False, True]
+    assert (summary['total'], summary['added']) == (5, 4)
+
+
+def test_unreadable_csv_row_answers_400_with_its_number(client, person, monkeypatch):
+    monkeypatch.setattr(queue_routes, 'IMPORT_CHUNK_ROWS', 2)
+    lines = csv_body([person(number) for number in range(4)]).split(b'\n')
+    # Row 3 is the fourth line, after the header
+    lines[3] = lines[3].replace(b'Person', b'Pers\xffon')
+    response = client.post('/queue/import', data=b'\n'.join(lines), content_type='text/csv')
+    assert response.status_code == 400
+    body = response.get_json()
+    assert (body['row'], body['message']) == (3, 'Row 3 could not be read: not valid UTF-8')
+    # Rows before it were imported and are reported
+    assert body['data']['added'] == 2
+    assert client.get('/queue/stats').get_json()['data']['total_in_queue'] == 2
+
+    client.post('/queue/clear')
+    oversized = csv_body([person(1), person(2, name='x' * (csv.field_size_limit() + 1))])
+    response = client.post('/queue/import', data=oversized, content_type='text/csv')
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith('Row 2 could not be read: field larger than')
@@ -0,0 +1,79 @@
+import os
+import shutil
+
+from queue_system import Journal, QueueManager
+from queue_system.journal import SEGMENT_PATTERN
+
+
+def cert_order(manager):
+    return [entry['life_certificate_no'] for entry in manager.get_queue_state()['queue']]
+
+
+def crash_copy(journal, directory):
+    """The journal directory as a crash leaves it: acknowledged records written, nothing closed"""
+    if journal._snapshot_thread is not None:
+        journal._snapshot_thread.join()
+    shutil.copytree(journal.directory, directory)
+    return directory
+
+
+def mutate(manager, person):
+    for number in range(40):
+        manager.enqueue(person(number, age=60 + number % 30, preferred_time=f'{9 + number % 8}:00'))
+        if number % 4 == 0:
+            manager.dequeue()
+        if number % 9 == 0:
+            manager.remove_entries_by_cert([f'LC{number - 1:04d}', f'LC{number - 2:04d}'])
+        if number == 20:
+            manager.clear_queue()
+
+
+def test_recovers_after_crash_from_log_alone(tmp_path, person):
+    journal = Journal(str(tmp_path / 'live'), snapshot_every=10000)
+    manager = QueueManager(journal=journal)
+    mutate(manager, person)
+    directory = crash_copy(journal, str(tmp_path / 'crashed'))
+
+    recovered = QueueManager(journal=Journal(directory))
+    assert cert_order(recovered) == cert_order(manager)
+    assert recovered.version == manager.version
+    assert recovered.get_stats()['total_in_queue'] == manager.get_stats()['total_in_queue']
+    recovered.close()
+    manager.close()
+
+
+def test_recovers_after_crash_from_snapshot_and_log(tmp_path, person):
+    journal = Journal(str(tmp_path / 'live'), snapshot_every=7)
+    manager = QueueManager(journal=journal)
+    mutate(manager, person)
+    directory = crash_copy(journal, str(tmp_path / 'crashed'))
+    assert os.path.exists(os.path.join(directory, 'snapshot.json'))
+
+    recovered = QueueManager(journal=Journal(directory, snapshot_every=7))
+    assert cert_order(recovered) == cert_order(manager)
+    assert recovered.version == manager.version
+    recovered.close()
+    manager.close()
+
+
+def test_torn_tail_is_dropped_and_writing_resumes(tmp_path, person):
+    journal = Journal(str(tmp_path / 'live'))
+    manager = QueueManager(journal=journal)
+    mutate(manager, person)
+    directory = crash_copy(journal, str(tmp_path / 'crashed'))
+    manager.close()
+    segments = sorted(name for name in os.listdir(directory) if SEGMENT_PATTERN.match(name))
+    with open(os.path.join(directory, segments[-1]), 'ab') as f:
+        f.write(b'{"version":999,"type":"enqu')
+
+    recovered = QueueManager(journal=Journal(directory))
+    assert cert_order(recovered) == cert_order(manager)
+    success, _, _ = recovered.enqueue(person(500, age=90))
+    assert success
+    expected = cert_order(recovered)
+    recovered.close()
+
+    reopened = QueueManager(journal=Journal(directory))
+    assert cert_order(reopened) == expected
+    assert reopened.get_entry_by_cert('LC0500')[0]
+    reopened.close()
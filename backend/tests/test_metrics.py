@@ -0,0 +1,69 @@
+from threading import Condition, Thread
+
+from queue_system.metrics import Histogram, TimedLock, gauge
+
+
+def samples(text, name):
+    """Value of each sample line of a metric, keyed by the rest of the line"""
+    values = {}
+    for line in text.splitlines():
+        if line.startswith(name) and not line.startswith('#'):
+            series, _, value = line.rpartition(' ')
+            values[series] = float(value)
+    return values
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('test_seconds', 'Test', ('op',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, 'read')
+    text = '\n'.join(histogram.render())
+    assert samples(text, 'test_seconds') == {
+        'test_seconds_bucket{op="read",le="0.1"}': 2,
+        'test_seconds_bucket{op="read",le="1.0"}': 3,
+        'test_seconds_bucket{op="read",le="+Inf"}': 4,
+        'test_seconds_sum{op="read"}': 3.65,
+        'test_seconds_count{op="read"}': 4
+    }
+
+
+def test_gauge_and_counter_families():
+    lines = gauge('rejected_total', 'Rejections',
+                  [({'reason': 'rate'}, 3), ({'reason': 'busy'}, 0.5)], kind='counter')
+    assert lines == ['# HELP rejected_total Rejections', '# TYPE rejected_total counter',
+                     'rejected_total{reason="rate"} 3', 'rejected_total{reason="busy"} 0.5']
+
+
+def test_timed_lock_works_under_a_condition():
+    lock = TimedLock('test')
+    changed = Condition(lock)
+    ready = []
+
+    def notify():
+        with changed:
+            ready.append(True)
+            changed.notify_all()
+
+    with changed:
+        Thread(target=notify).start()
+        assert changed.wait_for(lambda: ready, timeout=5)
+    assert not lock.locked()
+
+
+def test_metrics_endpoint(client, person):
+    before = samples(client.get('/metrics').get_data(as_text=True),
+                     'queue_operation_duration_seconds_count')
+    client.post('/queue/enqueue', json=person(1))
+    client.post('/queue/enqueue', json=person(2, age=85))
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    counts = samples(text, 'queue_operation_duration_seconds_count')
+    series = 'queue_operation_duration_seconds_count{backend="memory",operation="enqueue"}'
+    assert counts[series] == before.get(series, 0) + 2
+    assert samples(text, 'queue_length')['queue_length{branch="default"}'] == 2
+    depths = samples(text, 'queue_depth_by_priority')
+    assert depths['queue_depth_by_priority{branch="default",priority="0"}'] == 1
+    assert any('route="/queue/enqueue"' in line and 'status="201"' in line
+               for line in text.splitlines())
+    assert '# TYPE queue_requests_rejected_total counter' in text
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from queue_system import QueueManager, SQLiteQueueManager
+from queue_system.models import DAY_BITS, parse_day
+
+DATES = ['2026-01-25', '2026-01-24', '2026-02-01', '2030-06-15', '3000-01-25', '9999-12-31']
+TIMES = ['09:00', '09:30', '10:00', '14:15', '16:59']
+
+
+@pytest.fixture
+def managers(tmp_path):
+    managers = [QueueManager(), SQLiteQueueManager(str(tmp_path / 'queue.db'))]
+    yield managers
+    for manager in managers:
+        manager.close()
+
+
+def cert_order(manager):
+    return [entry['life_certificate_no'] for entry in manager.get_queue_state()['queue']]
+
+
+def test_last_valid_date_fits_the_sort_key():
+    assert parse_day('9999-12-31') < 1 << DAY_BITS
+
+
+def test_memory_and_sqlite_serve_in_the_same_order(managers, person):
+    rnd = random.Random(11)
+    served = [[] for _ in managers]
+    for number in range(300):
+        data = person(number, age=rnd.randint(60, 95), preferred_date=rnd.choice(DATES),
+                      preferred_time=rnd.choice(TIMES),
+                      verification_mode=rnd.choice(['presence', 'online']))
+        for manager in managers:
+            assert manager.enqueue(data)[0]
+        if rnd.random() < 0.2:
+            for manager, log in zip(managers, served):
+                log.append(manager.dequeue()[2]['life_certificate_no'])
+        if rnd.random() < 0.1:
+            cert_no = f'LC{rnd.randrange(number + 1):04d}'
+            assert len({manager.remove_entry_by_cert(cert_no)[0] for manager in managers}) == 1
+    assert served[0] == served[1]
+    assert cert_order(managers[0]) == cert_order(managers[1])
+
+
+def test_priority_outranks_far_future_dates(managers, person):
+    for manager in managers:
+        manager.enqueue(person(1, age=70, preferred_date='3000-01-25'))
+        manager.enqueue(person(2, age=85, preferred_date='3000-02-01'))
+        manager.enqueue(person(3, age=90, preferred_date='9999-12-31'))
+        assert cert_order(manager) == ['LC0002', 'LC0003', 'LC0001']
+        manager.configure_counter('seniors', {'priorities': [0]})
+        served = [manager.dequeue('seniors')[2]['life_certificate_no'] for _ in range(2)]
+        assert served == ['LC0002', 'LC0003']
+        assert not manager.dequeue('seniors')[0]
@@ -0,0 +1,56 @@
+def enqueue_all(client, person, count):
+    for number in range(count):
+        # Mixed ages and times so serving order differs from arrival order
+        age = 85 if number % 3 == 0 else 65
+        data = person(number, age=age, preferred_time=f'{10 + number % 5}:00')
+        response = client.post('/queue/enqueue', json=data)
+        assert response.status_code == 201
+
+
+def full_queue(client):
+    queue = client.get('/queue').get_json()['data']['queue']
+    return [entry['life_certificate_no'] for entry in queue]
+
+
+def test_cursor_pages_cover_the_queue_in_order(client, person):
+    enqueue_all(client, person, 23)
+    seen = []
+    cursor = None
+    while True:
+        query = {'limit': 5} if cursor is None else {'limit': 5, 'cursor': cursor}
+        page = client.get('/queue', query_string=query).get_json()['data']
+        seen += [entry['life_certificate_no'] for entry in page['queue']]
+        positions = range(page['offset'] + 1, page['offset'] + len(page['queue']) + 1)
+        assert [entry['position'] for entry in page['queue']] == list(positions)
+        if not page['has_more']:
+            assert page['next_cursor'] is None
+            break
+        cursor = page['next_cursor']
+    assert seen == full_queue(client)
+
+
+def test_cursor_resumes_after_its_entry_leaves(client, person):
+    enqueue_all(client, person, 10)
+    order = full_queue(client)
+    page = client.get('/queue', query_string={'limit': 4}).get_json()['data']
+    # The entry the cursor points at and the head of the queue both leave
+    client.delete(f'/queue/entry/{order[3]}')
+    client.post('/queue/dequeue')
+    query = {'limit': 4, 'cursor': page['next_cursor']}
+    page = client.get('/queue', query_string=query).get_json()['data']
+    assert [entry['life_certificate_no'] for entry in page['queue']] == order[4:8]
+    assert page['offset'] == 2
+
+
+def test_offset_window(client, person):
+    enqueue_all(client, person, 8)
+    page = client.get('/queue', query_string={'offset': 6, 'limit': 5}).get_json()['data']
+    assert [entry['life_certificate_no'] for entry in page['queue']] == full_queue(client)[6:]
+    assert page['queue_length'] == 8 and not page['has_more']
+
+
+def test_bad_page_parameters(client):
+    assert client.get('/queue', query_string={'cursor': 'not-a-cursor'}).status_code == 400
+    assert client.get('/queue', query_string={'limit': 0}).status_code == 400
+    assert client.get('/queue', query_string={'limit': 'ten'}).status_code == 400
+    assert client.get('/queue', query_string={'offset': -1}).status_code == 400
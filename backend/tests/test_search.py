@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+from queue_system import QueueManager, SQLiteQueueManager
+
+PEOPLE = [
+    ('Ölaf Berg', '9000000001', 'presence', 70),
+    ('ölga Ivanova', '9000000002', 'online', 85),
+    ('Olaf Strand', '9000000001', 'online', 60),
+    ('STRASSE Karl', '9000000003', 'presence', 90),
+    ('Straßer Anna', '9000000004', 'presence', 70),
+    ('Σωκράτης', '9000000005', 'online', 75),
+]
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, person, tmp_path):
+    if request.param == 'memory':
+        manager = QueueManager()
+    else:
+        manager = SQLiteQueueManager(str(tmp_path / 'queue.db'))
+    for number, (name, phone, mode, age) in enumerate(PEOPLE):
+        manager.enqueue(person(number, name=name, phone=phone, verification_mode=mode, age=age))
+    yield manager
+    manager.close()
+
+
+def names(manager, **criteria):
+    success, message, found = manager.search(**criteria)
+    assert success, message
+    return [result['name'] for result in found['results']]
+
+
+def test_name_prefix_folds_case_beyond_ascii(manager):
+    assert names(manager, name='öl') == ['Ölaf Berg', 'ölga Ivanova']
+    assert names(manager, name='ÖLGA') == ['ölga Ivanova']
+    # Full case folding: ß and SS are the same letters
+    assert names(manager, name='strass') == ['STRASSE Karl', 'Straßer Anna']
+    assert names(manager, name='STRAẞER') == ['Straßer Anna']
+    assert names(manager, name='σωκ') == ['Σωκράτης']
+    assert names(manager, name='  olaf ') == ['Olaf Strand']
+    assert names(manager, name='zz') == []
+
+
+def test_phone_and_mode_narrow_each_other(manager):
+    # In serving order, unlike name searches
+    assert names(manager, phone=' 9000000001 ') == ['Ölaf Berg', 'Olaf Strand']
+    assert names(manager, phone='9000000001', mode='presence') == ['Ölaf Berg']
+    assert names(manager, phone='9000000001', name='ö') == ['Ölaf Berg']
+    assert names(manager, mode='online') == ['ölga Ivanova', 'Olaf Strand', 'Σωκράτης']
+
+
+def test_results_carry_positions_and_page(manager):
+    success, _, found = manager.search(mode='presence', offset=1, limit=1)
+    assert found['has_more']
+    [result] = found['results']
+    assert (result['name'], result['position']) == ('Ölaf Berg', 3)
+    assert manager.search()[1] == 'Give a phone, name or mode to search by'
+
+
+def test_existing_database_gains_folded_names(person, tmp_path):
+    path = str(tmp_path / 'queue.db')
+    manager = SQLiteQueueManager(path)
+    manager.enqueue(person(1, name='Ölaf Berg'))
+    manager.close()
+    # The layout before names were folded in Python
+    conn = sqlite3.connect(path)
+    conn.execute("DROP INDEX idx_queue_entries_name_folded")
+    conn.execute("ALTER TABLE queue_entries DROP COLUMN name_folded")
+    conn.execute("CREATE INDEX idx_queue_entries_name ON queue_entries (lower(name))")
+    conn.commit()
+    conn.close()
+
+    manager = SQLiteQueueManager(path)
+    assert names(manager, name='öla') == ['Ölaf Berg']
+    indexes = {row[1] for row in manager._conn().execute("PRAGMA index_list(queue_entries)")}
+    assert 'idx_queue_entries_name' not in indexes
+    manager.close()
+
+
+def test_search_endpoint(client, person):
+    client.post('/queue/enqueue', json=person(1, name='Ölaf Berg'))
+    found = client.get('/queue/search', query_string={'name': 'ÖLAF'}).get_json()['data']
+    assert [result['life_certificate_no'] for result in found['results']] == ['LC0001']
+    assert client.get('/queue/search', query_string={'mode': 'video'}).status_code == 400
+    assert client.get('/queue/search', query_string={'name': 'a', 'limit': 0}).status_code == 400
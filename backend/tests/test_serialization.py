@@ -0,0 +1,89 @@
+import gzip
+import json
+
+import pytest
+
+from config import Config
+from queue_system import QueueManager, SQLiteQueueManager
+from queue_system.models import QueueEntry
+from queue_system.serialization import RawJSON, dumps, encode_fields
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, tmp_path):
+    if request.param == 'memory':
+        manager = QueueManager()
+    else:
+        manager = SQLiteQueueManager(str(tmp_path / 'queue.db'))
+    yield manager
+    manager.close()
+
+
+def test_entry_fields_are_encoded_once(person):
+    entry = QueueEntry(**person(1, name='Ölaf "Berg"'), priority=1, sequence=1)
+    fields = entry.json_fields
+    assert entry.json_fields is fields
+    assert json.loads(b'{%s}' % fields) == entry.to_dict()
+
+
+def test_dumps_splices_fragments_into_plain_values():
+    fragments = [RawJSON(b'{"a":1}'), RawJSON(b'{"b":"\xc3\xb6"}')]
+    payload = {'success': True, 'data': {'queue': fragments, 'head': fragments[0], 'n': None}}
+    body = dumps(payload)
+    assert json.loads(body) == {'success': True,
+                                'data': {'queue': [{'a': 1}, {'b': 'ö'}], 'head': {'a': 1},
+                                         'n': None}}
+    assert b' ' not in body
+    assert json.loads(dumps(payload, pretty=True)) == json.loads(body)
+    assert b'{%s}' % encode_fields({'x': [1, 2]}) == dumps({'x': [1, 2]})
+
+
+def test_raw_listings_match_the_dicts(manager, person):
+    for number in range(5):
+        manager.enqueue(person(number, name=f'Nāma {number}', age=60 + number * 5,
+                               verification_mode='online' if number % 2 else 'presence'))
+    manager.dequeue()
+
+    state = manager.get_queue_state()
+    assert json.loads(dumps(manager.get_queue_state(raw=True))) == json.loads(json.dumps(state))
+    for cursor_args in ({'offset': 0, 'limit': 2}, {'offset': 2, 'limit': 5}):
+        page = manager.get_queue_page(**cursor_args)[2]
+        raw_page = manager.get_queue_page(raw=True, **cursor_args)[2]
+        assert json.loads(dumps(raw_page)) == json.loads(json.dumps(page))
+    assert [entry['position'] for entry in state['queue']] == [1, 2, 3, 4]
+
+
+def test_large_listings_are_gzipped_once_per_version(client, person, monkeypatch):
+    monkeypatch.setattr(Config, 'COMPRESS_MIN_BYTES', 200)
+    for number in range(20):
+        client.post('/queue/enqueue', json=person(number))
+
+    plain = client.get('/queue', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers and not plain.headers['ETag'].startswith('W/')
+
+    zipped = client.get('/queue', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert zipped.headers['ETag'] == 'W/' + plain.headers['ETag']
+    assert 'Accept-Encoding' in zipped.headers['Vary']
+    assert gzip.decompress(zipped.get_data()) == plain.get_data()
+    assert len(zipped.get_data()) < len(plain.get_data()) // 4
+    again = client.get('/queue', headers={'Accept-Encoding': 'gzip'})
+    assert again.get_data() == zipped.get_data()
+    # The weak tag still revalidates the compressed variant
+    etag = zipped.headers['ETag']
+    assert client.get('/queue', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_small_and_uncached_responses(client, person, monkeypatch):
+    small = client.get('/queue/stats', headers={'Accept-Encoding': 'gzip'})
+    assert len(small.get_data()) < Config.COMPRESS_MIN_BYTES
+    assert 'Content-Encoding' not in small.headers and 'Accept-Encoding' in small.headers['Vary']
+
+    monkeypatch.setattr(Config, 'COMPRESS_MIN_BYTES', 200)
+    for number in range(10):
+        client.post('/queue/enqueue', json=person(number, name=f'Ravi {number}'))
+    # Search is not cached per version; the after-request hook compresses it
+    found = client.get('/queue/search', query_string={'name': 'ravi'},
+                       headers={'Accept-Encoding': 'gzip'})
+    assert found.headers['Content-Encoding'] == 'gzip'
+    assert len(json.loads(gzip.decompress(found.get_data()))['data']['results']) == 10
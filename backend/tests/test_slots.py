@@ -0,0 +1,69 @@
+import pytest
+
+from config import Config
+from queue_system import QueueManager, SlotSchedule, SQLiteQueueManager
+
+DATE = '2026-01-25'
+SCHEDULE = dict(slot_minutes=30, opening='09:00', closing='11:00', capacity=2,
+                capacities={'10:00': 3, f'{DATE} 09:30': 1})
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def manager(request, tmp_path):
+    if request.param == 'memory':
+        manager = QueueManager(slots=SlotSchedule(**SCHEDULE))
+    else:
+        manager = SQLiteQueueManager(str(tmp_path / 'queue.db'), slots=SlotSchedule(**SCHEDULE))
+    yield manager
+    manager.close()
+
+
+def availability(manager, preferred_date=DATE):
+    slots = manager.get_slot_availability(preferred_date)[2]['slots']
+    return {slot['time']: (slot['booked'], slot['available'], slot['full']) for slot in slots}
+
+
+def test_availability_counts_bookings_per_slot(manager, person):
+    for number, preferred_time in enumerate(['09:00', '09:10', '09:45', '10:29', '12:00']):
+        assert manager.enqueue(person(number, preferred_time=preferred_time))[0]
+    assert availability(manager) == {
+        '09:00': (2, 0, True),
+        '09:30': (1, 0, True),    # the one-off capacity for this date
+        '10:00': (1, 2, False),   # the daily override
+        '10:30': (0, 2, False),
+        '12:00': (1, 1, False),   # booked outside opening hours, so listed too
+    }
+    assert availability(manager, '2026-01-26')['09:30'] == (0, 2, False)
+    slot = manager.get_slot(DATE, '09:20')[2]
+    assert (slot['time'], slot['life_certificate_nos']) == ('09:00', ['LC0000', 'LC0001'])
+
+
+def test_full_slot_refuses_until_a_place_frees(manager, person):
+    manager.enqueue(person(1, preferred_time='09:30'))
+    success, message, _ = manager.enqueue(person(2, preferred_time='09:59'))
+    assert (success, message) == (False, f'Time slot 09:30 on {DATE} is full')
+    # Other slots and other days still take bookings
+    assert manager.enqueue(person(2, preferred_time='10:00'))[0]
+    assert manager.enqueue(person(3, preferred_time='09:30', preferred_date='2026-01-26'))[0]
+
+    manager.remove_entry_by_cert('LC0001')
+    assert availability(manager)['09:30'] == (0, 1, False)
+    assert manager.enqueue(person(4, preferred_time='09:40'))[0]
+
+
+def test_enqueue_answers_503_for_a_full_slot(client, person, monkeypatch):
+    monkeypatch.setattr(Config, 'SLOT_CAPACITY', 1)
+    client.put('/branches/booking')
+    client.post('/queue/booking/clear')
+    assert client.post('/queue/booking/enqueue', json=person(1)).status_code == 201
+    response = client.post('/queue/booking/enqueue', json=person(2, preferred_time='10:15'))
+    assert response.status_code == 503
+    assert response.get_json()['message'] == f'Time slot 10:00 on {DATE} is full'
+    # A bad booking is still the client's mistake
+    invalid = person(3, preferred_time='25:00')
+    assert client.post('/queue/booking/enqueue', json=invalid).status_code == 400
+
+    slots = client.get('/queue/booking/slots', query_string={'date': DATE}).get_json()['data']
+    assert slots['slot_minutes'] == 30
+    assert {slot['time']: slot['available'] for slot in slots['slots']}['10:00'] == 0
+    assert client.get('/queue/booking/slots').status_code == 400
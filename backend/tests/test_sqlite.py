@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+
+import pytest
+
+from queue_system import SQLiteQueueManager
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'queue.db')
+
+
+def test_second_manager_sees_the_first_ones_writes(path, person):
+    first, second = SQLiteQueueManager(path), SQLiteQueueManager(path)
+    assert first.instance_id == second.instance_id
+    since = second.version
+    first.enqueue(person(1))
+    first.enqueue(person(2, age=85))
+
+    assert second.version == first.version
+    assert second.get_stats()['total_in_queue'] == 2
+    assert second.get_entry_by_cert('LC0001')[2]['position'] == 2
+    events = [event['type'] for event in second.get_events(since)['events']]
+    assert events == ['enqueued', 'now_serving', 'enqueued', 'now_serving']
+
+    assert second.dequeue()[2]['life_certificate_no'] == 'LC0002'
+    assert first.get_stats()['now_serving'] == 'LC0001'
+    assert first.enqueue(person(1))[1] == 'Person with life_certificate_no LC0001 already in queue'
+    first.close()
+    second.close()
+
+
+def test_writer_waits_for_another_connections_transaction(path, person):
+    manager = SQLiteQueueManager(path)
+    manager.enqueue(person(1))
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute('BEGIN IMMEDIATE')
+    served = []
+    waiter = threading.Thread(target=lambda: served.append(manager.dequeue()))
+    waiter.start()
+    waiter.join(0.3)
+    assert waiter.is_alive() and not served
+    # Readers are not blocked by the pending write
+    assert manager.get_stats()['total_in_queue'] == 1
+    other.execute('COMMIT')
+    waiter.join(5)
+    assert served[0][2]['life_certificate_no'] == 'LC0001'
+    other.close()
+    manager.close()
+
+
+def test_concurrent_connections_serve_each_person_once(path, person):
+    managers = [SQLiteQueueManager(path) for _ in range(4)]
+    for number in range(200):
+        managers[0].enqueue(person(number))
+    served = [[] for _ in managers]
+
+    def serve(manager, log):
+        while True:
+            success, _, entry = manager.dequeue()
+            if not success:
+                return
+            log.append(entry['life_certificate_no'])
+
+    threads = [threading.Thread(target=serve, args=pair) for pair in zip(managers, served)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    everyone = sorted(cert_no for log in served for cert_no in log)
+    assert everyone == [f'LC{number:04d}' for number in range(200)]
+    stats = managers[1].get_stats()
+    assert stats['total_in_queue'] == 0 and stats['by_preferred_date'] == {}
+    history = managers[2].get_history('2000-01-01', '2100-01-01', limit=1000)[2]['records']
+    assert len(history) == 200
+    for manager in managers:
+        manager.close()
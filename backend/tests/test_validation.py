@@ -0,0 +1,89 @@
+import random
+from datetime import datetime
+
+from queue_system.utils import person_errors, validate_people, validate_person_data
+
+# Values that sit on either side of the rules, most of all strptime's date and time quirks
+SAMPLES = {
+    'life_certificate_no': ['LC0001', '  ', 'LC-' + 'x' * 80, 'प्रमाणपत्र', 17, None,
+                            ''],
+    'name': ['Asha', '', None, 0],
+    'age': [70, '85', 0, 150, -1, 151, '7.5', 'old', None, True, 80.9],
+    'phone': ['9876543210', ' 9876543210 ', 9876543210, '987654321', '98765432100',
+              '98765-4321', '٩٨٧٦٥٤٣٢١٠', ''],
+    'proof_guardian_name': ['Guardian', ''],
+    'verification_mode': ['presence', 'online', 'Online', 'video', ''],
+    'preferred_date': ['2026-01-25', '2026-1-5', '2026-01- 5', '2024-02-29', '2023-02-29',
+                       '2026-13-01', '2026-00-10', '0000-01-01', '26-01-25', '2026-01-25 ',
+                       '2026/01/25', '２０２６-01-25', 20260125, ''],
+    'preferred_time': ['10:00', '9:5', '09:05', '23:59', '24:00', '12:60', '7', '10:00:00',
+                       ' 9:30', '１０:00', 1000, ''],
+}
+
+
+def original_validate(data):
+    """The rules validate_person_data started from, kept here as the reference"""
+    required_fields = ['life_certificate_no', 'name', 'age', 'phone', 'proof_guardian_name',
+                       'verification_mode', 'preferred_date', 'preferred_time']
+    for field in required_fields:
+        if field not in data:
+            return False, f"Missing required field: {field}"
+        if not data[field]:
+            return False, f"Field cannot be empty: {field}"
+    try:
+        age = int(data['age'])
+        if age < 0 or age > 150:
+            return False, "Age must be between 0 and 150"
+    except (ValueError, TypeError):
+        return False, "Age must be a valid integer"
+    if data['verification_mode'] not in ['presence', 'online']:
+        return False, "verification_mode must be 'presence' or 'online'"
+    if not isinstance(data['life_certificate_no'], str) or \
+            len(str(data['life_certificate_no']).strip()) == 0:
+        return False, "life_certificate_no must be a non-empty string"
+    try:
+        datetime.strptime(data['preferred_date'], '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return False, "preferred_date must be in YYYY-MM-DD format (e.g., 2026-01-25)"
+    try:
+        datetime.strptime(data['preferred_time'], '%H:%M')
+    except (ValueError, TypeError):
+        return False, "preferred_time must be in HH:MM format (e.g., 09:30 or 14:00)"
+    phone = str(data['phone']).strip()
+    if not phone.isdigit() or len(phone) != 10:
+        return False, "phone must be a 10-digit number"
+    return True, ""
+
+
+def records(count, seed):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        record = {field: values[0] for field, values in SAMPLES.items()}
+        for field in rnd.sample(sorted(SAMPLES), rnd.randint(0, 3)):
+            if rnd.random() < 0.1:
+                del record[field]
+            else:
+                record[field] = rnd.choice(SAMPLES[field])
+        yield record
+
+
+def test_every_single_field_value_is_judged_as_before():
+    for field, values in SAMPLES.items():
+        for value in values:
+            record = {name: samples[0] for name, samples in SAMPLES.items()}
+            record[field] = value
+            assert validate_person_data(record) == original_validate(record), (field, value)
+
+
+def test_random_records_are_judged_as_before():
+    rows = list(records(3000, seed=13))
+    for row in rows:
+        assert validate_person_data(row) == original_validate(row), row
+
+
+def test_batch_mode_matches_one_at_a_time():
+    rows = list(records(2000, seed=14))
+    assert validate_people(rows) == [person_errors(row) for row in rows]
+    # The first error of a row is what the single-record check reports
+    for row, errors in zip(rows, validate_people(rows)):
+        assert (not errors, next(iter(errors.values()), "")) == original_validate(row)